@@ -6,101 +6,94 @@ Upstage Solar API를 활용한 다관점 사고 파트너
 - Phase 2: 심화 탐색 함수, 대화 히스토리
 - Phase 3: 결과 내보내기
 - Phase 4: Document Parse API 연동
+- Phase 6: 여러 문서 동시 파싱
+- Phase 7: 대용량 PDF 페이지 구간 분할 파싱
+- Phase 7.1: 분할 기준 페이지 수 복원 (작은 PDF는 한 번에 요청, 페이지 캐시는 유지)
+- Phase 8: 작업 유형별 모델 라우팅
+- Phase 10: 분석 함수 실행 시간 프로파일링 (PRISM_PROFILE)
+- Phase 13: 잘린 다관점 분석을 빠진 섹션만 이어서 생성
+- Phase 14: 여러 관점 심화 탐색 동시 실행 (비교 모드)
+- Phase 16: 문서 개정판 증분 처리 (바뀐 페이지만 다시 파싱/요약)
+- Phase 16.1: 문서 종합 분석 입력 상한 (관련 구간만 요약, 요약 합계 문자 수 제한)
+- Phase 17: 업로드 전 사전 점검 (형식 확인, 큰 이미지 축소)
+- Phase 18: 취소할 수 있는 호출 (스트리밍 응답 중단, 버린 토큰 집계)
+- Phase 19: 관점 섹션 중복 검사, 겹친 섹션만 다시 쓰기
+- Phase 20: 질문 변형 매트릭스 (변형별 다관점 분석 동시 실행)
+- Phase 22: 관점 목록을 설정에서 읽고, 분석 프롬프트를 고정 앞부분으로 미리 컴파일
+- Phase 23: 시간 예산에 따른 단계적 품질 조정 (max_tokens/관점 수/재시도/모델/비슷한 이전 분석)
+- Phase 23.1: 관점 수는 남은 시간이 라우터의 예상 생성 시간(모델별 실측)보다 적을 때만 줄임
+- Phase 24: 여러 API 키를 풀로 묶어 부하가 적은 키로 호출 (키별 클라이언트/세션, 401/429 키 일시 제외)
+- Phase 24.1: 한 번에 보내는 문서 파싱(이미지, 분할하지 않은 PDF)도 실패하면 다른 키로 다시 요청
+- Phase 25: 질문 분석 결과 캐시, 캐시 스냅샷 내보내기/불러오기 (프롬프트 버전 검사)
+- Phase 25.1: 요청 파일을 확인해 운영 중에 스냅샷 내보내기 (PRISM_CACHE_SNAPSHOT_TRIGGER)
+- Phase 25.2: 요청 파일 확인은 설정했을 때만, 요청으로 저장할 수 있는 곳은 스냅샷 디렉터리 안의 .snapshot 파일로 제한
+- Phase 7.2: 구간 파싱이 끝난 페이지부터 바로 요약 시작 (문서 분석은 미리 만든 요약을 재사용)
 """
 
+import hashlib
+import io
 import os
+import re
+import threading
+import time
 import requests
-from openai import OpenAI
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from openai import AuthenticationError, RateLimitError
 from dotenv import load_dotenv
+from profiler import profiled
+from preflight import preflight_document
+from diversity import find_redundant_sections, section_vector, cosine_similarity
+from perspectives import load_perspectives, compile_analysis_prompt
+from credentials import credential_pool, retry_after_seconds
+from deadline import OPTIONAL_STEP_SECONDS, MIN_GENERATION_SECONDS
+from router import (
+    router,
+    TASK_MULTI_PERSPECTIVE,
+    TASK_DEEP_DIVE_INITIAL,
+    TASK_DEEP_DIVE_FOLLOW_UP,
+    TASK_CONTINUATION,
+    TASK_DOCUMENT_MAP,
+    TASK_DOCUMENT_REDUCE,
+    TASK_DIVERSIFY,
+)
+from retriever import content_hash, select_sections
+from snapshots import load_snapshot, write_snapshot, ExportTriggerWatcher, SNAPSHOT_SUFFIX
+from revisions import (
+    page_text_cache,
+    page_summary_cache,
+    analysis_cache,
+    missing_runs,
+    section_key,
+)
+
+# 💡 [Phase 7] PDF 구간 분할용 (선택 의존성, 없으면 분할/페이지 캐시 없이 한 번에 파싱)
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
 
 # 환경변수 로드
 load_dotenv()
 
-# Upstage API 클라이언트 설정
-client = OpenAI(
-    api_key=os.getenv("UPSTAGE_API_KEY"),
-    base_url="https://api.upstage.ai/v1/solar"
-)
+# 💡 [Phase 24] Upstage API 클라이언트는 키별로 credentials.credential_pool에 있음
+# (UPSTAGE_API_KEYS에 쉼표로 여러 키를 넣으면 부하가 가장 적은 키로 호출)
 
 # ============================================================
 # 관점 정의
-# 💡 각 관점의 메타데이터를 딕셔너리로 관리
+# 💡 [Phase 22] 관점 목록은 perspectives.py의 기본값 또는 PRISM_PERSPECTIVES_CONFIG 설정 파일에서
+# 시작할 때 한 번 읽고 검증합니다. (관점 키 → 메타데이터 딕셔너리, 순서 유지)
 # ============================================================
-PERSPECTIVES = {
-    "traditional": {
-        "emoji": "🔵",
-        "name": "전통적 관점",
-        "typicality": "높음",
-        "description": "가장 흔하고 검증된 접근 방식",
-        "color": "blue"
-    },
-    "practical": {
-        "emoji": "🟢",
-        "name": "실용적 관점",
-        "typicality": "중간-높음",
-        "description": "즉시 실행 가능하고 현실적인 접근",
-        "color": "green"
-    },
-    "critical": {
-        "emoji": "🟡",
-        "name": "비판적 관점",
-        "typicality": "중간",
-        "description": "반대 의견, 우려, 고려해야 할 위험",
-        "color": "orange"
-    },
-    "creative": {
-        "emoji": "🔴",
-        "name": "창의적 관점",
-        "typicality": "낮음",
-        "description": "비전형적이지만 가치 있을 수 있는 접근",
-        "color": "red"
-    }
-}
+PERSPECTIVES = load_perspectives()
 
 # ============================================================
 # 프롬프트 템플릿
 # ============================================================
 
-# 다관점 분석 프롬프트 (기존)
-MULTI_PERSPECTIVE_PROMPT = """당신은 "다관점 사고 파트너"입니다.
-
-주어진 주제나 질문에 대해 네 가지 관점에서 분석을 제공합니다.
-각 관점은 서로 다른 "전형성(얼마나 흔한 접근인가)"을 가집니다.
-
-## 분석 형식
-
-### 🔵 전통적 관점 (전형성: 높음)
-가장 흔하고 검증된 접근 방식입니다.
-- **핵심 내용**: [이 관점의 주요 주장이나 접근]
-- **강점**: [이 관점이 가진 장점]
-- **한계**: [이 관점의 제약이나 단점]
-
-### 🟢 실용적 관점 (전형성: 중간-높음)
-즉시 실행 가능하고 현실적인 접근입니다.
-- **핵심 내용**: [이 관점의 주요 주장이나 접근]
-- **강점**: [이 관점이 가진 장점]
-- **한계**: [이 관점의 제약이나 단점]
-
-### 🟡 비판적 관점 (전형성: 중간)
-반대 의견, 우려, 고려해야 할 위험을 다룹니다.
-- **핵심 내용**: [이 관점의 주요 주장이나 접근]
-- **강점**: [이 관점이 가진 장점]
-- **한계**: [이 관점의 제약이나 단점]
-
-### 🔴 창의적 관점 (전형성: 낮음)
-비전형적이지만 가치 있을 수 있는 접근입니다.
-- **핵심 내용**: [이 관점의 주요 주장이나 접근]
-- **강점**: [이 관점이 가진 장점]
-- **한계**: [이 관점의 제약이나 단점]
-
----
-
-## 사용자의 주제/질문:
-{user_input}
-
-위 형식에 맞춰 네 가지 관점에서 분석해주세요.
-각 관점이 서로 다른 시각을 제공하도록 하고,
-사용자가 다양한 가능성을 탐색할 수 있게 도와주세요."""
+# 💡 [Phase 22] 다관점 분석 프롬프트: 관점 목록으로 고정 앞부분을 한 번만 만들고,
+# 요청마다 사용자 입력만 뒤에 붙임 (모든 요청의 앞부분이 같아 프롬프트 캐시 재사용)
+MULTI_PERSPECTIVE_PREFIX = compile_analysis_prompt(PERSPECTIVES)
 
 
 # 💡 [Phase 2] 심화 탐색 프롬프트
@@ -159,45 +152,164 @@ INITIAL_DEEP_DIVE_PROMPT = """당신은 "다관점 사고 파트너"입니다.
 # 핵심 함수들
 # ============================================================
 
-def analyze_multi_perspective(user_input: str) -> str:
+@profiled("analyzer.analyze_multi_perspective")
+def analyze_multi_perspective(user_input: str, handle: "CallHandle" = None) -> str:
     """
     사용자 입력을 받아 다관점 분석을 수행합니다.
     
     Args:
         user_input: 분석할 주제나 질문
+        handle: 💡 [Phase 18] 취소용 호출 핸들 (선택적). 취소되면 CallCancelledError 발생
         
     Returns:
-        네 가지 관점에서의 분석 결과
+        관점별 분석 결과 (PERSPECTIVES 순서)
     """
+    # 💡 [Phase 25] 같은 질문은 캐시(불러온 스냅샷 포함)에서 바로 반환
+    cache_key = _analysis_cache_key(user_input)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        response = client.chat.completions.create(
-            model="solar-pro",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "당신은 사용자의 사고를 확장하는 다관점 사고 파트너입니다."
-                },
-                {
-                    "role": "user",
-                    "content": MULTI_PERSPECTIVE_PROMPT.format(user_input=user_input)
-                }
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
-        
-        return response.choices[0].message.content
-    
+        content = _run_multi_perspective(user_input, TASK_MULTI_PERSPECTIVE, handle)
+    except CallCancelledError:
+        raise
     except Exception as e:
         return _handle_error(e)
 
+    if _cacheable(handle):
+        analysis_cache.put(cache_key, content)
+    return content
+
+
+def _analysis_cache_key(query: str) -> str:
+    """질문 하나의 다관점 분석 캐시 키 (문서 종합 분석의 키와 겹치지 않도록 작업 유형을 붙임)"""
+    return section_key(f"{TASK_MULTI_PERSPECTIVE}\n{query}")
+
+
+def _run_multi_perspective(user_input: str, task: str, handle: "CallHandle" = None) -> str:
+    """다관점 분석 요청을 보내고, 잘렸으면 이어서 완성합니다. 예외는 호출한 쪽에서 처리합니다."""
+    deadline = handle.deadline if handle else None
+    keys = list(PERSPECTIVES)
+
+    if deadline:
+        # 💡 [Phase 23] 새로 생성할 시간이 없으면 비슷한 이전 분석으로 대신함
+        if deadline.remaining < MIN_GENERATION_SECONDS:
+            match = _near_match(user_input)
+            if match:
+                deadline.note(f"시간 부족 → 비슷한 이전 분석 재사용 (유사도 {match['similarity']:.2f})")
+                return match["content"]
+
+        # 💡 [Phase 23] 모든 관점을 쓸 시간이 없으면 전형성이 높은 관점부터 일부만
+        # 💡 [Phase 23.1] 예상 시간은 라우터가 고를 모델의 관점 섹션당 실측 생성 시간 기준
+        remaining = deadline.remaining
+        expected = router.estimate_seconds(task, len(user_input), len(keys))
+        if remaining < expected:
+            affordable = int(remaining // (expected / len(keys)))
+            keys = keys[:max(MIN_DEGRADED_PERSPECTIVES, affordable)]
+            if len(keys) < len(PERSPECTIVES):
+                deadline.note(
+                    f"남은 {remaining:.0f}초 < 예상 {expected:.0f}초 → 관점 {len(PERSPECTIVES)}개 중 {len(keys)}개만 분석"
+                )
+
+    messages = [
+        {
+            "role": "system",
+            "content": "당신은 사용자의 사고를 확장하는 다관점 사고 파트너입니다."
+        },
+        {
+            "role": "user",
+            "content": _analysis_prefix(tuple(keys)) + user_input
+        }
+    ]
+
+    response = _chat_completion(
+        task,
+        messages=messages,
+        input_chars=len(user_input),
+        sections=len(keys),
+        handle=handle
+    )
+    content = response["content"]
 
+    # 💡 [Phase 13] max_tokens에서 잘렸으면 빠진 섹션만 이어서 생성
+    if response["finish_reason"] == "length":
+        if _has_time_for_optional_step(handle, "잘린 섹션 이어쓰기"):
+            content = _continue_truncated_analysis(messages, content, handle, keys)
+
+    # 💡 [Phase 19] 다른 관점과 거의 같은 섹션이 있으면 그 섹션만 다시 작성
+    content = _diversify_sections(messages, content, handle)
+
+    if len(keys) == len(PERSPECTIVES) and response["finish_reason"] != "deadline":
+        _remember_analysis(user_input, content)
+    return content
+
+
+# ============================================================
+# 💡 [Phase 23] 시간 예산에 따른 품질 조정
+# ============================================================
+
+# 관점 수를 줄일 때도 최소 이만큼은 유지 (비교가 되어야 다관점 분석이므로)
+MIN_DEGRADED_PERSPECTIVES = 2
+
+# 비슷한 이전 분석으로 대신할 때 필요한 최소 유사도, 보관할 최근 분석 수
+NEAR_MATCH_THRESHOLD = 0.8
+NEAR_MATCH_SIZE = 200
+
+_recent_lock = threading.Lock()
+_recent_analyses = deque(maxlen=NEAR_MATCH_SIZE)
+
+
+@lru_cache(maxsize=32)
+def _analysis_prefix(keys: tuple) -> str:
+    """관점 일부만 쓰는 분석 프롬프트 앞부분 (전체 관점이면 미리 컴파일한 것을 그대로 사용)"""
+    if len(keys) == len(PERSPECTIVES):
+        return MULTI_PERSPECTIVE_PREFIX
+    return compile_analysis_prompt({key: PERSPECTIVES[key] for key in keys})
+
+
+def _cacheable(handle: "CallHandle") -> bool:
+    """시간 예산 때문에 품질을 낮춘 결과가 아닌지 (낮춘 결과는 캐시하지 않음)"""
+    return handle is None or handle.deadline is None or not handle.deadline.notes()
+
+
+def _has_time_for_optional_step(handle: "CallHandle", step: str) -> bool:
+    """부가 요청을 보낼 시간이 남았는지 확인하고, 없으면 건너뛴 것을 기록합니다."""
+    deadline = handle.deadline if handle else None
+    if deadline is None or deadline.remaining >= OPTIONAL_STEP_SECONDS:
+        return True
+    deadline.note(f"남은 {deadline.remaining:.0f}초 → {step} 생략")
+    return False
+
+
+def _remember_analysis(user_input: str, content: str):
+    """완성된 분석을 비슷한 질문에 대신 쓸 수 있도록 보관합니다."""
+    with _recent_lock:
+        _recent_analyses.append((section_vector(user_input), content))
+
+
+def _near_match(user_input: str) -> dict:
+    """최근 분석 중 입력이 가장 비슷한 것을 찾습니다. 기준 미만이면 None."""
+    vector = section_vector(user_input)
+    with _recent_lock:
+        candidates = list(_recent_analyses)
+
+    best = None
+    for candidate_vector, content in candidates:
+        similarity = cosine_similarity(vector, candidate_vector)
+        if similarity >= NEAR_MATCH_THRESHOLD and (best is None or similarity > best["similarity"]):
+            best = {"content": content, "similarity": similarity}
+    return best
+
+
+@profiled("analyzer.deep_dive_perspective")
 def deep_dive_perspective(
     original_query: str,
     perspective_key: str,
     previous_analysis: str = "",
     follow_up_question: str = "",
-    conversation_history: list = None
+    conversation_history: list = None,
+    handle: "CallHandle" = None
 ) -> str:
     """
     💡 [Phase 2] 특정 관점에 대해 심화 탐색을 수행합니다.
@@ -208,6 +320,7 @@ def deep_dive_perspective(
         previous_analysis: 이전 분석 결과 (선택적)
         follow_up_question: 사용자의 추가 질문 (선택적)
         conversation_history: 이전 대화 히스토리 (선택적)
+        handle: 💡 [Phase 18] 취소용 호출 핸들 (선택적). 취소되면 CallCancelledError 발생
         
     Returns:
         심화 분석 결과
@@ -254,19 +367,81 @@ def deep_dive_perspective(
     messages.append({"role": "user", "content": prompt})
     
     try:
-        response = client.chat.completions.create(
-            model="solar-pro",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=1500
-        )
+        # 💡 [Phase 8] 후속 질문은 질문 길이에 따라 가벼운 모델로 라우팅될 수 있음
+        if follow_up_question:
+            response = _chat_completion(
+                TASK_DEEP_DIVE_FOLLOW_UP,
+                messages=messages,
+                input_chars=len(follow_up_question),
+                handle=handle
+            )
+        else:
+            response = _chat_completion(
+                TASK_DEEP_DIVE_INITIAL,
+                messages=messages,
+                input_chars=len(original_query),
+                handle=handle
+            )
         
-        return response.choices[0].message.content
+        return response["content"]
     
+    except CallCancelledError:
+        raise
     except Exception as e:
         return _handle_error(e)
 
 
+# 💡 [Phase 14] 비교 모드에서 동시에 탐색할 수 있는 최대 관점 수
+MAX_COMPARE_PERSPECTIVES = 4
+
+
+@profiled("analyzer.deep_dive_many")
+def deep_dive_many(
+    original_query: str,
+    perspective_keys: list,
+    previous_analysis: str = "",
+    follow_up_question: str = "",
+    histories: dict = None,
+    handle: "CallHandle" = None
+) -> dict:
+    """
+    💡 [Phase 14] 여러 관점의 심화 탐색을 동시에 수행합니다.
+
+    관점마다 자기 대화 히스토리만 사용하므로 서로의 맥락이 섞이지 않고,
+    전체 소요 시간은 가장 느린 관점 하나와 비슷합니다.
+
+    Args:
+        original_query: 원래 분석 요청한 주제/질문
+        perspective_keys: 탐색할 관점 키 목록 (최대 MAX_COMPARE_PERSPECTIVES개)
+        previous_analysis: 이전 분석 결과 (선택적)
+        follow_up_question: 모든 관점에 보낼 추가 질문 (선택적)
+        histories: 관점 키 → 대화 히스토리 (선택적)
+        handle: 💡 [Phase 18] 취소용 호출 핸들 (선택적). 모든 관점의 호출이 함께 취소됨
+
+    Returns:
+        관점 키 → 심화 분석 결과
+    """
+    histories = histories or {}
+    keys = list(perspective_keys)[:MAX_COMPARE_PERSPECTIVES]
+    if not keys:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+        futures = {
+            key: executor.submit(
+                deep_dive_perspective,
+                original_query=original_query,
+                perspective_key=key,
+                previous_analysis=previous_analysis,
+                follow_up_question=follow_up_question,
+                conversation_history=histories.get(key),
+                handle=handle
+            )
+            for key in keys
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
 def get_perspective_info(perspective_key: str) -> dict:
     """
     관점 키로 관점 정보를 조회합니다.
@@ -291,6 +466,9 @@ def get_all_perspectives() -> dict:
 
 DOCUMENT_PARSE_URL = "https://api.upstage.ai/v1/document-digitization"
 
+# 💡 [Phase 7] Document Parse 요청 하나의 최대 대기 시간 (초)
+DOCUMENT_PARSE_TIMEOUT = 120
+
 # 지원 파일 형식
 SUPPORTED_FILE_TYPES = {
     "pdf": "application/pdf",
@@ -300,23 +478,37 @@ SUPPORTED_FILE_TYPES = {
 }
 
 
-def parse_document(uploaded_file) -> dict:
+@profiled("analyzer.parse_document")
+def parse_document(uploaded_file, on_shard=None, handle: "CallHandle" = None) -> dict:
     """
     💡 [Phase 4] 업로드된 문서에서 텍스트를 추출합니다.
+
+    💡 [Phase 7] PDF는 페이지 구간으로 나눠 병렬로 파싱합니다.
+
+    💡 [Phase 16] PDF는 페이지별 지문으로 캐시를 확인해, 이전에 파싱한 적 없는 페이지만 요청합니다.
+
+    💡 [Phase 17] 보내기 전에 파일 내용으로 형식과 손상 여부를 확인하고, 큰 이미지는 줄여서 보냅니다.
+
+    💡 [Phase 23] 핸들에 마감이 있으면 요청 타임아웃을 남은 시간에 맞추고, 시간이 모자라면 재시도를 건너뜁니다.
+    PDF는 마감까지 추출한 페이지만으로 결과를 만듭니다. (handle.deadline.notes()에 기록)
     
     Args:
         uploaded_file: Streamlit UploadedFile 객체
+        on_shard: PDF의 구간 하나가 끝날 때마다 호출되는 콜백 (선택적).
+            iter_document_shards가 반환하는 구간 딕셔너리를 인자로 받습니다.
+        handle: 💡 [Phase 23] 마감 시간이 있는 호출 핸들 (선택적)
         
     Returns:
         dict: {
             "success": bool,
             "text": str (추출된 텍스트),
-            "error": str (에러 메시지, 실패 시)
+            "error": str (에러 메시지, 실패 시),
+            "pages": list (PDF만, {"page", "hash", "text"} 목록),
+            "reused_pages": int (PDF만, 캐시에서 재사용한 페이지 수),
+            "preflight": dict (사전 점검 결과: original_bytes, bytes, pages, width, height, notes)
         }
     """
-    api_key = os.getenv("UPSTAGE_API_KEY")
-    
-    if not api_key:
+    if not credential_pool:
         return {
             "success": False,
             "text": "",
@@ -333,15 +525,76 @@ def parse_document(uploaded_file) -> dict:
             "text": "",
             "error": f"지원하지 않는 파일 형식입니다: .{file_ext}\n지원 형식: PDF, PNG, JPG"
         }
-    
-    try:
-        # API 호출
-        headers = {
-            "Authorization": f"Bearer {api_key}"
+
+    # 💡 [Phase 17] 로컬 사전 점검: 손상/형식 불일치는 API 호출 없이 바로 알림
+    checked = preflight_document(uploaded_file.name, uploaded_file.getvalue())
+    if not checked["ok"]:
+        return {
+            "success": False,
+            "text": "",
+            "error": checked["error"]
         }
 
+    result = _parse_checked_document(uploaded_file.name, checked, on_shard, handle)
+    result["preflight"] = {key: value for key, value in checked.items() if key not in ("data", "ok", "error")}
+    return result
+
+
+def _parse_checked_document(file_name: str, checked: dict, on_shard=None, handle: "CallHandle" = None) -> dict:
+    """사전 점검을 통과한 파일을 내용 형식에 맞게 파싱합니다."""
+    file_ext = checked["file_type"]
+    file_bytes = checked["data"]
+
+    # 💡 [Phase 16] PDF는 페이지 단위로 캐시를 확인하고 바뀐 페이지만 구간별로 파싱
+    if file_ext == "pdf":
+        result = _parse_pdf_incremental(file_name, file_bytes, on_shard, handle)
+        if result is not None:
+            return result
+
+    return _request_document_parse_with_failover(file_name, file_bytes, SUPPORTED_FILE_TYPES[file_ext], handle)
+
+
+def _request_document_parse_with_failover(file_name: str, file_bytes: bytes, mime_type: str,
+                                          handle: "CallHandle" = None) -> dict:
+    """
+    💡 [Phase 24.1] 파일 전체를 한 번에 파싱하고, 다시 시도해도 되는 실패(401/429/5xx/시간 초과)면
+    키 수만큼 다른 키로 다시 보냅니다. (실패한 키는 키 풀이 잠시 쉬게 하므로 다음 요청은 다른 키로 감)
+    """
+    deadline = handle.deadline if handle else None
+    attempts = max(1, len(credential_pool))
+    for attempt in range(attempts):
+        result = _request_document_parse(file_name, file_bytes, mime_type, _parse_timeout(handle))
+        if result["success"] or not result["retryable"] or attempt == attempts - 1:
+            break
+        if not credential_pool.has_available() or (deadline and deadline.expired):
+            break
+    return result
+
+
+def _parse_timeout(handle: "CallHandle" = None) -> float:
+    """💡 [Phase 23] Document Parse 요청 타임아웃 (마감이 있으면 남은 시간까지만)"""
+    if handle is None or handle.deadline is None:
+        return DOCUMENT_PARSE_TIMEOUT
+    return max(MIN_GENERATION_SECONDS, min(DOCUMENT_PARSE_TIMEOUT, handle.deadline.remaining))
+
+
+def _request_document_parse(file_name: str, file_bytes: bytes, mime_type: str,
+                            timeout: float = DOCUMENT_PARSE_TIMEOUT) -> dict:
+    """
+    Document Parse API를 한 번 호출하고 결과를 parse_document 형식으로 반환합니다.
+
+    결과에는 재시도해도 되는 실패인지 알려주는 "retryable" 값이 추가되고,
+    성공하면 응답의 페이지 정보로 나눈 "page_texts" ({페이지 번호: 텍스트}, 없으면 빈 딕셔너리)도 추가됩니다.
+
+    💡 [Phase 24] 요청마다 키 풀에서 부하가 가장 적은 키를 골라 그 키의 HTTP 세션으로 보냅니다.
+    (인증 헤더는 세션에 들어 있음, 429/401 응답은 키 풀에 알려 그 키를 잠시 쉬게 함)
+    """
+    credential = credential_pool.acquire()
+    response = None
+    try:
+        # API 호출
         files = {
-            "document": (uploaded_file.name, uploaded_file.getvalue(), SUPPORTED_FILE_TYPES[file_ext])
+            "document": (file_name, file_bytes, mime_type)
         }
 
         # 새 API 형식에 맞는 data 파라미터 추가
@@ -350,96 +603,25 @@ def parse_document(uploaded_file) -> dict:
             "model": "document-parse"
         }
 
-        response = requests.post(
+        response = credential.session.post(
             DOCUMENT_PARSE_URL,
-            headers=headers,
             files=files,
-            data=data
+            data=data,
+            timeout=timeout
         )
         
         # 응답 확인
         if response.status_code == 200:
             result = response.json()
-
-            # 텍스트 추출 (API 응답 구조에 따라 조정)
-            extracted_text = ""
-
-            # 1. content 필드에서 텍스트 추출
-            if "content" in result:
-                content = result["content"]
-                if isinstance(content, dict):
-                    # content.html에서 텍스트 추출 (Upstage API 실제 응답 구조)
-                    if "html" in content:
-                        import re
-                        html_text = content["html"]
-                        # HTML 태그 제거
-                        extracted_text = re.sub(r'<[^>]+>', ' ', html_text)
-                        # <br> 태그는 줄바꿈으로
-                        extracted_text = extracted_text.replace('<br>', '\n')
-                        # 여러 공백을 하나로
-                        extracted_text = re.sub(r'[ \t]+', ' ', extracted_text)
-                        # 여러 줄바꿈을 하나로
-                        extracted_text = re.sub(r'\n+', '\n', extracted_text).strip()
-                    elif "text" in content:
-                        extracted_text = content["text"]
-                    elif "markdown" in content:
-                        extracted_text = content["markdown"]
-                elif isinstance(content, str):
-                    extracted_text = content
-
-            # 2. text 필드 직접 확인
-            if not extracted_text and "text" in result:
-                extracted_text = result["text"]
-
-            # 3. elements에서 텍스트 추출
-            if not extracted_text and "elements" in result:
-                texts = []
-                for element in result["elements"]:
-                    if "text" in element:
-                        texts.append(element["text"])
-                    # category가 paragraph, heading 등인 경우도 처리
-                    if "content" in element:
-                        elem_content = element["content"]
-                        if isinstance(elem_content, dict) and "text" in elem_content:
-                            texts.append(elem_content["text"])
-                        elif isinstance(elem_content, str):
-                            texts.append(elem_content)
-                extracted_text = "\n".join(texts)
-
-            # 4. pages 필드 확인 (Upstage API 응답 구조)
-            if not extracted_text and "pages" in result:
-                texts = []
-                for page in result["pages"]:
-                    if "text" in page:
-                        texts.append(page["text"])
-                    # words에서 텍스트 추출
-                    if "words" in page:
-                        page_words = []
-                        for word in page["words"]:
-                            if "text" in word:
-                                page_words.append(word["text"])
-                        if page_words:
-                            texts.append(" ".join(page_words))
-                extracted_text = "\n".join(texts)
-
-            # 5. html 필드에서 텍스트 추출
-            if not extracted_text and "html" in result:
-                import re
-                html_text = result["html"]
-                # HTML 태그 제거
-                extracted_text = re.sub(r'<[^>]+>', ' ', html_text)
-                # 여러 공백을 하나로
-                extracted_text = re.sub(r'\s+', ' ', extracted_text).strip()
-
-            # 6. markdown 필드 확인
-            if not extracted_text and "markdown" in result:
-                extracted_text = result["markdown"]
+            extracted_text = _extract_text(result)
 
             if extracted_text:
                 return {
                     "success": True,
                     "text": extracted_text.strip(),
-                    "error": ""
+                    "error": "",
+                    "retryable": False,
+                    "page_texts": _extract_page_texts(result)
                 }
             else:
                 # 디버깅을 위해 응답의 키 목록 표시
@@ -447,44 +629,402 @@ def parse_document(uploaded_file) -> dict:
                 return {
                     "success": False,
                     "text": "",
-                    "error": f"문서에서 텍스트를 추출할 수 없습니다. (응답 키: {available_keys})"
+                    "error": f"문서에서 텍스트를 추출할 수 없습니다. (응답 키: {available_keys})",
+                    "retryable": False
                 }
         
         elif response.status_code == 401:
             return {
                 "success": False,
                 "text": "",
-                "error": "API 인증 실패. API 키를 확인해주세요."
+                "error": "API 인증 실패. API 키를 확인해주세요.",
+                # 💡 [Phase 24] 키가 여럿이면 다른 키로 다시 시도
+                "retryable": len(credential_pool) > 1
             }
         
         elif response.status_code == 413:
             return {
                 "success": False,
                 "text": "",
-                "error": "파일 크기가 너무 큽니다. 더 작은 파일을 사용해주세요."
+                "error": "파일 크기가 너무 큽니다. 더 작은 파일을 사용해주세요.",
+                "retryable": False
             }
         
         else:
             return {
                 "success": False,
                 "text": "",
-                "error": f"API 오류 (상태 코드: {response.status_code})"
+                "error": f"API 오류 (상태 코드: {response.status_code})",
+                "retryable": response.status_code == 429 or response.status_code >= 500
             }
     
     except requests.exceptions.Timeout:
         return {
             "success": False,
             "text": "",
-            "error": "요청 시간이 초과되었습니다. 다시 시도해주세요."
+            "error": "요청 시간이 초과되었습니다. 다시 시도해주세요.",
+            "retryable": True
         }
     
     except requests.exceptions.ConnectionError:
         return {
             "success": False,
             "text": "",
-            "error": "서버에 연결할 수 없습니다. 인터넷 연결을 확인해주세요."
+            "error": "서버에 연결할 수 없습니다. 인터넷 연결을 확인해주세요.",
+            "retryable": True
         }
     
+    except Exception as e:
+        return {
+            "success": False,
+            "text": "",
+            "error": f"문서 처리 중 오류: {str(e)}",
+            "retryable": False
+        }
+
+    finally:
+        if response is None:
+            credential_pool.release(credential, 0)
+        else:
+            credential_pool.release(credential, response.status_code, retry_after_seconds(response.headers))
+
+
+def _extract_text(result: dict) -> str:
+    """Document Parse API 응답에서 텍스트를 추출합니다. (API 응답 구조에 따라 조정)"""
+    extracted_text = ""
+
+    # 1. content 필드에서 텍스트 추출
+    if "content" in result:
+        content = result["content"]
+        if isinstance(content, dict):
+            # content.html에서 텍스트 추출 (Upstage API 실제 응답 구조)
+            if "html" in content:
+                html_text = content["html"]
+                # HTML 태그 제거
+                extracted_text = re.sub(r'<[^>]+>', ' ', html_text)
+                # <br> 태그는 줄바꿈으로
+                extracted_text = extracted_text.replace('<br>', '\n')
+                # 여러 공백을 하나로
+                extracted_text = re.sub(r'[ \t]+', ' ', extracted_text)
+                # 여러 줄바꿈을 하나로
+                extracted_text = re.sub(r'\n+', '\n', extracted_text).strip()
+            elif "text" in content:
+                extracted_text = content["text"]
+            elif "markdown" in content:
+                extracted_text = content["markdown"]
+        elif isinstance(content, str):
+            extracted_text = content
+
+    # 2. text 필드 직접 확인
+    if not extracted_text and "text" in result:
+        extracted_text = result["text"]
+
+    # 3. elements에서 텍스트 추출
+    if not extracted_text and "elements" in result:
+        texts = []
+        for element in result["elements"]:
+            if "text" in element:
+                texts.append(element["text"])
+            # category가 paragraph, heading 등인 경우도 처리
+            if "content" in element:
+                elem_content = element["content"]
+                if isinstance(elem_content, dict) and "text" in elem_content:
+                    texts.append(elem_content["text"])
+                elif isinstance(elem_content, str):
+                    texts.append(elem_content)
+        extracted_text = "\n".join(texts)
+
+    # 4. pages 필드 확인 (Upstage API 응답 구조)
+    if not extracted_text and "pages" in result:
+        texts = []
+        for page in result["pages"]:
+            if "text" in page:
+                texts.append(page["text"])
+            # words에서 텍스트 추출
+            if "words" in page:
+                page_words = []
+                for word in page["words"]:
+                    if "text" in word:
+                        page_words.append(word["text"])
+                if page_words:
+                    texts.append(" ".join(page_words))
+        extracted_text = "\n".join(texts)
+
+    # 5. html 필드에서 텍스트 추출
+    if not extracted_text and "html" in result:
+        html_text = result["html"]
+        # HTML 태그 제거
+        extracted_text = re.sub(r'<[^>]+>', ' ', html_text)
+        # 여러 공백을 하나로
+        extracted_text = re.sub(r'\s+', ' ', extracted_text).strip()
+
+    # 6. markdown 필드 확인
+    if not extracted_text and "markdown" in result:
+        extracted_text = result["markdown"]
+
+    return extracted_text
+
+
+def _extract_page_texts(result: dict) -> dict:
+    """
+    💡 [Phase 16] 응답의 elements를 페이지 번호별 텍스트로 묶습니다.
+
+    페이지 정보가 없는 응답이면 빈 딕셔너리를 반환합니다.
+    """
+    pages = {}
+    for element in result.get("elements") or []:
+        page = element.get("page")
+        if not isinstance(page, int):
+            return {}
+
+        content = element.get("content")
+        if isinstance(content, dict):
+            text = content.get("text") or content.get("markdown") or ""
+            if not text and content.get("html"):
+                text = re.sub(r'<[^>]+>', ' ', content["html"])
+                text = re.sub(r'[ \t]+', ' ', text)
+        elif isinstance(content, str):
+            text = content
+        else:
+            text = element.get("text", "")
+
+        if text.strip():
+            pages.setdefault(page, []).append(text.strip())
+
+    return {page: "\n".join(texts) for page, texts in pages.items()}
+
+
+# ============================================================
+# 💡 [Phase 7] PDF 구간 분할 파싱
+# ============================================================
+
+# 이 페이지 수를 넘는 PDF만 구간으로 나눠 요청 (이하면 한 번에 요청하는 편이 요청 수가 적음)
+LARGE_PDF_PAGES = 20
+
+# 구간(shard) 하나에 담을 페이지 수
+PAGES_PER_SHARD = 10
+
+# 동시에 보낼 구간 요청 수
+MAX_SHARD_WORKERS = 4
+
+# 구간별 재시도 횟수와 대기 시간 (초, 시도마다 두 배)
+SHARD_MAX_RETRIES = 2
+SHARD_RETRY_DELAY = 2.0
+
+
+def split_pdf(file_bytes: bytes, pages_per_shard: int = PAGES_PER_SHARD) -> list:
+    """
+    💡 [Phase 7] PDF를 페이지 구간별 PDF로 나눕니다. (pypdf 필요)
+
+    Args:
+        file_bytes: 원본 PDF 바이트
+        pages_per_shard: 구간 하나에 담을 페이지 수
+
+    Returns:
+        list: {"start_page": int, "end_page": int, "data": bytes} 목록 (페이지 번호는 1부터)
+    """
+    reader = PdfReader(io.BytesIO(file_bytes))
+    total_pages = len(reader.pages)
+    return [
+        _write_pdf_pages(reader, start, min(start + pages_per_shard, total_pages))
+        for start in range(0, total_pages, pages_per_shard)
+    ]
+
+
+def _write_pdf_pages(reader, start: int, end: int) -> dict:
+    """reader의 [start, end) 페이지만 담은 PDF 구간을 만듭니다."""
+    writer = PdfWriter()
+    for page_index in range(start, end):
+        writer.add_page(reader.pages[page_index])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return {
+        "start_page": start + 1,
+        "end_page": end,
+        "data": buffer.getvalue()
+    }
+
+
+def _parse_shard_with_retry(file_name: str, shard: dict, handle: "CallHandle" = None) -> dict:
+    """
+    구간 하나를 파싱하고, 일시적인 오류면 지수 백오프로 재시도합니다.
+
+    💡 [Phase 23] 마감이 지났으면 요청하지 않고 "deadline": True인 실패를 반환합니다.
+    """
+    shard_name = f"{file_name} (p.{shard['start_page']}-{shard['end_page']})"
+    deadline = handle.deadline if handle else None
+
+    for attempt in range(SHARD_MAX_RETRIES + 1):
+        if deadline and deadline.expired:
+            return {
+                "success": False,
+                "text": "",
+                "error": "마감 시간이 지나 추출하지 않았습니다.",
+                "retryable": False,
+                "deadline": True,
+                "attempts": attempt
+            }
+        result = _request_document_parse(
+            shard_name, shard["data"], SUPPORTED_FILE_TYPES["pdf"], _parse_timeout(handle)
+        )
+        if result["success"] or not result["retryable"] or attempt == SHARD_MAX_RETRIES:
+            break
+        if not _has_time_for_optional_step(handle, "문서 구간 재시도"):
+            break
+        time.sleep(SHARD_RETRY_DELAY * (2 ** attempt))
+
+    result["attempts"] = attempt + 1
+    return result
+
+
+def iter_document_shards(file_name: str, file_bytes: bytes,
+                         max_workers: int = MAX_SHARD_WORKERS, shards: list = None,
+                         handle: "CallHandle" = None):
+    """
+    💡 [Phase 7] PDF를 페이지 구간으로 나눠 병렬 파싱하고, 끝나는 순서대로 결과를 내보냅니다.
+
+    💡 [Phase 7.2] _parse_pdf_incremental은 끝난 구간의 페이지를 바로 요약(map)하기 시작하므로
+    나머지 구간을 파싱하는 동안 문서 분석의 첫 단계가 미리 진행됩니다.
+
+    Args:
+        file_name: 원본 파일명
+        file_bytes: 원본 PDF 바이트
+        max_workers: 동시에 보낼 구간 요청 수
+        shards: 파싱할 구간 목록 (없으면 split_pdf로 전체 문서를 나눔)
+        handle: 💡 [Phase 23] 마감 시간이 있는 호출 핸들 (선택적)
+
+    Yields:
+        dict: {
+            "index": int (구간 순번), "start_page": int, "end_page": int,
+            "success": bool, "text": str, "error": str,
+            "deadline": bool (마감이 지나 요청하지 않은 구간이면 True),
+            "page_texts": dict (구간 안 페이지 번호 → 텍스트, 응답에 페이지 정보가 없으면 빈 딕셔너리),
+            "completed": int (지금까지 끝난 구간 수), "total": int (전체 구간 수)
+        }
+    """
+    if shards is None:
+        shards = split_pdf(file_bytes)
+    total = len(shards)
+    if not total:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        futures = {
+            executor.submit(_parse_shard_with_retry, file_name, shard, handle): index
+            for index, shard in enumerate(shards)
+        }
+        for completed, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            result = future.result()
+            yield {
+                "index": index,
+                "start_page": shards[index]["start_page"],
+                "end_page": shards[index]["end_page"],
+                "success": result["success"],
+                "text": result["text"],
+                "error": result["error"],
+                "deadline": result.get("deadline", False),
+                "page_texts": result.get("page_texts") or {},
+                "completed": completed,
+                "total": total
+            }
+
+
+# ============================================================
+# 💡 [Phase 16] 개정판 증분 파싱
+# ============================================================
+
+def _page_fingerprint(page) -> str:
+    """
+    PDF 페이지 하나의 지문(SHA-256)을 반환합니다. (page_text_cache의 키)
+
+    페이지 크기, 내용 스트림, 페이지가 쓰는 이미지/폼(XObject) 데이터를 해시하므로,
+    다른 페이지만 고친 수정본에서도 그대로인 페이지는 같은 지문을 가집니다.
+    """
+    digest = hashlib.sha256()
+    digest.update(str([float(value) for value in page.mediabox]).encode("utf-8"))
+
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources is not None else None
+    if xobjects is not None:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            digest.update(name.encode("utf-8"))
+            digest.update(xobjects[name].get_object().get_data())
+
+    return digest.hexdigest()
+
+
+def _parse_pdf_incremental(file_name: str, file_bytes: bytes, on_shard=None,
+                           handle: "CallHandle" = None) -> dict:
+    """
+    캐시에 없는 페이지만 구간으로 묶어 파싱하고, 캐시된 페이지와 합쳐 페이지 순서대로 반환합니다.
+
+    50쪽 문서에서 두 쪽만 고친 수정본이면 그 두 쪽만 Document Parse로 보냅니다.
+    응답에 페이지 정보가 없는 구간은 텍스트를 구간 첫 페이지에 두고 캐시하지 않습니다.
+
+    💡 [Phase 23] 마감 때문에 요청하지 못한 구간만 남았으면 추출한 페이지만으로 결과를 만듭니다.
+    (빠진 페이지는 빈 텍스트로 두고 마감 기록에 남김, 다른 이유로 실패한 구간이 있으면 전체 실패)
+
+    💡 [Phase 7.2] early_map_pages가 고른 페이지는 텍스트가 생기는 대로(캐시에서 읽었거나
+    구간 파싱이 끝났을 때) 요약을 시작합니다. 파싱 중에 취소하면 아직 보내지 않은 요약도 보내지 않습니다.
+
+    Returns:
+        parse_document 형식의 결과 ("pages", "reused_pages" 포함).
+        PDF를 읽을 수 없으면 None (호출한 쪽에서 파일 전체를 한 번에 파싱)
+    """
+    if PdfReader is None:
+        return None
+    try:
+        reader = PdfReader(io.BytesIO(file_bytes))
+        fingerprints = [_page_fingerprint(page) for page in reader.pages]
+        texts = [page_text_cache.get(fingerprint) for fingerprint in fingerprints]
+        # 💡 [Phase 7.1] LARGE_PDF_PAGES 이하 문서는 빠진 페이지를 구간으로 나누지 않고 한 번에 요청
+        total_pages = len(fingerprints)
+        run_pages = total_pages if total_pages <= LARGE_PDF_PAGES else PAGES_PER_SHARD
+        runs = missing_runs(texts, max(1, run_pages))
+        if runs == [(0, total_pages)]:
+            shards = [{"start_page": 1, "end_page": total_pages, "data": file_bytes}]
+        else:
+            shards = [_write_pdf_pages(reader, start, end) for start, end in runs]
+    except Exception:
+        return None
+
+    if not fingerprints:
+        return None
+
+    reused = sum(1 for text in texts if text is not None)
+    failed = []
+
+    # 💡 [Phase 7.2] 이미 텍스트가 있는 페이지는 파싱을 기다리지 않고 바로 요약 시작
+    early_pages = early_map_pages(total_pages)
+    early_handle = handle.without_deadline() if handle else None
+    start_early_map(_page_sections(texts, early_pages), early_handle)
+
+    try:
+        for shard in iter_document_shards(file_name, file_bytes, shards=shards, handle=handle):
+            if on_shard:
+                on_shard(shard)
+            if not shard["success"]:
+                failed.append(shard)
+                continue
+
+            start = shard["start_page"] - 1
+            count = shard["end_page"] - start
+            page_texts = shard["page_texts"]
+            if page_texts and all(1 <= page <= count for page in page_texts):
+                for offset in range(count):
+                    text = page_texts.get(offset + 1, "")
+                    texts[start + offset] = text
+                    page_text_cache.put(fingerprints[start + offset], text)
+            else:
+                texts[start:start + count] = [shard["text"]] + [""] * (count - 1)
+            shard_pages = early_pages.intersection(range(start, start + count))
+            start_early_map(_page_sections(texts, shard_pages), early_handle)
     except Exception as e:
         return {
             "success": False,
@@ -492,16 +1032,1024 @@ def parse_document(uploaded_file) -> dict:
             "error": f"문서 처리 중 오류: {str(e)}"
         }
 
+    if failed and all(shard["deadline"] for shard in failed):
+        failed.sort(key=lambda shard: shard["start_page"])
+        pages = ", ".join(f"p.{s['start_page']}-{s['end_page']}" for s in failed)
+        handle.deadline.note(f"마감 시간 도달 → {file_name}의 {pages} 없이 추출한 페이지만 사용")
+        texts = [text or "" for text in texts]
+        failed = []
+
+    if failed:
+        failed.sort(key=lambda shard: shard["start_page"])
+        pages = ", ".join(f"p.{s['start_page']}-{s['end_page']}" for s in failed)
+        return {
+            "success": False,
+            "text": "",
+            "error": f"일부 페이지를 추출하지 못했습니다 ({pages}): {failed[0]['error']}"
+        }
+
+    combined = "\n".join(text.strip() for text in texts if text.strip())
+    if not combined:
+        return {
+            "success": False,
+            "text": "",
+            "error": "문서에서 텍스트를 추출할 수 없습니다."
+        }
+
+    return {
+        "success": True,
+        "text": combined,
+        "error": "",
+        "pages": [
+            {"page": index + 1, "hash": fingerprint, "text": text}
+            for index, (fingerprint, text) in enumerate(zip(fingerprints, texts))
+        ],
+        "reused_pages": reused
+    }
+
+
+# 💡 [Phase 6] 동시에 파싱할 최대 파일 수 (API 레이트 리밋 고려)
+MAX_PARSE_WORKERS = 4
+
+
+@profiled("analyzer.parse_documents")
+def parse_documents(uploaded_files: list, on_progress=None, max_workers: int = MAX_PARSE_WORKERS,
+                    handle: "CallHandle" = None) -> list:
+    """
+    💡 [Phase 6] 여러 문서를 동시에 파싱합니다.
+
+    파일별 요청은 제한된 크기의 스레드 풀에서 병렬로 실행되므로
+    전체 소요 시간은 가장 느린 파일 하나와 비슷합니다.
+
+    Args:
+        uploaded_files: Streamlit UploadedFile 객체 목록
+        on_progress: 파일 하나가 끝날 때마다 호출되는 콜백 (index, result).
+            호출한 스레드에서 실행되므로 Streamlit 요소를 갱신해도 됩니다.
+        max_workers: 동시에 실행할 최대 요청 수
+        handle: 💡 [Phase 23] 마감 시간이 있는 호출 핸들 (선택적, 모든 파일이 같은 마감을 공유)
+
+    Returns:
+        list: 업로드 순서대로 정렬된 parse_document 결과 목록.
+            각 결과에는 "name" (파일명)이 추가됩니다.
+    """
+    results = [None] * len(uploaded_files)
+    if not uploaded_files:
+        return results
+
+    workers = max(1, min(max_workers, len(uploaded_files)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(parse_document, uploaded_file, None, handle): index
+            for index, uploaded_file in enumerate(uploaded_files)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {
+                    "success": False,
+                    "text": "",
+                    "error": f"문서 처리 중 오류: {str(e)}"
+                }
+            result["name"] = uploaded_files[index].name
+            results[index] = result
+            if on_progress:
+                on_progress(index, result)
+
+    return results
+
+
+def combine_documents(documents: list) -> str:
+    """
+    💡 [Phase 6] 여러 문서의 텍스트를 출처가 표시된 하나의 텍스트로 합칩니다.
+
+    Args:
+        documents: {"name": str, "text": str} 딕셔너리 목록
+
+    Returns:
+        문서별 머리말이 붙은 통합 텍스트 (문서가 하나면 원문 그대로)
+    """
+    if len(documents) == 1:
+        return documents[0]["text"]
+
+    sections = []
+    for i, doc in enumerate(documents, start=1):
+        sections.append(f"[문서 {i}: {doc['name']}]\n{doc['text']}")
+    return "\n\n".join(sections)
+
 
 def get_supported_file_types() -> list:
     """지원하는 파일 확장자 목록을 반환합니다."""
     return list(SUPPORTED_FILE_TYPES.keys())
 
 
+# ============================================================
+# 💡 [Phase 13] 잘린 다관점 분석 이어쓰기
+# ============================================================
+
+# 이어쓰기 요청을 최대 몇 번까지 보낼지 (이어쓴 응답도 잘릴 수 있음)
+MAX_CONTINUATIONS = 2
+
+CONTINUATION_PROMPT = """앞선 분석이 길이 제한으로 중간에 끊겼습니다.
+
+아래 섹션만 앞과 같은 형식(핵심 내용 / 강점 / 한계)으로 작성해주세요.
+이미 작성된 섹션은 반복하지 말고, 다른 설명 없이 섹션 제목부터 바로 시작하세요.
+
+{remaining_sections}"""
+
+
+def split_perspective_sections(text: str) -> list:
+    """
+    💡 [Phase 13] 다관점 분석 결과를 관점 섹션별로 나눕니다.
+
+    "### 🔵 전통적 관점 ..."처럼 관점 이모지로 시작하는 제목 줄을 섹션 시작으로 봅니다.
+
+    Args:
+        text: 다관점 분석 결과
+
+    Returns:
+        list: {"key": 관점 키, "start": int, "end": int, "text": str} 목록 (등장 순서)
+    """
+    emoji_to_key = {info["emoji"]: key for key, info in PERSPECTIVES.items()}
+    # 긴 이모지부터 비교 (설정된 이모지끼리 앞부분이 겹칠 수 있음, 예: "❤"와 "❤️")
+    emojis = sorted(emoji_to_key, key=len, reverse=True)
+    heading = re.compile(
+        r"^#{1,4}\s*(" + "|".join(re.escape(emoji) for emoji in emojis) + r")",
+        re.MULTILINE
+    )
+
+    starts = []
+    for match in heading.finditer(text):
+        key = emoji_to_key[match.group(1)]
+        if all(key != seen for seen, _ in starts):
+            starts.append((key, match.start()))
+
+    sections = []
+    for i, (key, start) in enumerate(starts):
+        end = starts[i + 1][1] if i + 1 < len(starts) else len(text)
+        sections.append({"key": key, "start": start, "end": end, "text": text[start:end]})
+    return sections
+
+
+def _section_heading(perspective_key: str) -> str:
+    info = PERSPECTIVES[perspective_key]
+    return f"### {info['emoji']} {info['name']} (전형성: {info['typicality']})"
+
+
+def _continue_truncated_analysis(messages: list, content: str, handle: "CallHandle" = None,
+                                 keys: list = None) -> str:
+    """
+    잘린 다관점 분석에서 완성된 섹션은 그대로 두고, 끊긴 섹션과 빠진 섹션만 다시 요청해 이어 붙입니다.
+
+    이어쓰기 요청이 실패하면 지금까지 받은 내용을 그대로 반환합니다.
+    keys는 이번 분석에 쓴 관점 목록입니다. (시간 예산 때문에 줄였을 수 있음, 기본: 전체 관점)
+    """
+    keys = keys or list(PERSPECTIVES)
+    for _ in range(MAX_CONTINUATIONS):
+        sections = split_perspective_sections(content)
+        present = [section["key"] for section in sections]
+
+        if sections:
+            # 마지막 섹션은 끊긴 섹션이므로 그 앞까지만 완성된 내용으로 유지
+            complete = content[:sections[-1]["start"]].rstrip()
+            remaining = [present[-1]] + [key for key in keys if key not in present]
+        else:
+            complete = ""
+            remaining = list(keys)
+
+        continuation_messages = messages + [
+            {"role": "assistant", "content": complete or "(아직 작성된 섹션 없음)"},
+            {
+                "role": "user",
+                "content": CONTINUATION_PROMPT.format(
+                    remaining_sections="\n".join(_section_heading(key) for key in remaining)
+                )
+            }
+        ]
+
+        try:
+            response = _chat_completion(
+                TASK_CONTINUATION,
+                messages=continuation_messages,
+                input_chars=len(complete),
+                sections=len(remaining),
+                handle=handle
+            )
+        except CallCancelledError:
+            raise
+        except Exception:
+            return content
+
+        continuation = response["content"].strip()
+        content = f"{complete}\n\n{continuation}" if complete else continuation
+
+        if response["finish_reason"] != "length":
+            break
+
+    return content
+
+
+# ============================================================
+# 💡 [Phase 19] 겹치는 관점 섹션 다시 쓰기
+# ============================================================
+
+DIVERSIFY_PROMPT = """앞선 분석에서 {name} 섹션이 {other_name} 섹션과 거의 같은 내용을 반복했습니다.
+
+{name} 섹션만 다시 작성해주세요.
+- 이 관점은 "{description}"을 다룹니다.
+- {other_name}에서 이미 나온 주장, 근거, 예시는 다시 쓰지 말고 이 관점에서만 보이는 시각을 제시하세요.
+- 앞과 같은 형식(핵심 내용 / 강점 / 한계)을 지키고, 다른 설명 없이 섹션 제목부터 바로 시작하세요.
+
+{heading}"""
+
+# 중복 검사 집계 (프로세스 전체)
+_diversity_lock = threading.Lock()
+_diversity_stats = {
+    "checked": 0,
+    "redundant": 0,
+    "regenerated": 0,
+}
+
+
+@profiled("analyzer.diversify_sections")
+def _diversify_sections(messages: list, content: str, handle: "CallHandle" = None) -> str:
+    """
+    관점 섹션끼리의 유사도를 로컬에서 계산하고, 기준을 넘는 섹션만 다시 요청해 바꿔 끼웁니다.
+
+    다시 쓴 섹션이 원래보다 덜 겹칠 때만 교체하며, 요청이 실패하면 원래 섹션을 유지합니다.
+    """
+    sections = split_perspective_sections(content)
+    redundant = find_redundant_sections(sections) if len(sections) > 1 else []
+
+    with _diversity_lock:
+        _diversity_stats["checked"] += 1
+        _diversity_stats["redundant"] += len(redundant)
+
+    for item in redundant:
+        if not _has_time_for_optional_step(handle, "겹친 관점 섹션 다시 쓰기"):
+            break
+        key, other = item["key"], item["similar_to"]
+        rewrite_messages = messages + [
+            {"role": "assistant", "content": content},
+            {
+                "role": "user",
+                "content": DIVERSIFY_PROMPT.format(
+                    name=PERSPECTIVES[key]["name"],
+                    other_name=PERSPECTIVES[other]["name"],
+                    description=PERSPECTIVES[key]["description"],
+                    heading=_section_heading(key)
+                )
+            }
+        ]
+
+        try:
+            response = _chat_completion(
+                TASK_DIVERSIFY,
+                messages=rewrite_messages,
+                input_chars=len(content),
+                handle=handle
+            )
+        except CallCancelledError:
+            raise
+        except Exception:
+            continue
+
+        rewritten = [s for s in split_perspective_sections(response["content"].strip()) if s["key"] == key]
+        if not rewritten:
+            continue
+        new_text = rewritten[0]["text"].rstrip()
+
+        sections = split_perspective_sections(content)
+        target = next((s for s in sections if s["key"] == key), None)
+        if target is None:
+            continue
+        new_vector = section_vector(new_text)
+        new_similarity = max(
+            cosine_similarity(new_vector, section_vector(s["text"])) for s in sections if s["key"] != key
+        )
+        if new_similarity >= item["similarity"]:
+            continue
+
+        # 섹션 사이 빈 줄은 원래 섹션 끝의 공백을 그대로 살림
+        trailing = target["text"][len(target["text"].rstrip()):]
+        content = content[:target["start"]] + new_text + trailing + content[target["end"]:]
+        with _diversity_lock:
+            _diversity_stats["regenerated"] += 1
+
+    return content
+
+
+def get_diversity_stats() -> dict:
+    """💡 [Phase 19] 중복 검사 횟수, 중복으로 판정된 섹션 수, 다시 써서 바꾼 섹션 수를 반환합니다."""
+    with _diversity_lock:
+        return dict(_diversity_stats)
+
+
+# ============================================================
+# 💡 [Phase 16] 문서 구간 요약(map) / 종합 분석(reduce)
+# ============================================================
+
+# 동시에 보낼 구간 요약 요청 수
+MAX_MAP_WORKERS = 4
+
+# 요약 요청이 실패한 구간은 원문 앞부분을 대신 사용 (문자 수)
+MAP_FALLBACK_CHARS = 300
+
+# 💡 [Phase 16.1] 문서가 아무리 길어도 종합 분석 입력이 일정하도록
+# 질문과 관련된 구간만 요약하고(최대 구간 수), 요약을 합친 길이도 제한 (문자 수)
+MAX_MAP_SECTIONS = 24
+REDUCE_SUMMARY_CHARS = 6000
+
+# 💡 [Phase 23] 문서 분석에서 구간 요약(map)에 쓸 남은 시간의 비율 (나머지는 종합 분석)
+DOCUMENT_MAP_BUDGET_FRACTION = 0.5
+
+# 💡 [Phase 7.2] PDF 하나에서 파싱 중에 미리 요약할 최대 페이지 수 (0이면 끔)
+# 분석할 때 고를 구간 수와 같게 두면, 질문과 상관없이 고르는 고른 간격 구간은 대부분 미리 요약됨
+EARLY_MAP_PAGES = int(os.getenv("PRISM_EARLY_MAP_PAGES", MAX_MAP_SECTIONS))
+
+# 미리 요약은 세션과 상관없는 공용 스레드에서 실행 (파싱이 끝나도 남은 요약은 계속 진행)
+_early_map_executor = ThreadPoolExecutor(max_workers=MAX_MAP_WORKERS, thread_name_prefix="prism-early-map")
+# 완료 콜백이 등록하는 스레드에서 바로 실행될 수 있으므로 RLock
+_early_map_lock = threading.RLock()
+_early_map_pending = {}  # section_key → Future
+
+DOCUMENT_MAP_PROMPT = """다음은 긴 문서의 한 부분({label})입니다.
+이 부분의 핵심 내용을 3문장 이내로 요약해주세요.
+숫자, 일정, 담당자, 결정 사항처럼 구체적인 정보는 빠뜨리지 마세요.
+
+## 내용
+{section_text}"""
+
+DOCUMENT_REDUCE_INPUT = """[문서 분석 요청]
+
+질문: {question}
+
+## 문서 구간별 요약 ({coverage})
+{summaries}
+
+## 질문과 관련된 원문 구절
+{passages}"""
+
+
+def summarize_sections(sections: list, max_workers: int = MAX_MAP_WORKERS, handle: "CallHandle" = None) -> list:
+    """
+    문서 구간별 요약을 만듭니다. 같은 내용의 구간은 캐시된 요약을 재사용하므로
+    수정본에서는 바뀐 페이지만 요약 요청을 보냅니다.
+
+    Args:
+        sections: {"label", "text"} 목록 (revisions.document_sections 결과)
+        max_workers: 동시에 보낼 요약 요청 수
+        handle: 💡 [Phase 18] 취소용 호출 핸들 (선택적)
+
+    Returns:
+        list: {"label", "summary", "cached": bool} 목록 (입력 순서)
+    """
+    summaries = [None] * len(sections)
+    pending = {}
+    early = {}
+    for index, section in enumerate(sections):
+        key = section_key(section["text"])
+        cached = page_summary_cache.get(key)
+        if cached is not None:
+            summaries[index] = {"label": section["label"], "summary": cached, "cached": True}
+            continue
+        # 💡 [Phase 7.2] 파싱 중에 시작한 요약이 있으면 같은 요청을 다시 보내지 않음
+        # (아직 대기열에 있으면 취소하고 이 분석의 마감/취소 핸들로 직접 요청)
+        with _early_map_lock:
+            future = _early_map_pending.get(key)
+        if future is not None and not future.cancel():
+            early[index] = future
+        else:
+            pending[index] = section
+
+    if pending or early:
+        workers = max(1, min(max_workers, len(pending) + len(early)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_summarize_section, section, handle): index
+                for index, section in pending.items()
+            }
+            for index, future in early.items():
+                summary = _early_map_result(future, handle)
+                if summary is None:
+                    futures[executor.submit(_summarize_section, sections[index], handle)] = index
+                else:
+                    summaries[index] = {"label": sections[index]["label"], "summary": summary, "cached": True}
+            for future in as_completed(futures):
+                index = futures[future]
+                summaries[index] = {"label": sections[index]["label"], "summary": future.result(), "cached": False}
+
+        # 💡 [Phase 23] 마감 때문에 요약하지 못한 구간은 원문 앞부분으로 대신함
+        skipped = [index for index, summary in enumerate(summaries) if summary["summary"] is None]
+        for index in skipped:
+            summaries[index]["summary"] = sections[index]["text"][:MAP_FALLBACK_CHARS]
+        if skipped:
+            handle.deadline.note(f"시간 부족 → 구간 {len(skipped)}개는 요약 대신 원문 앞부분 사용")
+
+    return summaries
+
+
+def _summarize_section(section: dict, handle: "CallHandle" = None) -> str:
+    """구간 하나를 요약합니다. 마감이 이미 지났으면 요청하지 않고 None을 반환합니다."""
+    if handle and handle.deadline and handle.deadline.expired:
+        return None
+    messages = [
+        {"role": "system", "content": "당신은 문서의 핵심을 정확하게 요약하는 도우미입니다."},
+        {
+            "role": "user",
+            "content": DOCUMENT_MAP_PROMPT.format(label=section["label"], section_text=section["text"])
+        }
+    ]
+    try:
+        response = _chat_completion(
+            TASK_DOCUMENT_MAP,
+            messages=messages,
+            input_chars=len(section["text"]),
+            temperature=0.3,
+            handle=handle
+        )
+    except CallCancelledError:
+        raise
+    except Exception:
+        # 실패한 구간은 캐시하지 않고 원문 앞부분으로 대신함
+        return section["text"][:MAP_FALLBACK_CHARS]
+
+    summary = response["content"].strip()
+    page_summary_cache.put(section_key(section["text"]), summary)
+    return summary
+
+
+def early_map_pages(total_pages: int) -> set:
+    """
+    💡 [Phase 7.2] 파싱 중에 미리 요약할 페이지 번호(0부터)를 고릅니다.
+
+    EARLY_MAP_PAGES 이하 문서는 모든 페이지를, 그보다 긴 문서는 select_sections가
+    질문과 상관없이 채우는 위치와 같은 고른 간격의 페이지를 고릅니다.
+    """
+    if EARLY_MAP_PAGES <= 0:
+        return set()
+    if total_pages <= EARLY_MAP_PAGES:
+        return set(range(total_pages))
+    return {int(slot * total_pages / EARLY_MAP_PAGES) for slot in range(EARLY_MAP_PAGES)}
+
+
+def _page_sections(texts: list, pages) -> list:
+    """텍스트가 있는 페이지를 document_sections와 같은 {"label", "text"} 구간으로 만듭니다."""
+    return [
+        {"label": f"p.{index + 1}", "text": texts[index]}
+        for index in sorted(pages)
+        if texts[index] and texts[index].strip()
+    ]
+
+
+def start_early_map(sections: list, handle: "CallHandle" = None):
+    """
+    💡 [Phase 7.2] 구간 요약을 공용 스레드에서 미리 시작합니다.
+    이미 캐시에 있거나 요약 중인 구간은 건너뛰며, 결과는 page_summary_cache에 쌓여
+    문서 분석의 summarize_sections가 그대로 재사용합니다.
+    """
+    for section in sections:
+        key = section_key(section["text"])
+        if page_summary_cache.get(key) is not None:
+            continue
+        with _early_map_lock:
+            if key in _early_map_pending:
+                continue
+            future = _early_map_executor.submit(_summarize_section, section, handle)
+            _early_map_pending[key] = future
+        future.add_done_callback(lambda done, key=key: _finish_early_map(key, done))
+
+
+def _finish_early_map(key: str, future):
+    with _early_map_lock:
+        if _early_map_pending.get(key) is future:
+            del _early_map_pending[key]
+
+
+def _early_map_result(future, handle: "CallHandle" = None):
+    """미리 시작한 요약을 기다립니다. 마감이 지나거나 실패/취소되었으면 None (호출한 쪽에서 다시 요청)"""
+    timeout = handle.deadline.remaining if handle and handle.deadline else None
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        return None
+
+
+def join_summaries(summaries: list, max_chars: int = REDUCE_SUMMARY_CHARS) -> str:
+    """
+    💡 [Phase 16.1] 구간 요약을 한 줄씩 이어 붙입니다.
+    합친 길이가 max_chars를 넘으면 모든 요약을 같은 길이로 잘라 예산 안에 맞춥니다.
+    """
+    lines = [f"- [{s['label']}] {s['summary']}" for s in summaries]
+    if sum(len(line) + 1 for line in lines) <= max_chars:
+        return "\n".join(lines)
+    share = max(2, max_chars // max(1, len(lines)) - 1)
+    return "\n".join(line if len(line) <= share else line[:share - 1] + "…" for line in lines)
+
+
+@profiled("analyzer.analyze_document")
+def analyze_document(question: str, sections: list, passages: str = "", handle: "CallHandle" = None) -> str:
+    """
+    💡 [Phase 16] 긴 문서를 구간 요약(map) → 다관점 종합(reduce)으로 분석합니다.
+
+    구간 요약은 내용 해시로 캐시되고, 종합 입력(요약 + 관련 구절)이 이전과 같으면
+    종합 분석도 다시 요청하지 않습니다.
+    💡 [Phase 16.1] 구간은 질문과 관련된 MAX_MAP_SECTIONS개까지만 요약하고,
+    요약을 합친 길이는 REDUCE_SUMMARY_CHARS를 넘지 않습니다.
+
+    Args:
+        question: 사용자의 분석 질문 (비어 있으면 핵심 내용 분석)
+        sections: {"label", "text"} 목록
+        passages: 질문과 관련된 원문 구절 (retriever.select_passages 결과)
+        handle: 💡 [Phase 18] 취소용 호출 핸들 (선택적)
+
+    Returns:
+        관점별 분석 결과 (PERSPECTIVES 순서)
+    """
+    try:
+        # 💡 [Phase 23] 구간 요약에는 남은 시간의 절반만 쓰고 나머지는 종합 분석에 남김
+        map_handle = handle.stage(DOCUMENT_MAP_BUDGET_FRACTION) if handle else None
+        selected = select_sections(sections, question, MAX_MAP_SECTIONS)
+        summaries = summarize_sections([sections[index] for index in selected], handle=map_handle)
+        coverage = f"전체 {len(sections)}개 구간"
+        if len(selected) < len(sections):
+            coverage += f" 중 질문과 관련된 {len(selected)}개"
+        user_input = DOCUMENT_REDUCE_INPUT.format(
+            question=question.strip() or "이 문서의 핵심 내용을 다관점에서 분석해주세요.",
+            coverage=coverage,
+            summaries=join_summaries(summaries),
+            passages=passages or "(없음)"
+        )
+
+        cache_key = section_key(user_input)
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        content = _run_multi_perspective(user_input, TASK_DOCUMENT_REDUCE, handle)
+        if _cacheable(handle):
+            analysis_cache.put(cache_key, content)
+        return content
+
+    except CallCancelledError:
+        raise
+    except Exception as e:
+        return _handle_error(e)
+
+
+# ============================================================
+# 💡 [Phase 20] 질문 변형 매트릭스
+# ============================================================
+
+# 기본 질문 외에 한 번에 분석할 최대 변형 수
+MAX_VARIANTS = 6
+
+# 프로세스 전체에서 동시에 진행할 변형 분석 수 (여러 세션이 동시에 돌려도 API 한도를 넘지 않도록)
+VARIANT_CONCURRENCY = int(os.getenv("PRISM_VARIANT_CONCURRENCY", 8))
+_variant_slots = threading.BoundedSemaphore(VARIANT_CONCURRENCY)
+
+# 한도 초과(429) 응답을 받으면 이 간격(초)을 두 배씩 늘리며 다시 시도
+RATE_LIMIT_RETRIES = 2
+RATE_LIMIT_BACKOFF_SECONDS = 2.0
+
+# 💡 기본 질문을 앞에 두고 변형 조건을 뒤에 붙여서, 모든 변형의 요청 앞부분
+# (시스템 메시지 + 분석 프롬프트 + 기본 질문)이 같게 유지됨 → 서버 측 프롬프트 캐시 공유
+VARIANT_INPUT = """{base_query}
+
+[조건] {variant}"""
+
+
+def compose_variant_query(base_query: str, variant: str) -> str:
+    """기본 질문에 변형 조건을 붙인 분석 입력을 만듭니다. (변형이 비어 있으면 기본 질문 그대로)"""
+    if not variant.strip():
+        return base_query
+    return VARIANT_INPUT.format(base_query=base_query.strip(), variant=variant.strip())
+
+
+@profiled("analyzer.analyze_variants")
+def analyze_variants(
+    base_query: str,
+    variants: list,
+    on_progress=None,
+    handle: "CallHandle" = None
+) -> list:
+    """
+    기본 질문과 그 변형들을 동시에 다관점 분석합니다.
+
+    변형마다 결과를 내용 해시로 캐시하므로, 변형 하나를 바꿔 다시 돌리면 나머지는 재사용되고
+    전체 소요 시간은 가장 느린 변형 하나와 비슷합니다.
+
+    Args:
+        base_query: 기본 질문
+        variants: 변형 조건 목록 (예: "사회 초년생", "10년 차 관리자", 최대 MAX_VARIANTS개)
+        on_progress: 변형 하나가 끝날 때마다 호출할 함수 (완료 수, 전체 수)
+        handle: 💡 [Phase 18] 취소용 호출 핸들 (선택적)
+
+    Returns:
+        list: {"variant", "query", "result", "sections": {관점 키: 섹션 텍스트}, "cached": bool} 목록
+              (첫 행은 기본 질문, 이후 입력 순서)
+    """
+    unique = []
+    for variant in variants:
+        variant = variant.strip()
+        if variant and variant not in unique:
+            unique.append(variant)
+
+    rows = [{"variant": variant, "query": compose_variant_query(base_query, variant)}
+            for variant in [""] + unique[:MAX_VARIANTS]]
+
+    with ThreadPoolExecutor(max_workers=len(rows)) as executor:
+        futures = {executor.submit(_analyze_variant, row["query"], handle): row for row in rows}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            row = futures[future]
+            row["result"], row["cached"] = future.result()
+            row["sections"] = {
+                section["key"]: section["text"].strip()
+                for section in split_perspective_sections(row["result"])
+            }
+            if on_progress:
+                on_progress(completed, len(rows))
+
+    return rows
+
+
+def _analyze_variant(query: str, handle: "CallHandle" = None) -> tuple:
+    """변형 하나를 분석합니다. (결과, 캐시 재사용 여부)를 반환하며 실패하면 오류 메시지를 결과로 돌려줍니다."""
+    cache_key = _analysis_cache_key(query)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached, True
+
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            with _variant_slots:
+                content = _run_multi_perspective(query, TASK_MULTI_PERSPECTIVE, handle)
+        except CallCancelledError:
+            raise
+        except RateLimitError as e:
+            if attempt == RATE_LIMIT_RETRIES or not _has_time_for_optional_step(handle, "한도 초과 재시도"):
+                return _handle_error(e), False
+            time.sleep(RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt)
+            if handle:
+                handle.check()
+            continue
+        except Exception as e:
+            return _handle_error(e), False
+
+        if _cacheable(handle):
+            analysis_cache.put(cache_key, content)
+        return content, False
+
+
 # ============================================================
 # 헬퍼 함수
 # ============================================================
 
+def _chat_completion(task: str, messages: list, input_chars: int = 0, temperature: float = 0.7,
+                     sections: int = 0, handle: "CallHandle" = None) -> dict:
+    """
+    💡 [Phase 8] 라우팅 정책에 따라 모델과 max_tokens를 골라 Solar API를 호출합니다.
+
+    💡 [Phase 18] 응답을 스트리밍으로 받으므로, 핸들이 취소되면 받는 도중에 연결을 끊고
+    CallCancelledError를 발생시킵니다. (남은 토큰은 생성/과금되지 않음)
+
+    💡 [Phase 22] sections에 생성할 관점 섹션 수를 넘기면 max_tokens가 섹션 수에 비례해 늘어납니다.
+
+    호출 지연 시간과 성공 여부는 라우터의 모델별 통계에 기록됩니다.
+    예외는 그대로 다시 발생시키므로 호출한 쪽에서 _handle_error로 처리합니다.
+
+    Returns:
+        dict: {"content": str, "finish_reason": str, "model": str}
+    """
+    if handle:
+        handle.check()
+
+    # 💡 [Phase 23] 남은 시간 예산에 맞춰 모델/max_tokens를 고르고, 마감이 지나면 받은 데까지만 씀
+    deadline = handle.deadline if handle else None
+    time_budget = deadline.remaining if deadline else None
+    decision = router.route(task, input_chars, sections, time_budget)
+    for reason in decision["degraded"]:
+        deadline.note(reason)
+
+    request_options = {"timeout": max(time_budget, MIN_GENERATION_SECONDS)} if deadline else {}
+    started = time.perf_counter()
+    parts = []
+    finish_reason = None
+    stream = None
+    credential = None
+    status = 200
+    try:
+        stream, credential = _open_stream(dict(
+            model=decision["model"],
+            messages=messages,
+            temperature=temperature,
+            max_tokens=decision["max_tokens"],
+            stream=True,
+            **request_options
+        ))
+        if handle:
+            handle.attach(stream)
+        for chunk in stream:
+            if handle and handle.cancelled:
+                break
+            if deadline and deadline.expired and parts:
+                finish_reason = "deadline"
+                break
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta and choice.delta.content:
+                parts.append(choice.delta.content)
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+    except Exception as e:
+        # 취소로 연결을 끊은 경우는 모델/키 오류로 집계하지 않음
+        if not (handle and handle.cancelled):
+            status = getattr(e, "status_code", None) or 0
+            router.record(decision["model"], time.perf_counter() - started, success=False)
+            raise
+    finally:
+        if handle and stream is not None:
+            handle.detach(stream)
+        if credential is not None:
+            credential_pool.release(credential, status)
+
+    if handle and handle.cancelled:
+        if stream is not None:
+            stream.close()
+        _record_cancelled_call(decision, messages, received_chunks=len(parts))
+        raise CallCancelledError("더 이상 필요 없는 요청이라 중단했습니다.")
+
+    if finish_reason == "deadline":
+        # 중간에 끊은 호출은 모델 지연 시간 통계에 넣지 않음 (실제보다 빠르게 집계되므로)
+        stream.close()
+        deadline.note("마감 시간 도달 → 생성 중이던 응답을 받은 데까지만 사용")
+        return {"content": "".join(parts), "finish_reason": finish_reason, "model": decision["model"]}
+
+    router.record(decision["model"], time.perf_counter() - started, success=True, sections=sections)
+    return {"content": "".join(parts), "finish_reason": finish_reason, "model": decision["model"]}
+
+
+def _open_stream(request: dict) -> tuple:
+    """
+    💡 [Phase 24] 키 풀에서 부하가 가장 적은 키로 스트리밍 요청을 엽니다.
+
+    한도 초과(429)나 인증 실패(401)면 그 키를 쉬게 하고, 쉬지 않는 다른 키가 있으면 그 키로 다시 보냅니다.
+
+    Returns:
+        (stream, credential): 응답을 다 받으면 credential_pool.release(credential, ...)로 키를 돌려줘야 함
+    """
+    attempts = max(1, len(credential_pool))
+    for attempt in range(attempts):
+        credential = credential_pool.acquire()
+        try:
+            return credential.client.chat.completions.create(**request), credential
+        except (RateLimitError, AuthenticationError) as e:
+            credential_pool.release(credential, e.status_code, retry_after_seconds(e.response.headers))
+            if attempt == attempts - 1 or not credential_pool.has_available():
+                raise
+        except Exception as e:
+            credential_pool.release(credential, getattr(e, "status_code", None) or 0)
+            raise
+
+
+# ============================================================
+# 💡 [Phase 18] 호출 취소
+# ============================================================
+
+class CallCancelledError(Exception):
+    """CallHandle이 취소되어 호출을 중단했을 때 발생합니다."""
+
+
+class CallHandle:
+    """
+    취소할 수 있는 호출 묶음.
+
+    작업 하나(분석, 심화 탐색, 비교 등)가 보내는 모든 Solar 호출이 같은 핸들을 공유합니다.
+    cancel()을 부르면 아직 시작하지 않은 호출은 보내지 않고,
+    받고 있는 스트리밍 응답은 닫아서 HTTP 연결까지 끊습니다.
+
+    💡 [Phase 23] deadline(deadline.Deadline)을 주면 호출마다 남은 시간에 맞춰 품질을 조정합니다.
+    """
+
+    def __init__(self, deadline=None):
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._streams = set()
+        self.deadline = deadline
+
+    def stage(self, fraction: float) -> "CallHandle":
+        """
+        남은 시간의 fraction만큼만 쓰는 단계용 핸들을 만듭니다.
+        취소 상태와 진행 중인 스트림은 원래 핸들과 공유하므로 cancel()은 양쪽에 모두 적용됩니다.
+        """
+        if self.deadline is None:
+            return self
+        child = CallHandle.__new__(CallHandle)
+        child._lock = self._lock
+        child._cancelled = self._cancelled
+        child._streams = self._streams
+        child.deadline = self.deadline.stage(fraction)
+        return child
+
+    def without_deadline(self) -> "CallHandle":
+        """
+        💡 [Phase 7.2] 취소 상태만 공유하고 마감은 없는 핸들을 만듭니다.
+        (파싱 단계의 마감이 미리 시작한 요약까지 끊지 않도록)
+        """
+        child = CallHandle.__new__(CallHandle)
+        child._lock = self._lock
+        child._cancelled = self._cancelled
+        child._streams = self._streams
+        child.deadline = None
+        return child
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """핸들을 취소하고 진행 중인 스트리밍 응답을 모두 닫습니다. (어느 스레드에서든 호출 가능)"""
+        self._cancelled.set()
+        with self._lock:
+            streams = list(self._streams)
+        for stream in streams:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def check(self):
+        """취소되었으면 CallCancelledError를 발생시킵니다."""
+        if self.cancelled:
+            raise CallCancelledError("더 이상 필요 없는 요청이라 중단했습니다.")
+
+    def attach(self, stream):
+        """진행 중인 스트리밍 응답을 등록합니다. 이미 취소되었으면 바로 닫습니다."""
+        with self._lock:
+            self._streams.add(stream)
+        if self.cancelled:
+            stream.close()
+
+    def detach(self, stream):
+        with self._lock:
+            self._streams.discard(stream)
+
+
+# 취소된 호출 집계 (프로세스 전체)
+_cancel_lock = threading.Lock()
+_cancel_stats = {
+    "cancelled_calls": 0,
+    "wasted_prompt_chars": 0,
+    "wasted_output_tokens": 0,
+    "avoided_output_tokens": 0,
+}
+
+
+def _record_cancelled_call(decision: dict, messages: list, received_chunks: int):
+    """
+    취소된 호출의 낭비량을 기록합니다.
+
+    스트리밍 청크 하나가 대략 토큰 하나이므로, 받은 청크 수를 버린 출력 토큰으로,
+    max_tokens에서 뺀 나머지를 생성하지 않아 아낀 출력 토큰(최대치)으로 셉니다.
+    """
+    with _cancel_lock:
+        _cancel_stats["cancelled_calls"] += 1
+        _cancel_stats["wasted_prompt_chars"] += sum(len(str(m.get("content", ""))) for m in messages)
+        _cancel_stats["wasted_output_tokens"] += received_chunks
+        _cancel_stats["avoided_output_tokens"] += max(0, decision["max_tokens"] - received_chunks)
+
+
+def get_cancellation_stats() -> dict:
+    """💡 [Phase 18] 취소된 호출 수와 버린/아낀 토큰 추정치를 반환합니다."""
+    with _cancel_lock:
+        return dict(_cancel_stats)
+
+
+# ============================================================
+# 💡 [Phase 25] 캐시 스냅샷
+# 새 인스턴스가 PRISM_CACHE_SNAPSHOT 파일을 불러오면 자주 묻는 질문을 첫 요청부터 캐시로 응답합니다.
+# ============================================================
+
+# Document Parse 요청 옵션 (바뀌면 이전에 추출한 페이지 텍스트를 쓰지 않음)
+DOCUMENT_PARSE_VERSION = "document-parse/ocr=force"
+
+# 캐시별 버전: 결과를 만든 프롬프트 템플릿의 해시 (관점 설정이 바뀌어도 달라짐)
+CACHE_VERSIONS = {
+    "analysis": content_hash("\n".join([
+        MULTI_PERSPECTIVE_PREFIX, DOCUMENT_REDUCE_INPUT, CONTINUATION_PROMPT, DIVERSIFY_PROMPT
+    ])),
+    "summary": content_hash(DOCUMENT_MAP_PROMPT),
+    "page_text": content_hash(DOCUMENT_PARSE_VERSION),
+}
+
+# 운영 중인 인스턴스에서 내보낼 때의 기본 경로
+SNAPSHOT_EXPORT_PATH = os.getenv("PRISM_CACHE_SNAPSHOT_EXPORT", "prism_cache.snapshot")
+
+# 💡 [Phase 25.1] 이 파일이 생기면 운영 중인 인스턴스가 내보냄 (snapshots.py export가 만듦)
+# 💡 [Phase 25.2] 설정하지 않으면 요청 파일을 확인하지 않음 (내보내기를 허용할 인스턴스에서만 설정)
+SNAPSHOT_TRIGGER_PATH = os.getenv("PRISM_CACHE_SNAPSHOT_TRIGGER")
+
+_trigger_lock = threading.Lock()
+_trigger_watcher = None
+
+
+def _load_startup_snapshot() -> dict:
+    """PRISM_CACHE_SNAPSHOT 스냅샷을 불러옵니다. 실패해도 앱은 빈 캐시로 시작합니다."""
+    path = os.getenv("PRISM_CACHE_SNAPSHOT")
+    if not path:
+        return {}
+    try:
+        return load_snapshot(path, CACHE_VERSIONS)
+    except (OSError, ValueError) as e:
+        return {"path": path, "error": str(e)}
+
+
+_snapshot_info = _load_startup_snapshot()
+
+
+def get_snapshot_info() -> dict:
+    """
+    시작할 때 불러온 스냅샷 정보를 반환합니다. (없으면 빈 딕셔너리)
+
+    Returns:
+        dict: {"path", "created_at", "loaded": {캐시 이름: 항목 수}, "rejected": [...]} 또는 {"path", "error"}
+    """
+    return dict(_snapshot_info)
+
+
+def export_cache_snapshot(path: str = None) -> dict:
+    """
+    지금 캐시 내용(불러온 스냅샷 포함)을 스냅샷 파일로 저장합니다. (운영 중인 인스턴스에서 호출 가능)
+
+    Returns:
+        dict: {"path", "bytes", "entries": {캐시 이름: 항목 수}}
+    """
+    return write_snapshot(path or SNAPSHOT_EXPORT_PATH, CACHE_VERSIONS)
+
+
+def export_requested_snapshot(output: str = None) -> dict:
+    """
+    💡 [Phase 25.2] 요청 파일로 들어온 내보내기를 처리합니다.
+
+    요청 파일은 앱 밖에서 쓰는 파일이므로 저장 경로를 그대로 믿지 않고,
+    SNAPSHOT_EXPORT_PATH가 있는 디렉터리 안의 .snapshot 파일 이름만 받습니다.
+
+    Raises:
+        ValueError: 디렉터리가 포함된 경로이거나 .snapshot 파일이 아닌 경우
+    """
+    if not output:
+        return export_cache_snapshot()
+    if os.path.basename(output) != output or output in (".", "..") or not output.endswith(SNAPSHOT_SUFFIX):
+        raise ValueError(f"요청으로는 스냅샷 디렉터리 안의 *{SNAPSHOT_SUFFIX} 파일 이름만 지정할 수 있습니다: {output}")
+    directory = os.path.dirname(os.path.abspath(SNAPSHOT_EXPORT_PATH))
+    return export_cache_snapshot(os.path.join(directory, output))
+
+
+def start_snapshot_trigger_watch() -> ExportTriggerWatcher:
+    """
+    💡 [Phase 25.1] SNAPSHOT_TRIGGER_PATH 요청 파일을 확인하는 백그라운드 스레드를 시작합니다.
+    (앱 프로세스에서 호출, 여러 번 불러도 한 번만 시작)
+
+    💡 [Phase 25.2] PRISM_CACHE_SNAPSHOT_TRIGGER를 설정하지 않았으면 시작하지 않고 None을 반환합니다.
+    """
+    global _trigger_watcher
+    if not SNAPSHOT_TRIGGER_PATH:
+        return None
+    with _trigger_lock:
+        if _trigger_watcher is None:
+            _trigger_watcher = ExportTriggerWatcher(SNAPSHOT_TRIGGER_PATH, export_requested_snapshot)
+            _trigger_watcher.start()
+        return _trigger_watcher
+
+
+def precompute_analysis(query: str) -> tuple:
+    """
+    질문 하나를 분석해 캐시에 넣습니다. (snapshots.py precompute용)
+
+    Returns:
+        tuple: (성공 여부, 이미 캐시에 있었는지)
+    """
+    if analysis_cache.get(_analysis_cache_key(query)) is not None:
+        return True, True
+    analyze_multi_perspective(query)
+    return analysis_cache.get(_analysis_cache_key(query)) is not None, False
+
+
+def get_credential_stats() -> list:
+    """💡 [Phase 24] API 키별 호출 수, 진행 중인 호출, 한도 초과/인증 실패, 쉬는 시간을 반환합니다."""
+    return credential_pool.get_stats()
+
+
+def get_routing_stats() -> dict:
+    """💡 [Phase 8] 모델별 지연 시간/오류율과 최근 라우팅 결정을 반환합니다."""
+    return {
+        "models": router.get_stats(),
+        "decisions": router.get_decisions()
+    }
+
+
 def _handle_error(e: Exception) -> str:
     """에러를 사용자 친화적 메시지로 변환합니다."""
     error_message = str(e)
@@ -7,17 +7,82 @@ PRISM-Lite: Streamlit 웹 인터페이스
 - Phase 2-A: 관점별 심화 탐색
 - Phase 3: 결과 내보내기 (마크다운 다운로드)
 - Phase 4: Document Parse API 연동 (문서 업로드)
+- Phase 5: 질문 기반 문서 구절 검색 (BM25)
+- Phase 6: 여러 문서 동시 업로드/파싱
+- Phase 7: 대용량 PDF 구간별 진행 상황 표시
+- Phase 9: 큰 세션 데이터를 디스크 저장소로 이전 (세션 상태에는 참조만)
+- Phase 10: rerun 프로파일링 디버그 패널 (PRISM_PROFILE)
+- Phase 11: fragment 단위 부분 rerun (입력 탭, 심화 탐색 대화 영역)
+- Phase 12: 분석/파싱을 백그라운드 작업으로 실행 (rerun·재접속에도 유지)
+- Phase 14: 관점 비교 모드 (여러 관점 동시 심화 탐색, 관점별 히스토리 유지)
+- Phase 16: 문서 수정본 증분 처리 (바뀐 페이지만 다시 파싱/요약, 변경 사항 표시)
+- Phase 17: 업로드 전 사전 점검 결과 표시 (이미지 축소, 형식 불일치)
+- Phase 18: 버려진 작업의 진행 중인 Solar 호출 취소
+- Phase 20: 질문 변형 매트릭스 (변형 × 관점 표)
+- Phase 21: 긴 문서 미리보기 쪽 나눔, 대화 히스토리 최근 구간만 표시
+- Phase 22: 설정된 관점 수(4~20개)에 맞춰 헤더/버튼/매트릭스 표시
+- Phase 23: 작업별 시간 예산(SLO), 시간 때문에 품질을 낮춘 내역 표시
+- Phase 24: API 키별 사용량 표시 (프로파일러 패널)
+- Phase 25: 캐시 스냅샷 내보내기 버튼, 시작할 때 불러온 스냅샷 정보 (프로파일러 패널)
+- Phase 25.1: 프로파일러와 무관하게 요청 파일로 스냅샷 내보내기 (snapshots.py export)
+- Phase 25.2: 요청 파일 확인은 PRISM_CACHE_SNAPSHOT_TRIGGER를 설정한 인스턴스에서만
+- Phase 10.1: fragment 단독 rerun도 프로파일러에 rerun으로 기록
+- Phase 9.1: 세션 데이터가 정리된 뒤 돌아온 세션은 관련 상태를 초기화하고 만료 안내
+- Phase 12.1: 세션 ID를 URL(?sid=)에 남겨 새로 고침/재연결한 탭이 이전 세션의 데이터와 작업을 이어받음
+- Phase 11.1: 추가 질문은 대화 영역 fragment 안에서 제출/대기/반영 (전체 rerun 없이)
+- Phase 11.2: 헤더 문구와 내보내기 마크다운을 내용 기준으로 캐시 (rerun마다 다시 만들지 않음)
 """
 
+import json
+import re
+import time
+import uuid
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from datetime import datetime
 from analyzer import (
     analyze_multi_perspective,
+    analyze_document,
     deep_dive_perspective,
+    deep_dive_many,
+    analyze_variants,
     get_all_perspectives,
     parse_document,
+    parse_documents,
+    combine_documents,
     get_supported_file_types,
-    PERSPECTIVES
+    get_routing_stats,
+    get_cancellation_stats,
+    get_credential_stats,
+    get_snapshot_info,
+    export_cache_snapshot,
+    start_snapshot_trigger_watch,
+    get_diversity_stats,
+    CallHandle,
+    PERSPECTIVES,
+    MAX_COMPARE_PERSPECTIVES,
+    MAX_VARIANTS
+)
+from deadline import Deadline, ANALYSIS_SLO_SECONDS, PARSE_SLO_SECONDS
+from retriever import content_hash, get_index, select_passages, DEFAULT_CONTEXT_CHARS
+from revisions import diff_revisions, document_sections
+from session_store import blob_store
+from jobs import (
+    job_manager,
+    report_progress,
+    JobQueueFullError,
+    ACTIVE_STATUSES,
+    STATUS_DONE,
+)
+from profiler import (
+    profiled,
+    profile_rerun,
+    profiled_rerun,
+    get_summary,
+    get_cprofile_text,
+    dump as dump_profile,
+    PROFILE_ENABLED,
+    DUMP_PATH,
 )
 
 # ============================================================
@@ -32,28 +97,161 @@ st.set_page_config(
 # ============================================================
 # 세션 상태 초기화
 # ============================================================
+
+# 💡 [Phase 9] blob_store에 두는 세션 데이터 (세션 상태에는 "<이름>_ref"로 참조만 저장)
+BLOB_KEYS = (
+    "last_result",
+    "deep_dive_histories",
+    "variant_results",
+    "extracted_text",
+    "extracted_documents",
+    "document_diff",
+)
+
+SESSION_EXPIRED_MESSAGE = "⏰ 오랫동안 사용하지 않아 이 세션의 분석 결과와 문서가 정리되었습니다. 다시 분석해 주세요."
+
+# 💡 [Phase 12.1] 세션 ID를 URL에 남겨 새로 고침/재연결한 탭이 같은 세션을 이어받음
+SESSION_QUERY_PARAM = "sid"
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+# 화면을 되살리는 데 필요한 작은 상태 (blob_store의 SESSION_VIEW_SLOT 슬롯에 rerun마다 저장)
+SESSION_VIEW_SLOT = "session_view"
+SESSION_VIEW_KEYS = (
+    "last_query",
+    "uploaded_file_name",
+    "document_errors",
+    "mode",
+    "selected_perspective",
+    "compare_perspectives",
+)
+
+
+def restore_session(session_id: str):
+    """
+    [Phase 12.1] 새로 연결한 탭에 이전 세션의 데이터 참조, 화면 상태, 진행 중인 작업을 다시 연결합니다.
+
+    Args:
+        session_id: URL에서 읽은 세션 ID (blob_store에 남아 있는 세션)
+    """
+    slots = blob_store.get_slots(session_id)
+    for key in BLOB_KEYS:
+        st.session_state[f"{key}_ref"] = slots.get(key)
+    view = blob_store.get(session_id, slots.get(SESSION_VIEW_SLOT)) or {}
+    for key in SESSION_VIEW_KEYS:
+        if key in view:
+            st.session_state[key] = view[key]
+    # 끝났지만 가져가지 않은 작업도 포함되므로 render_job_status가 그대로 결과를 반영함
+    st.session_state.jobs = job_manager.find_session_jobs(session_id)
+
+
+def save_session_view():
+    """[Phase 12.1] 화면 상태를 저장해 둡니다. (내용이 같으면 해시만 비교하고 끝남)"""
+    view = {key: st.session_state[key] for key in SESSION_VIEW_KEYS}
+    blob_store.put(st.session_state.session_id, SESSION_VIEW_SLOT, view)
+
+
 def init_session_state():
     """세션 상태 초기화"""
     defaults = {
         "user_input": "",
-        "last_result": None,
+        "last_result_ref": None,
         "last_query": "",
-        "is_analyzing": False,
         # Phase 2: 심화 탐색 관련 상태
-        "mode": "analysis",  # "analysis" | "deep_dive"
+        "mode": "analysis",  # "analysis" | "deep_dive" | "compare" | "variants"
         "selected_perspective": None,
-        "deep_dive_result": None,
-        "deep_dive_history": [],
+        # Phase 14: 관점별로 분리된 대화 히스토리 {관점 키: [메시지, ...]}
+        "deep_dive_histories_ref": None,
+        "compare_perspectives": [],  # 비교 모드에서 함께 탐색 중인 관점 키 목록
+        # Phase 20: 질문 변형 매트릭스 결과 (analyze_variants 결과 목록)
+        "variant_results_ref": None,
+        # Phase 21: 대화 창별로 표시 중인 최근 메시지 수 {창 키: 개수}
+        "history_windows": {},
         # Phase 4: 문서 업로드 관련 상태
-        "extracted_text": None,  # Document Parse로 추출한 텍스트
+        "extracted_text_ref": None,  # Document Parse로 추출한 텍스트
         "uploaded_file_name": None,  # 업로드된 파일명
+        # Phase 6: 여러 문서 업로드
+        "extracted_documents_ref": None,  # 파일별 {"name", "text", "pages"} 목록 (업로드 순서)
+        "document_errors": [],  # 파일별 추출 실패 메시지
+        # Phase 16: 이전 판과 비교한 변경 사항 (문서별 diff_revisions 결과)
+        "document_diff_ref": None,
+        # Phase 9: 큰 데이터는 blob_store에 두고 *_ref에는 내용 해시만 저장
+        "session_id": None,
+        # Phase 12: 진행 중인 백그라운드 작업 (슬롯 → 작업 ID)
+        "jobs": {},
+        # Phase 11.1: 추가 질문을 제출한 대화 영역이 다음 fragment rerun에서 기다릴 작업 슬롯
+        "waiting_job_slot": None,
+        # Phase 23: 끝난 작업의 시간 예산 사용 내역 (슬롯 → {"elapsed", "slo", "notes"})
+        "degradations": {},
+        # Phase 9.1: 저장소에서 세션 데이터가 정리된 것을 확인함 (다음 화면에서 초기화하고 안내)
+        "session_expired": False,
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
+    if not st.session_state.session_id:
+        # 💡 [Phase 12.1] 새 연결: URL에 세션 ID가 있으면 그 세션을 이어받음
+        previous_id = st.query_params.get(SESSION_QUERY_PARAM, "")
+        if SESSION_ID_PATTERN.fullmatch(previous_id):
+            st.session_state.session_id = previous_id
+            if blob_store.has_session(previous_id):
+                restore_session(previous_id)
+            else:
+                st.session_state.session_expired = True
+        else:
+            st.session_state.session_id = uuid.uuid4().hex
+        st.query_params[SESSION_QUERY_PARAM] = st.session_state.session_id
+
+    # 💡 [Phase 9.1] 참조가 남아 있는데 저장소에 세션이 없으면 방치되어 정리된 세션 (touch 전에 확인)
+    has_refs = any(st.session_state.get(f"{key}_ref") for key in BLOB_KEYS)
+    if has_refs and not blob_store.has_session(st.session_state.session_id):
+        st.session_state.session_expired = True
+    blob_store.touch(st.session_state.session_id)
+
 init_session_state()
 
+# 💡 [Phase 25.1] 프로파일러를 켜지 않아도 snapshots.py export로 이 인스턴스의 캐시를 내보낼 수 있게
+# (💡 [Phase 25.2] PRISM_CACHE_SNAPSHOT_TRIGGER를 설정한 인스턴스만, 설정이 없으면 아무것도 하지 않음)
+start_snapshot_trigger_watch()
+
+# 💡 [Phase 12] 진행 중인 작업 상태를 다시 확인하는 주기 (초)
+JOB_POLL_SECONDS = 1.0
+
+# 💡 [Phase 21] rerun마다 브라우저로 보내는 양이 문서/대화 길이와 무관하게 일정하도록
+PREVIEW_PAGE_CHARS = 5000      # 추출된 텍스트 미리보기 한 쪽의 길이 (문자 수)
+HISTORY_WINDOW_MESSAGES = 6    # 대화 창에 처음 보여줄 최근 메시지 수 (더 보기마다 이만큼 추가)
+
+# 💡 [Phase 22] 관점이 이보다 많으면 헤더에서 설명 없이 한 줄로, 매트릭스는 고른 관점만 표시
+HEADER_LIST_LIMIT = 6
+MATRIX_DEFAULT_COLUMNS = 4
+
+# 💡 [Phase 11.2] 내보내기 마크다운 캐시 크기 (프로세스 전체, 결과/대화 내용 해시 기준)
+EXPORT_CACHE_ENTRIES = 64
+
+
+# ============================================================
+# [Phase 9] 세션 데이터 저장소 접근
+# ============================================================
+def current_session_id() -> str:
+    """현재 세션 ID (💡 [Phase 10.1] fragment rerun 측정용)"""
+    return st.session_state.session_id
+
+
+def load_blob(key: str, default=None):
+    """세션 데이터 저장소에서 값을 읽습니다. (예: "last_result")"""
+    ref = st.session_state.get(f"{key}_ref")
+    value = blob_store.get(st.session_state.session_id, ref)
+    if ref and value is None:
+        # 💡 [Phase 9.1] 참조만 남고 데이터는 정리됨 → 세션 만료로 처리
+        expire_session()
+        return default
+    return default if value is None else value
+
+
+def save_blob(key: str, value):
+    """세션 데이터 저장소에 값을 저장하고 참조만 세션 상태에 남깁니다. None이면 삭제합니다."""
+    st.session_state[f"{key}_ref"] = blob_store.put(st.session_state.session_id, key, value)
+
 
 # ============================================================
 # 헬퍼 함수들
@@ -65,55 +263,603 @@ def set_example(example_text: str):
 
 
 def reset_to_analysis():
-    """분석 모드로 돌아가기"""
+    """분석 모드로 돌아가기 (관점별 대화 히스토리는 유지)"""
+    discard_job("deep_dive")
+    discard_job("compare")
     st.session_state.mode = "analysis"
     st.session_state.selected_perspective = None
-    st.session_state.deep_dive_result = None
-    st.session_state.deep_dive_history = []
+    st.session_state.compare_perspectives = []
 
 
 def start_new_analysis():
     """새로운 분석 시작 (전체 초기화)"""
-    st.session_state.last_result = None
+    discard_job("analysis")
+    save_blob("last_result", None)
     st.session_state.last_query = ""
-    st.session_state.extracted_text = None
+    save_blob("extracted_text", None)
     st.session_state.uploaded_file_name = None
+    save_blob("extracted_documents", None)
+    save_blob("document_diff", None)
+    st.session_state.document_errors = []
+    save_blob("deep_dive_histories", None)
+    discard_job("variants")
+    save_blob("variant_results", None)
     reset_to_analysis()
 
 
+def expire_session():
+    """
+    [Phase 9.1] 데이터가 정리된 세션의 참조와 그에 딸린 상태(모드, 대화, 문서 정보)를 초기화하고 알립니다.
+    """
+    st.session_state.session_expired = False
+    for key in BLOB_KEYS:
+        st.session_state[f"{key}_ref"] = None
+    start_new_analysis()
+    st.session_state.history_windows = {}
+    st.warning(SESSION_EXPIRED_MESSAGE)
+
+
 def select_perspective(perspective_key: str):
-    """관점 선택하여 심화 탐색 모드로 전환"""
+    """관점 선택하여 심화 탐색 모드로 전환 (이전에 나눈 대화가 있으면 이어서 표시)"""
+    discard_job("deep_dive")
+    discard_job("compare")
     st.session_state.mode = "deep_dive"
     st.session_state.selected_perspective = perspective_key
-    st.session_state.deep_dive_result = None
-    st.session_state.deep_dive_history = []
+    st.session_state.compare_perspectives = []
+
+
+def start_comparison(perspective_keys: list):
+    """[Phase 14] 여러 관점을 나란히 탐색하는 비교 모드로 전환"""
+    discard_job("deep_dive")
+    discard_job("compare")
+    st.session_state.mode = "compare"
+    st.session_state.selected_perspective = None
+    st.session_state.compare_perspectives = list(perspective_keys)
+
+
+def get_deep_dive_history(perspective_key: str) -> list:
+    """[Phase 14] 관점 하나의 대화 히스토리"""
+    return load_blob("deep_dive_histories", {}).get(perspective_key, [])
+
+
+def history_window(history: list, window_key: str) -> tuple:
+    """
+    [Phase 21] 대화 히스토리에서 화면에 보여줄 최근 구간을 고릅니다.
+
+    잘린 지점이 답변이면 그 질문도 함께 보이도록 한 칸 앞에서 시작합니다.
+
+    Returns:
+        (숨긴 이전 메시지 수, 보여줄 메시지 목록)
+    """
+    shown = st.session_state.history_windows.get(window_key, HISTORY_WINDOW_MESSAGES)
+    start = max(0, len(history) - shown)
+    if start > 0 and history[start]["role"] == "assistant":
+        start -= 1
+    return start, history[start:]
+
+
+def show_more_history(window_key: str):
+    """[Phase 21] 대화 창에 이전 메시지를 HISTORY_WINDOW_MESSAGES개 더 표시"""
+    shown = st.session_state.history_windows.get(window_key, HISTORY_WINDOW_MESSAGES)
+    st.session_state.history_windows[window_key] = shown + HISTORY_WINDOW_MESSAGES
+
+
+def render_older_history_button(hidden: int, window_key: str):
+    """[Phase 21] 숨긴 이전 메시지가 있으면 '더 보기' 버튼 표시"""
+    if hidden:
+        st.button(
+            f"⬆️ 이전 대화 {hidden}개 더 보기",
+            key=f"more_history_{window_key}",
+            on_click=show_more_history,
+            args=(window_key,)
+        )
+
+
+def append_deep_dive_turns(results: dict, follow_up: str = ""):
+    """[Phase 14] 관점별 답변을 각자의 대화 히스토리에 추가"""
+    # 💡 [Phase 9] 저장소의 캐시 객체를 직접 수정하지 않도록 새 객체로 저장
+    histories = dict(load_blob("deep_dive_histories", {}))
+    for perspective_key, result in results.items():
+        history = list(histories.get(perspective_key, []))
+        if follow_up:
+            history.append({"role": "user", "content": follow_up})
+        history.append({"role": "assistant", "content": result})
+        histories[perspective_key] = history
+    save_blob("deep_dive_histories", histories)
+
+
+# ============================================================
+# [Phase 12] 백그라운드 작업 제출 / 회수
+# 💡 분석과 파싱은 job_manager의 스레드 풀에서 실행되고,
+#    세션 상태에는 작업 ID만 남습니다. (st.session_state.jobs: 슬롯 → 작업 ID)
+# ============================================================
+def is_job_active(slot: str) -> bool:
+    """슬롯("analysis", "deep_dive", "extraction")에 진행 중인 작업이 있는지 확인"""
+    job_id = st.session_state.jobs.get(slot)
+    if not job_id:
+        return False
+    job = job_manager.get(job_id)
+    return job is not None and job["status"] in ACTIVE_STATUSES
+
+
+def discard_job(slot: str):
+    """슬롯의 작업을 취소하고 결과를 버립니다. (더 이상 필요 없는 작업)"""
+    job_id = st.session_state.jobs.pop(slot, None)
+    if job_id:
+        job_manager.cancel(job_id)
+
+
+def submit_job(slot: str, func, *args, dedupe_key: str = None, meta: dict = None,
+               cancellable: bool = False, slo_seconds: float = None, **kwargs) -> bool:
+    """
+    작업을 제출하고 슬롯에 작업 ID를 기록합니다. 큐가 가득 차면 False를 반환합니다.
+
+    💡 [Phase 18] cancellable이면 func에 handle=CallHandle을 넘기고, 작업이 취소될 때
+    진행 중인 Solar 호출도 끊습니다. 같은 슬롯의 이전 작업은 새 작업으로 대체되므로 취소합니다.
+
+    💡 [Phase 23] slo_seconds를 주면 제출 시점부터 그 시간 안에 끝나도록 핸들에 마감을 붙입니다.
+    (대기열에서 기다린 시간도 예산에 포함, 품질을 낮춘 내역은 작업이 끝난 뒤 화면에 표시)
+    """
+    handle = None
+    if cancellable or slo_seconds:
+        deadline = Deadline(slo_seconds) if slo_seconds else None
+        handle = CallHandle(deadline=deadline)
+        kwargs["handle"] = handle
+        if deadline:
+            meta = dict(meta or {}, deadline=deadline)
+
+    try:
+        job_id = job_manager.submit(
+            st.session_state.session_id,
+            slot,
+            func,
+            *args,
+            dedupe_key=dedupe_key,
+            meta=meta,
+            on_cancel=handle.cancel if handle else None,
+            **kwargs
+        )
+    except JobQueueFullError as e:
+        st.error(f"⚠️ {e}")
+        return False
+
+    previous = st.session_state.jobs.get(slot)
+    if previous and previous != job_id:
+        job_manager.cancel(previous)
+
+    st.session_state.jobs[slot] = job_id
+    return True
 
 
 def run_analysis(query: str):
-    """분석 실행 및 결과 저장"""
-    st.session_state.is_analyzing = True
-    result = analyze_multi_perspective(query)
-    st.session_state.last_result = result
-    st.session_state.last_query = query
-    st.session_state.is_analyzing = False
-    reset_to_analysis()
+    """분석 작업 제출 (결과는 render_job_status에서 회수)"""
+    submit_job(
+        "analysis",
+        analyze_multi_perspective,
+        query,
+        dedupe_key=content_hash(query),
+        meta={"query": query},
+        cancellable=True,
+        slo_seconds=ANALYSIS_SLO_SECONDS
+    )
 
 
 def run_deep_dive(follow_up: str = ""):
-    """심화 탐색 실행"""
-    result = deep_dive_perspective(
+    """심화 탐색 작업 제출 (결과는 render_job_status에서 회수)"""
+    perspective_key = st.session_state.selected_perspective
+    history = get_deep_dive_history(perspective_key)
+    submit_job(
+        "deep_dive",
+        deep_dive_perspective,
         original_query=st.session_state.last_query,
-        perspective_key=st.session_state.selected_perspective,
-        previous_analysis=st.session_state.last_result,
+        perspective_key=perspective_key,
+        previous_analysis=load_blob("last_result"),
         follow_up_question=follow_up,
-        conversation_history=st.session_state.deep_dive_history
+        conversation_history=history,
+        dedupe_key=f"{perspective_key}:{len(history)}:{follow_up}",
+        meta={
+            "perspective": perspective_key,
+            "follow_up": follow_up,
+            "query": st.session_state.last_query
+        },
+        cancellable=True,
+        slo_seconds=ANALYSIS_SLO_SECONDS
+    )
+
+
+def run_comparison(follow_up: str = ""):
+    """
+    [Phase 14] 비교 중인 관점들의 심화 탐색 작업 제출
+
+    추가 질문이 없으면 아직 대화가 없는 관점만 시작하고,
+    추가 질문이 있으면 모든 관점에 같은 질문을 동시에 보냅니다.
+    """
+    keys = st.session_state.compare_perspectives
+    if not follow_up:
+        keys = [key for key in keys if not get_deep_dive_history(key)]
+    if not keys:
+        return
+
+    histories = {key: get_deep_dive_history(key) for key in keys}
+    submit_job(
+        "compare",
+        deep_dive_many,
+        original_query=st.session_state.last_query,
+        perspective_keys=keys,
+        previous_analysis=load_blob("last_result"),
+        follow_up_question=follow_up,
+        histories=histories,
+        dedupe_key=f"{','.join(keys)}:{sum(len(h) for h in histories.values())}:{follow_up}",
+        meta={
+            "perspectives": keys,
+            "follow_up": follow_up,
+            "query": st.session_state.last_query
+        },
+        cancellable=True,
+        slo_seconds=ANALYSIS_SLO_SECONDS
+    )
+
+
+def run_variant_analysis(base_query: str, variants: list):
+    """💡 [Phase 20] 질문 변형 매트릭스 작업 제출 (결과는 render_job_status에서 회수)"""
+    submit_job(
+        "variants",
+        analyze_variant_matrix,
+        base_query,
+        variants,
+        dedupe_key=content_hash("\n".join([base_query] + variants)),
+        meta={"query": base_query, "total": len(variants) + 1},
+        cancellable=True,
+        slo_seconds=ANALYSIS_SLO_SECONDS
+    )
+
+
+def analyze_variant_matrix(base_query: str, variants: list, handle=None) -> list:
+    """[Phase 20] 변형 분석을 실행하며 완료된 변형 수를 report_progress로 기록합니다. (작업 스레드에서 실행)"""
+    def on_progress(completed: int, total: int):
+        report_progress(completed=completed, total=total)
+
+    return analyze_variants(base_query, variants, on_progress=on_progress, handle=handle)
+
+
+def run_document_analysis(query: str, question: str, passages: str):
+    """💡 [Phase 16] 긴 문서 분석 작업 제출 (구간 요약은 캐시 재사용, 바뀐 구간만 다시 요약)"""
+    sections = document_sections(load_blob("extracted_documents", []))
+    submit_job(
+        "analysis",
+        analyze_document,
+        question,
+        sections,
+        passages,
+        dedupe_key=content_hash(query),
+        meta={"query": query},
+        cancellable=True,
+        slo_seconds=ANALYSIS_SLO_SECONDS
+    )
+
+
+def run_document_extraction(uploaded_files: list):
+    """💡 [Phase 6] 여러 문서 파싱 작업 제출"""
+    names = [uploaded_file.name for uploaded_file in uploaded_files]
+    submit_job(
+        "extraction",
+        extract_documents,
+        uploaded_files,
+        dedupe_key="|".join(names),
+        meta={"total": len(uploaded_files)},
+        slo_seconds=PARSE_SLO_SECONDS
     )
 
-    if follow_up:
-        st.session_state.deep_dive_history.append({"role": "user", "content": follow_up})
-    st.session_state.deep_dive_history.append({"role": "assistant", "content": result})
 
-    st.session_state.deep_dive_result = result
+def extract_documents(uploaded_files: list, handle=None) -> dict:
+    """
+    💡 [Phase 6] 여러 문서를 동시에 파싱합니다. (작업 스레드에서 실행, Streamlit 호출 없음)
+
+    파일별/구간별 진행 상황은 report_progress로 기록합니다.
+    💡 [Phase 23] handle의 마감이 지나면 그때까지 추출한 페이지만으로 결과를 만듭니다.
+    """
+    total = len(uploaded_files)
+    files = [f"⏳ {uploaded_file.name}" for uploaded_file in uploaded_files]
+    done = []
+    report_progress(completed=0, total=total, files=list(files))
+
+    def on_progress(index: int, result: dict):
+        done.append(index)
+        if result["success"]:
+            files[index] = f"✅ {result['name']} ({len(result['text']):,}자)"
+            if result.get("reused_pages"):
+                files[index] += f" · {result['reused_pages']}/{len(result['pages'])}쪽 재사용"
+            # 💡 [Phase 17] 사전 점검에서 줄인 전송 크기, 형식 불일치 안내
+            checked = result.get("preflight")
+            if checked and checked["bytes"] < checked["original_bytes"]:
+                files[index] += f" · 🗜️ {checked['original_bytes'] / 1024 / 1024:.1f}MB → {checked['bytes'] / 1024 / 1024:.1f}MB"
+            if checked and checked["notes"]:
+                files[index] += f" · {' '.join(checked['notes'])}"
+        else:
+            files[index] = f"⚠️ {result['name']}: {result['error']}"
+        report_progress(completed=len(done), total=total, files=list(files))
+
+    if total == 1:
+        # 💡 [Phase 7] 파일이 하나면 대용량 PDF의 구간 진행 상황까지 기록
+        def on_shard(shard: dict):
+            mark = "✅" if shard["success"] else "⚠️"
+            files[0] = f"{mark} {uploaded_files[0].name}: p.{shard['start_page']}-{shard['end_page']} 완료"
+            report_progress(completed=shard["completed"], total=shard["total"], files=list(files))
+
+        result = parse_document(uploaded_files[0], on_shard=on_shard, handle=handle)
+        result["name"] = uploaded_files[0].name
+        on_progress(0, result)
+        results = [result]
+    else:
+        results = parse_documents(uploaded_files, on_progress=on_progress, handle=handle)
+
+    documents = [
+        {"name": r["name"], "text": r["text"], "pages": r.get("pages")}
+        for r in results if r["success"]
+    ]
+    combined = combine_documents(documents) if documents else ""
+    if combined:
+        # 💡 [Phase 5] 질문 검색용 인덱스를 추출 직후 한 번만 생성
+        get_index(combined)
+
+    return {
+        "documents": documents,
+        "combined": combined,
+        "errors": [f"{r['name']}: {r['error']}" for r in results if not r["success"]],
+        "total": total
+    }
+
+
+def _apply_analysis_job(job: dict):
+    """끝난 분석 작업의 결과를 세션에 반영"""
+    result = job["result"] if job["status"] == STATUS_DONE else f"⚠️ **분석 중 오류가 발생했습니다**\n\n{job['error']}"
+    save_blob("last_result", result)
+    st.session_state.last_query = job["meta"]["query"]
+    save_blob("deep_dive_histories", None)
+    st.session_state.history_windows = {}
+    reset_to_analysis()
+    st.toast("✨ 분석이 완료되었습니다!", icon="🎉")
+
+
+def _apply_deep_dive_job(job: dict):
+    """끝난 심화 탐색 작업의 결과를 해당 관점의 대화 히스토리에 추가 (새 분석이 시작됐으면 버림)"""
+    meta = job["meta"]
+    if meta["query"] != st.session_state.last_query:
+        return
+
+    result = job["result"] if job["status"] == STATUS_DONE else f"⚠️ {job['error']}"
+    append_deep_dive_turns({meta["perspective"]: result}, meta["follow_up"])
+
+
+def _apply_compare_job(job: dict):
+    """[Phase 14] 끝난 비교 작업의 관점별 결과를 각 대화 히스토리에 추가"""
+    meta = job["meta"]
+    if meta["query"] != st.session_state.last_query:
+        return
+
+    if job["status"] == STATUS_DONE:
+        results = job["result"]
+    else:
+        results = {key: f"⚠️ {job['error']}" for key in meta["perspectives"]}
+    append_deep_dive_turns(results, meta["follow_up"])
+
+
+def _apply_variants_job(job: dict):
+    """[Phase 20] 끝난 변형 분석 결과를 세션에 반영하고 매트릭스 화면으로 전환"""
+    if job["status"] != STATUS_DONE:
+        st.error(f"⚠️ 변형 분석 중 오류가 발생했습니다: {job['error']}")
+        return
+
+    save_blob("variant_results", job["result"])
+    discard_job("deep_dive")
+    discard_job("compare")
+    st.session_state.mode = "variants"
+    reused = sum(1 for row in job["result"] if row["cached"])
+    message = f"✨ {len(job['result'])}개 변형 분석이 완료되었습니다!"
+    if reused:
+        message += f" ({reused}개 재사용)"
+    st.toast(message, icon="🧪")
+
+
+def _apply_extraction_job(job: dict):
+    """끝난 문서 파싱 작업의 결과를 세션에 반영"""
+    if job["status"] != STATUS_DONE:
+        st.session_state.document_errors = [f"문서 처리 중 오류: {job['error']}"]
+        return
+
+    outcome = job["result"]
+    st.session_state.document_errors = outcome["errors"]
+    documents = outcome["documents"]
+    if not documents:
+        return
+
+    # 💡 [Phase 16] 같은 문서의 이전 판이 있으면 바뀐 페이지 비교
+    save_blob("document_diff", find_revision_diffs(load_blob("extracted_documents", []), documents) or None)
+
+    save_blob("extracted_documents", documents)
+    save_blob("extracted_text", outcome["combined"])
+    st.session_state.pop("preview_page_input", None)
+    st.session_state.uploaded_file_name = ", ".join(doc["name"] for doc in documents)
+    st.toast(f"✅ 텍스트 추출 완료! ({len(documents)}/{outcome['total']}개 파일)", icon="📄")
+
+
+def find_revision_diffs(previous_documents: list, documents: list) -> list:
+    """
+    [Phase 16] 새로 추출한 문서마다 이전 판(같은 파일명, 또는 한 문서씩 올린 경우 직전 문서)을 찾아 비교합니다.
+
+    Returns:
+        list: {"name", "previous_name", "unchanged", "changes", "summary"} 목록
+    """
+    previous_by_name = {doc["name"]: doc for doc in previous_documents if doc.get("pages")}
+    diffs = []
+    for doc in documents:
+        if not doc.get("pages"):
+            continue
+        previous = previous_by_name.get(doc["name"])
+        if previous is None and len(previous_documents) == 1 and len(documents) == 1:
+            previous = previous_by_name.get(previous_documents[0]["name"])
+        if previous is None:
+            continue
+        diffs.append({
+            "name": doc["name"],
+            "previous_name": previous["name"],
+            **diff_revisions(previous["pages"], doc["pages"])
+        })
+    return diffs
+
+
+JOB_HANDLERS = {
+    "analysis": _apply_analysis_job,
+    "deep_dive": _apply_deep_dive_job,
+    "compare": _apply_compare_job,
+    "variants": _apply_variants_job,
+    "extraction": _apply_extraction_job,
+}
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+@profiled_rerun(current_session_id)
+def render_job_status(slot: str):
+    """
+    [Phase 12] 작업 진행 상황 표시 (fragment, 주기적으로 다시 실행)
+
+    작업이 끝나면 결과를 회수해 세션에 반영하고 전체 화면을 다시 그립니다.
+    """
+    job_id = st.session_state.jobs.get(slot)
+    if not job_id:
+        return
+
+    if collect_job(slot):
+        st.rerun()
+
+    job = job_manager.get(job_id)
+    if job is not None:
+        render_job_progress(slot, job)
+
+
+def render_job_progress(slot: str, job: dict):
+    """[Phase 12] 진행 중인 작업의 상태 표시 (render_job_status와 대화 영역의 대기에서 함께 사용)"""
+    elapsed = time.time() - job["submitted_at"]
+    if slot == "analysis":
+        st.info(f"🔮 다양한 관점에서 분석 중... ({elapsed:.0f}초)")
+    elif slot == "deep_dive":
+        st.info(f"💬 답변 생성 중... ({elapsed:.0f}초)")
+    elif slot == "compare":
+        count = len(job["meta"]["perspectives"])
+        st.info(f"🆚 {count}개 관점에서 동시에 답변 생성 중... ({elapsed:.0f}초)")
+    elif slot == "variants":
+        total = job["progress"].get("total") or job["meta"]["total"]
+        completed = job["progress"].get("completed", 0)
+        st.progress(completed / total, text=f"🧪 {total}개 질문을 동시에 분석 중... ({completed}/{total}, {elapsed:.0f}초)")
+    else:
+        progress = job["progress"]
+        total = progress.get("total") or job["meta"]["total"]
+        completed = progress.get("completed", 0)
+        st.progress(completed / total, text=f"문서에서 텍스트 추출 중... ({completed}/{total}) 📄")
+        for line in progress.get("files", []):
+            st.caption(line)
+
+
+# ============================================================
+# [Phase 11.1] 대화 영역의 추가 질문 작업
+# 💡 추가 질문은 대화 영역 fragment 안에서 제출하고, 같은 fragment가 작업이 끝날 때까지
+#    진행 상황을 갱신하다가 결과를 반영해 대화 영역만 다시 그립니다. (전체 rerun 없음)
+# ============================================================
+def rerun_conversation(slot: str):
+    """
+    추가 질문을 제출한 뒤 대화 영역 fragment만 다시 실행해, 그 실행에서 작업을 기다리게 합니다.
+
+    fragment가 전체 rerun의 일부로 실행 중이면 fragment만 다시 실행할 수 없으므로
+    전체 rerun으로 대신합니다. (이때는 render_job_status가 진행 상황을 표시)
+    """
+    st.session_state.waiting_job_slot = slot
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.session_state.waiting_job_slot = None
+        st.rerun()
+
+
+def render_conversation_job(slot: str, status_area):
+    """
+    대화 영역의 진행 중인 작업을 status_area에 표시합니다.
+
+    방금 추가 질문을 제출한 fragment rerun이면 작업이 끝날 때까지 그 자리에서 진행 상황을 갱신하고,
+    끝나면 결과를 반영한 뒤 대화 영역만 다시 그립니다. 기다리는 동안 다른 조작이 들어오면
+    Streamlit이 다음 화면 갱신에서 이 실행을 멈추고, 이후에는 render_job_status가 이어서 확인합니다.
+    """
+    if slot not in st.session_state.jobs:
+        return
+
+    if st.session_state.waiting_job_slot != slot:
+        with status_area:
+            render_job_status(slot)
+        return
+
+    st.session_state.waiting_job_slot = None
+    placeholder = status_area.empty()
+    while True:
+        job = job_manager.get(st.session_state.jobs.get(slot))
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            break
+        with placeholder.container():
+            render_job_progress(slot, job)
+        time.sleep(JOB_POLL_SECONDS)
+
+    collect_job(slot)
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        # 제출 직후 다른 조작으로 전체 rerun이 먼저 실행된 경우
+        st.rerun()
+
+
+def collect_job(slot: str) -> bool:
+    """
+    슬롯의 작업이 끝났으면 결과를 회수해 세션에 반영합니다.
+
+    폴링 fragment뿐 아니라 자동으로 작업을 시작하는 화면도 먼저 호출해서,
+    끝났지만 아직 회수하지 않은 작업을 "작업 없음"으로 보고 다시 제출하지 않도록 합니다.
+
+    Returns:
+        슬롯이 비워졌는지 (결과를 반영했거나, 만료/취소된 작업을 정리함)
+    """
+    job_id = st.session_state.jobs.get(slot)
+    if not job_id:
+        return False
+
+    job = job_manager.get(job_id)
+    if job is not None and job["status"] in ACTIVE_STATUSES:
+        return False
+
+    # 끝난 작업은 회수하고, 만료되었거나 취소된 작업은 슬롯만 정리
+    finished = job_manager.collect(job_id) if job is not None else None
+    st.session_state.jobs.pop(slot, None)
+    if finished:
+        # 💡 [Phase 23] 시간 예산 사용 내역은 결과와 함께 남겨 두고 결과 화면에서 표시
+        deadline = finished["meta"].get("deadline")
+        if deadline:
+            st.session_state.degradations[slot] = {
+                "elapsed": finished["finished_at"] - finished["submitted_at"],
+                "slo": deadline.seconds,
+                "notes": deadline.notes()
+            }
+        JOB_HANDLERS[slot](finished)
+    return True
+
+
+def render_degradations(slot: str):
+    """
+    [Phase 23] 마지막으로 끝난 작업의 소요 시간과, 시간 예산 때문에 품질을 낮춘 내역을 표시합니다.
+    품질을 낮추지 않았으면 아무것도 표시하지 않습니다.
+    """
+    report = st.session_state.degradations.get(slot)
+    if not report or not report["notes"]:
+        return
+
+    with st.expander(f"⏱️ 시간 예산 {report['slo']:.0f}초에 맞춰 일부를 간소화했습니다 (소요 {report['elapsed']:.0f}초)"):
+        for note in report["notes"]:
+            st.caption(f"- {note}")
 
 
 # ============================================================
@@ -129,29 +875,59 @@ def generate_export_markdown() -> str:
     else:
         input_source = "💬 텍스트 입력"
 
-    md_content = f"""# 🔮 PRISM-Lite 분석 결과
+    # 심화 탐색 결과가 있으면 추가 (비교 모드면 비교 중인 관점 모두)
+    if st.session_state.mode == "deep_dive":
+        export_keys = (st.session_state.selected_perspective,)
+    elif st.session_state.mode == "compare":
+        export_keys = tuple(st.session_state.compare_perspectives)
+    else:
+        export_keys = ()
+
+    # 💡 [Phase 11.2] 생성일시만 매번 붙이고, 본문은 결과/대화 내용 해시(blob 참조)가 같으면 캐시 사용
+    body = build_export_body(
+        st.session_state.last_result_ref,
+        st.session_state.deep_dive_histories_ref,
+        export_keys,
+        st.session_state.last_query,
+        input_source,
+        st.session_state.session_id,
+    )
+    return f"# 🔮 PRISM-Lite 분석 결과\n\n> 생성일시: {now}\n{body}"
+
+
+@st.cache_data(max_entries=EXPORT_CACHE_ENTRIES, show_spinner=False)
+def build_export_body(result_ref: str, histories_ref: str, export_keys: tuple, last_query: str,
+                      input_source: str, _session_id: str) -> str:
+    """
+    [Phase 11.2] 내보내기 마크다운에서 생성일시 아래 본문을 만듭니다.
 
-> 생성일시: {now}
-> 입력 방식: {input_source}
+    blob 참조는 내용 해시이므로 결과와 대화가 바뀌지 않았으면 캐시된 본문을 그대로 씁니다.
+    (_session_id는 저장소에서 읽을 때만 쓰고 캐시 키에는 포함하지 않음)
+    """
+    histories = blob_store.get(_session_id, histories_ref) or {}
+    md_content = f"""> 입력 방식: {input_source}
 > Powered by Upstage Solar API
 
 ---
 
 ## 📋 분석 주제
 
-**{st.session_state.last_query}**
+**{last_query}**
 
 ---
 
 ## 📊 다관점 분석 결과
 
-{st.session_state.last_result}
+{blob_store.get(_session_id, result_ref)}
 
 """
 
-    # 심화 탐색 결과가 있으면 추가
-    if st.session_state.mode == "deep_dive" and st.session_state.deep_dive_history:
-        perspective = PERSPECTIVES.get(st.session_state.selected_perspective, {})
+    for perspective_key in export_keys:
+        history = histories.get(perspective_key, [])
+        if not history:
+            continue
+
+        perspective = PERSPECTIVES.get(perspective_key, {})
         perspective_name = perspective.get("name", "알 수 없음")
         perspective_emoji = perspective.get("emoji", "🔍")
 
@@ -160,7 +936,7 @@ def generate_export_markdown() -> str:
 ## {perspective_emoji} {perspective_name} 심화 탐색
 
 """
-        for i, msg in enumerate(st.session_state.deep_dive_history):
+        for i, msg in enumerate(history):
             if msg["role"] == "user":
                 md_content += f"### 💬 추가 질문\n\n{msg['content']}\n\n"
             else:
@@ -188,157 +964,333 @@ def get_safe_filename() -> str:
 # UI 컴포넌트
 # ============================================================
 
+@profiled("render_header")
 def render_header():
     """헤더 렌더링"""
     st.title("🔮 PRISM-Lite")
     st.subheader("다관점 사고 파트너 (Multi-Perspective Thinking Partner)")
 
-    st.markdown("""
-    > **"하나의 답"이 아닌 "가능성의 지도"를 탐색합니다.**
-
-    질문이나 주제를 입력하면, 네 가지 다른 관점에서 분석을 제공합니다.
-    - 🔵 **전통적 관점**: 가장 흔하고 검증된 접근
-    - 🟢 **실용적 관점**: 즉시 실행 가능한 현실적 접근
-    - 🟡 **비판적 관점**: 반대 의견과 고려할 위험
-    - 🔴 **창의적 관점**: 비전형적이지만 가치 있는 접근
-    """)
+    header = build_header_markdown(PERSPECTIVES)
+    st.markdown(header["intro"])
+    if header["compact"]:
+        st.caption(header["perspectives"])
+    else:
+        st.markdown(header["perspectives"])
 
     st.divider()
 
 
+@st.cache_data(show_spinner=False)
+def build_header_markdown(perspectives: dict) -> dict:
+    """
+    [Phase 11.2] 헤더의 소개 문구와 관점 목록을 만듭니다. (관점 설정 내용이 같으면 캐시 사용)
+
+    Returns:
+        dict: {"intro", "perspectives", "compact": 관점이 많아 한 줄(caption)로 표시하는지}
+    """
+    intro = (
+        '> **"하나의 답"이 아닌 "가능성의 지도"를 탐색합니다.**\n\n'
+        f"질문이나 주제를 입력하면, {len(perspectives)}가지 다른 관점에서 분석을 제공합니다."
+    )
+    # 💡 [Phase 22] 관점 목록은 설정에 따라 달라지므로 PERSPECTIVES로 그림 (많으면 한 줄로)
+    compact = len(perspectives) > HEADER_LIST_LIMIT
+    if compact:
+        listing = " · ".join(f"{info['emoji']} {info['name']}" for info in perspectives.values())
+    else:
+        listing = "\n".join(
+            f"- {info['emoji']} **{info['name']}**: {info['description']}" for info in perspectives.values()
+        )
+    return {"intro": intro, "perspectives": listing, "compact": compact}
+
+
+@profiled("render_input_section")
 def render_input_section():
     """[Phase 4] 입력 섹션 렌더링 - 탭으로 텍스트/문서 분리"""
 
     # 탭으로 입력 방식 선택
-    tab_text, tab_document = st.tabs(["💬 텍스트 입력", "📄 문서 업로드"])
+    tab_text, tab_document, tab_variants = st.tabs(["💬 텍스트 입력", "📄 문서 업로드", "🧪 변형 비교"])
 
-    # ─────────────────────────────────────────────
-    # 탭 1: 텍스트 입력 (기존)
-    # ─────────────────────────────────────────────
+    # 💡 [Phase 11] 각 탭은 fragment라서 입력/업로드 조작 시 해당 탭만 다시 실행됨
     with tab_text:
-        user_input = st.text_area(
-            "탐색하고 싶은 주제나 질문을 입력하세요:",
-            value=st.session_state.user_input,
-            placeholder="예: '프로젝트 마감이 촉박한데 품질도 유지해야 합니다. 어떻게 해야 할까요?'",
-            height=100,
-            key="input_area",
-            disabled=st.session_state.is_analyzing
-        )
+        render_text_input()
+
+    with tab_document:
+        render_document_input()
+
+    with tab_variants:
+        render_variant_input()
+
+    # 💡 [Phase 12] 진행 중인 파싱/분석 작업 상태
+    for slot in ("extraction", "analysis", "variants"):
+        if slot in st.session_state.jobs:
+            render_job_status(slot)
+
+
+# ─────────────────────────────────────────────
+# 탭 1: 텍스트 입력 (기존)
+# ─────────────────────────────────────────────
+@st.fragment
+@profiled_rerun(current_session_id)
+@profiled("render_text_input")
+def render_text_input():
+    """텍스트 입력 탭 (fragment)"""
+    user_input = st.text_area(
+        "탐색하고 싶은 주제나 질문을 입력하세요:",
+        value=st.session_state.user_input,
+        placeholder="예: '프로젝트 마감이 촉박한데 품질도 유지해야 합니다. 어떻게 해야 할까요?'",
+        height=100,
+        key="input_area",
+        disabled=is_job_active("analysis")
+    )
+
+    col1, col2 = st.columns([1, 5])
+
+    with col1:
+        if st.button(
+            "🔍 분석 시작",
+            type="primary",
+            disabled=is_job_active("analysis"),
+            use_container_width=True,
+            key="analyze_text_btn"
+        ):
+            if user_input.strip():
+                # 💡 [Phase 12] 백그라운드 작업으로 제출하고 전체 화면에서 진행 상황 표시
+                run_analysis(user_input)
+                st.rerun()
+            else:
+                st.warning("주제나 질문을 입력해주세요.")
+
+    with col2:
+        if load_blob("last_result"):
+            if st.button("🔄 새로운 분석", use_container_width=False, key="new_text_btn"):
+                start_new_analysis()
+                st.rerun()
+
+# ─────────────────────────────────────────────
+# 탭 3: 질문 변형 비교 (Phase 20)
+# ─────────────────────────────────────────────
+@st.fragment
+@profiled_rerun(current_session_id)
+@profiled("render_variant_input")
+def render_variant_input():
+    """변형 비교 탭 (fragment): 기본 질문 + 한 줄에 하나씩 변형 조건"""
+    base_query = st.text_area(
+        "기본 질문:",
+        value=st.session_state.user_input,
+        placeholder="예: '이직을 고민하고 있습니다.'",
+        height=80,
+        key="variant_base_input",
+        disabled=is_job_active("variants")
+    )
+    variant_text = st.text_area(
+        f"변형 조건 (한 줄에 하나, 최대 {MAX_VARIANTS}개):",
+        placeholder="예:\n사회 초년생입니다\n10년 차 팀장입니다\n육아 중인 맞벌이 부모입니다",
+        height=140,
+        key="variant_lines_input",
+        disabled=is_job_active("variants")
+    )
+    variants = [line.strip() for line in variant_text.splitlines() if line.strip()]
+    if len(variants) > MAX_VARIANTS:
+        st.caption(f"⚠️ 앞의 {MAX_VARIANTS}개 변형만 분석합니다.")
+        variants = variants[:MAX_VARIANTS]
+
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        if st.button(
+            "🧪 변형 분석 시작",
+            type="primary",
+            disabled=is_job_active("variants"),
+            use_container_width=True,
+            key="analyze_variants_btn"
+        ):
+            if not base_query.strip():
+                st.warning("기본 질문을 입력해주세요.")
+            elif not variants:
+                st.warning("변형 조건을 한 줄 이상 입력해주세요.")
+            else:
+                run_variant_analysis(base_query, variants)
+                st.rerun()
+
+    with col2:
+        if load_blob("variant_results") and st.session_state.mode != "variants":
+            if st.button("🧪 매트릭스 보기", key="show_variants_btn"):
+                st.session_state.mode = "variants"
+                st.rerun()
+
+# ─────────────────────────────────────────────
+# 탭 2: 문서 업로드 (Phase 4)
+# ─────────────────────────────────────────────
+@st.fragment
+@profiled_rerun(current_session_id)
+@profiled("render_document_input")
+def render_document_input():
+    """문서 업로드 탭 (fragment)"""
+    st.markdown("""
+    📄 **PDF 또는 이미지 파일**을 업로드하면, 문서 내용을 추출하여 다관점 분석을 수행합니다.
+
+    *Upstage Document Parse API를 활용합니다.*
+    """)
 
-        col1, col2 = st.columns([1, 5])
+    # 💡 [Phase 6] 여러 파일을 한 번에 업로드
+    uploaded_files = st.file_uploader(
+        "파일을 선택하세요",
+        type=get_supported_file_types(),
+        help="PDF, PNG, JPG 파일을 지원합니다. 여러 파일을 함께 선택할 수 있습니다.",
+        accept_multiple_files=True,
+        key="document_uploader"
+    )
+
+    if uploaded_files:
+        for uploaded_file in uploaded_files:
+            st.caption(f"📎 선택된 파일: **{uploaded_file.name}** ({uploaded_file.size / 1024:.1f} KB)")
+
+        # 텍스트 추출 버튼
+        col1, col2 = st.columns([1, 3])
 
         with col1:
-            if st.button(
-                "🔍 분석 시작",
-                type="primary",
-                disabled=st.session_state.is_analyzing,
-                use_container_width=True,
-                key="analyze_text_btn"
-            ):
-                if user_input.strip():
-                    with st.spinner("다양한 관점에서 분석 중... 🔮"):
-                        run_analysis(user_input)
-                    st.toast("✨ 분석이 완료되었습니다!", icon="🎉")
-                    st.rerun()
-                else:
-                    st.warning("주제나 질문을 입력해주세요.")
+            extract_clicked = st.button(
+                "📤 텍스트 추출",
+                type="secondary",
+                disabled=is_job_active("extraction"),
+                use_container_width=True
+            )
 
         with col2:
-            if st.session_state.last_result:
-                if st.button("🔄 새로운 분석", use_container_width=False, key="new_text_btn"):
-                    start_new_analysis()
+            if load_blob("extracted_text"):
+                if st.button("🔄 다른 파일", use_container_width=False):
+                    save_blob("extracted_text", None)
+                    save_blob("extracted_documents", None)
+                    save_blob("document_diff", None)
+                    st.session_state.document_errors = []
+                    st.session_state.uploaded_file_name = None
                     st.rerun()
 
-    # ─────────────────────────────────────────────
-    # 탭 2: 문서 업로드 (Phase 4)
-    # ─────────────────────────────────────────────
-    with tab_document:
-        st.markdown("""
-        📄 **PDF 또는 이미지 파일**을 업로드하면, 문서 내용을 추출하여 다관점 분석을 수행합니다.
-
-        *Upstage Document Parse API를 활용합니다.*
-        """)
+        if extract_clicked:
+            run_document_extraction(uploaded_files)
+            st.rerun()
 
-        uploaded_file = st.file_uploader(
-            "파일을 선택하세요",
-            type=get_supported_file_types(),
-            help="PDF, PNG, JPG 파일을 지원합니다.",
-            key="document_uploader"
-        )
+    # 파일별 추출 실패 내역
+    for error in st.session_state.document_errors:
+        st.error(f"⚠️ {error}")
+    render_degradations("extraction")
 
-        if uploaded_file:
-            st.caption(f"📎 선택된 파일: **{uploaded_file.name}** ({uploaded_file.size / 1024:.1f} KB)")
+    # 추출된 텍스트 표시 및 분석
+    extracted_text = load_blob("extracted_text")
+    if extracted_text:
+        st.divider()
+        st.markdown("### 📝 추출된 텍스트")
 
-            # 텍스트 추출 버튼
-            col1, col2 = st.columns([1, 3])
+        # 💡 [Phase 16] 이전 판과 비교한 변경 사항
+        render_revision_diff()
 
-            with col1:
-                if st.button("📤 텍스트 추출", type="secondary", use_container_width=True):
-                    with st.spinner("문서에서 텍스트 추출 중... 📄"):
-                        result = parse_document(uploaded_file)
+        # 추출된 텍스트 미리보기 (접을 수 있게)
+        with st.expander("추출된 내용 보기", expanded=False):
+            render_document_preview(extracted_text)
 
-                    if result["success"]:
-                        st.session_state.extracted_text = result["text"]
-                        st.session_state.uploaded_file_name = uploaded_file.name
-                        st.toast("✅ 텍스트 추출 완료!", icon="📄")
-                        st.rerun()
-                    else:
-                        st.error(f"⚠️ {result['error']}")
-
-            with col2:
-                if st.session_state.extracted_text:
-                    if st.button("🔄 다른 파일", use_container_width=False):
-                        st.session_state.extracted_text = None
-                        st.session_state.uploaded_file_name = None
-                        st.rerun()
-
-        # 추출된 텍스트 표시 및 분석
-        if st.session_state.extracted_text:
-            st.divider()
-            st.markdown("### 📝 추출된 텍스트")
-
-            # 추출된 텍스트 미리보기 (접을 수 있게)
-            with st.expander("추출된 내용 보기", expanded=False):
-                st.text_area(
-                    "추출된 텍스트",
-                    value=st.session_state.extracted_text,
-                    height=200,
-                    disabled=True,
-                    label_visibility="collapsed"
-                )
+        # 분석할 질문 입력
+        st.markdown("### 💭 분석 질문")
+        analysis_question = st.text_input(
+            "이 문서에 대해 어떤 관점에서 분석할까요?",
+            placeholder="예: '이 문서의 핵심 주장을 분석해줘' 또는 '이 기획서의 강점과 약점을 알려줘'",
+            key="doc_analysis_question"
+        )
 
-            # 분석할 질문 입력
-            st.markdown("### 💭 분석 질문")
-            analysis_question = st.text_input(
-                "이 문서에 대해 어떤 관점에서 분석할까요?",
-                placeholder="예: '이 문서의 핵심 주장을 분석해줘' 또는 '이 기획서의 강점과 약점을 알려줘'",
-                key="doc_analysis_question"
+        # 기본 질문 제안
+        st.caption("💡 질문 예시: '핵심 내용 요약', '주장의 타당성 분석', '개선점 제안'")
+
+        if st.button(
+            "🔍 문서 분석 시작",
+            type="primary",
+            disabled=is_job_active("analysis"),
+            use_container_width=False,
+            key="analyze_doc_btn"
+        ):
+            # 💡 [Phase 5] 질문과 관련된 구절만 골라 분석할 내용 구성
+            document_context = select_passages(
+                extracted_text,
+                analysis_question
             )
+            if analysis_question.strip():
+                query = f"[문서 분석 요청]\n\n질문: {analysis_question}\n\n문서 내용:\n{document_context}"
+            else:
+                query = f"[문서 분석 요청]\n\n다음 문서의 핵심 내용을 다관점에서 분석해주세요:\n\n{document_context}"
 
-            # 기본 질문 제안
-            st.caption("💡 질문 예시: '핵심 내용 요약', '주장의 타당성 분석', '개선점 제안'")
+            # 💡 [Phase 16] 구절 예산보다 긴 문서는 구간 요약(캐시) + 종합으로 분석
+            if len(extracted_text) > DEFAULT_CONTEXT_CHARS:
+                run_document_analysis(query, analysis_question, document_context)
+            else:
+                run_analysis(query)
+            st.rerun()
 
-            if st.button(
-                "🔍 문서 분석 시작",
-                type="primary",
-                use_container_width=False,
-                key="analyze_doc_btn"
-            ):
-                # 분석할 내용 구성
-                if analysis_question.strip():
-                    query = f"[문서 분석 요청]\n\n질문: {analysis_question}\n\n문서 내용:\n{st.session_state.extracted_text[:3000]}"
-                else:
-                    query = f"[문서 분석 요청]\n\n다음 문서의 핵심 내용을 다관점에서 분석해주세요:\n\n{st.session_state.extracted_text[:3000]}"
 
-                with st.spinner("문서를 다양한 관점에서 분석 중... 🔮"):
-                    run_analysis(query)
-                st.toast("✨ 문서 분석이 완료되었습니다!", icon="🎉")
-                st.rerun()
+def render_document_preview(extracted_text: str):
+    """
+    [Phase 21] 추출된 텍스트를 PREVIEW_PAGE_CHARS 단위로 나눠 한 쪽씩 표시
+
+    문서 전체 대신 보고 있는 쪽만 보내므로 300쪽 문서도 rerun마다 전송량이 같습니다.
+    """
+    total_pages = max(1, -(-len(extracted_text) // PREVIEW_PAGE_CHARS))
+    page = 1
+    if total_pages > 1:
+        page = st.number_input(
+            f"쪽 (전체 {total_pages}쪽)",
+            min_value=1,
+            max_value=total_pages,
+            value=1,
+            step=1,
+            key="preview_page_input"
+        )
+
+    start, end = preview_bounds(extracted_text, page - 1)
+    st.text_area(
+        "추출된 텍스트",
+        value=extracted_text[start:end],
+        height=200,
+        disabled=True,
+        label_visibility="collapsed"
+    )
+    if total_pages > 1:
+        st.caption(f"전체 {len(extracted_text):,}자 중 {start + 1:,}–{end:,}자")
+
+
+def preview_bounds(text: str, page_index: int) -> tuple:
+    """
+    [Phase 21] 미리보기 한 쪽의 (시작, 끝) 위치. 가능하면 줄바꿈에서 자르며, 앞뒤 쪽과 겹치지 않습니다.
+
+    쪽 경계를 미리 계산하지 않고 고정 간격 근처의 줄바꿈을 찾으므로 문서 길이와 무관하게 빠릅니다.
+    """
+    def snap(offset: int) -> int:
+        if offset <= 0 or offset >= len(text):
+            return max(0, min(offset, len(text)))
+        newline = text.rfind("\n", offset - PREVIEW_PAGE_CHARS // 5, offset)
+        return newline + 1 if newline != -1 else offset
+
+    return snap(page_index * PREVIEW_PAGE_CHARS), snap((page_index + 1) * PREVIEW_PAGE_CHARS)
+
+
+def render_revision_diff():
+    """[Phase 16] 수정본을 올렸을 때 이전 판 대비 바뀐 페이지 표시"""
+    for diff in load_blob("document_diff", []):
+        with st.expander(f"🔁 수정본 변경 사항: {diff['name']} — {diff['summary']}", expanded=bool(diff["changes"])):
+            if diff["previous_name"] != diff["name"]:
+                st.caption(f"이전 판: {diff['previous_name']}")
+            st.caption("바뀐 페이지만 다시 추출하고, 분석할 때도 바뀐 페이지만 다시 요약합니다.")
+            for change in diff["changes"]:
+                if change["kind"] == "changed":
+                    st.markdown(f"**✏️ p.{change['new_page']} 변경**")
+                elif change["kind"] == "added":
+                    st.markdown(f"**➕ p.{change['new_page']} 추가**")
+                else:
+                    st.markdown(f"**➖ 이전 p.{change['old_page']} 삭제**")
+                if change["diff"]:
+                    st.code(change["diff"], language="diff")
 
 
+@profiled("render_analysis_result")
 def render_analysis_result():
     """분석 결과 렌더링 (관점별 탐색 버튼 포함)"""
-    if not st.session_state.last_result:
+    last_result = load_blob("last_result")
+    if not last_result:
         return
 
     st.divider()
@@ -357,6 +1309,7 @@ def render_analysis_result():
             if len(st.session_state.last_query) > 100:
                 display_query += "..."
             st.caption(f"**분석 주제**: {display_query}")
+        render_degradations("analysis")
 
     with header_col2:
         md_content = generate_export_markdown()
@@ -372,7 +1325,7 @@ def render_analysis_result():
         )
 
     # 전체 결과 표시
-    st.markdown(st.session_state.last_result)
+    st.markdown(last_result)
 
     st.divider()
 
@@ -380,12 +1333,10 @@ def render_analysis_result():
     st.markdown("### 🔍 더 깊이 탐색하기")
     st.caption("관심 있는 관점을 선택하면, 해당 관점에서 더 깊이 있는 탐색을 진행합니다.")
 
-    col1, col2 = st.columns(2)
-
-    perspectives_list = list(PERSPECTIVES.items())
-
-    with col1:
-        for key, info in perspectives_list[:2]:
+    # 💡 [Phase 22] 관점 수와 상관없이 두 열에 번갈아 배치
+    dive_cols = st.columns(2)
+    for i, (key, info) in enumerate(PERSPECTIVES.items()):
+        with dive_cols[i % 2]:
             if st.button(
                 f"{info['emoji']} {info['name']} 탐색하기",
                 key=f"dive_{key}",
@@ -394,17 +1345,36 @@ def render_analysis_result():
                 select_perspective(key)
                 st.rerun()
 
-    with col2:
-        for key, info in perspectives_list[2:]:
-            if st.button(
-                f"{info['emoji']} {info['name']} 탐색하기",
-                key=f"dive_{key}",
-                use_container_width=True
-            ):
-                select_perspective(key)
-                st.rerun()
+    # 💡 [Phase 14] 여러 관점을 나란히 비교
+    st.markdown("### 🆚 여러 관점 나란히 비교하기")
+    st.caption(
+        f"2~{MAX_COMPARE_PERSPECTIVES}개 관점을 고르면 동시에 심화 탐색하고, "
+        "추가 질문도 모든 관점에 한 번에 보냅니다."
+    )
+
+    compare_col1, compare_col2 = st.columns([4, 1])
+    with compare_col1:
+        compare_keys = st.multiselect(
+            "비교할 관점",
+            options=list(PERSPECTIVES),
+            format_func=lambda k: f"{PERSPECTIVES[k]['emoji']} {PERSPECTIVES[k]['name']}",
+            max_selections=MAX_COMPARE_PERSPECTIVES,
+            label_visibility="collapsed",
+            placeholder="비교할 관점을 선택하세요",
+            key="compare_select"
+        )
+    with compare_col2:
+        if st.button(
+            "🆚 비교 시작",
+            disabled=len(compare_keys) < 2,
+            use_container_width=True,
+            key="compare_btn"
+        ):
+            start_comparison(compare_keys)
+            st.rerun()
 
 
+@profiled("render_deep_dive_mode")
 def render_deep_dive_mode():
     """심화 탐색 모드 렌더링"""
     perspective = PERSPECTIVES.get(st.session_state.selected_perspective)
@@ -413,56 +1383,89 @@ def render_deep_dive_mode():
 
     st.divider()
 
-    # 헤더 + 내보내기 버튼
-    header_col1, header_col2 = st.columns([4, 1])
-
-    with header_col1:
-        st.markdown(f"## {perspective['emoji']} {perspective['name']} 심화 탐색")
-        if st.session_state.uploaded_file_name:
-            st.caption(f"📄 **문서**: {st.session_state.uploaded_file_name}")
-        else:
-            display_query = st.session_state.last_query[:80]
-            if len(st.session_state.last_query) > 80:
-                display_query += "..."
-            st.caption(f"**원래 주제**: {display_query}")
-        st.caption(f"**관점 설명**: {perspective['description']} (전형성: {perspective['typicality']})")
-
-    with header_col2:
-        if st.session_state.deep_dive_history:
-            md_content = generate_export_markdown()
-            filename = get_safe_filename()
-
-            st.download_button(
-                label="📥 저장하기",
-                data=md_content,
-                file_name=filename,
-                mime="text/markdown",
-                help="분석 결과와 심화 탐색 내용을 마크다운 파일로 다운로드합니다",
-                use_container_width=True
-            )
+    # 헤더
+    st.markdown(f"## {perspective['emoji']} {perspective['name']} 심화 탐색")
+    if st.session_state.uploaded_file_name:
+        st.caption(f"📄 **문서**: {st.session_state.uploaded_file_name}")
+    else:
+        display_query = st.session_state.last_query[:80]
+        if len(st.session_state.last_query) > 80:
+            display_query += "..."
+        st.caption(f"**원래 주제**: {display_query}")
+    st.caption(f"**관점 설명**: {perspective['description']} (전형성: {perspective['typicality']})")
 
     # 네비게이션 버튼
     col1, col2, col3 = st.columns([1, 1, 4])
     with col1:
-        if st.button("← 분석 결과로", use_container_width=True):
+        if st.button("← 분석 결과로", use_container_width=True, key="deep_dive_back_btn"):
             reset_to_analysis()
             st.rerun()
     with col2:
-        if st.button("🔄 새 분석", use_container_width=True):
+        if st.button("🔄 새 분석", use_container_width=True, key="deep_dive_new_btn"):
             start_new_analysis()
             st.rerun()
 
     st.divider()
 
-    # 심화 탐색 결과가 없으면 자동으로 시작
-    if not st.session_state.deep_dive_result:
-        with st.spinner(f"{perspective['emoji']} {perspective['name']}에서 깊이 탐색 중..."):
-            run_deep_dive()
-        st.rerun()
+    # 💡 [Phase 11] 대화 영역은 fragment라서 입력 조작 시 이 영역만 다시 실행됨
+    # (💡 [Phase 11.1] 진행 중인 작업 상태도 대화 영역 안에서 표시)
+    render_deep_dive_conversation(perspective)
+
+    # 다른 관점으로 전환 옵션
+    st.divider()
+    st.markdown("### 🔀 다른 관점도 탐색해보기")
+
+    other_perspectives = {k: v for k, v in PERSPECTIVES.items()
+                         if k != st.session_state.selected_perspective}
+
+    cols = st.columns(3)
+    for i, (key, info) in enumerate(other_perspectives.items()):
+        with cols[i % 3]:
+            if st.button(
+                f"{info['emoji']} {info['name']}",
+                key=f"switch_{key}",
+                use_container_width=True
+            ):
+                select_perspective(key)
+                st.rerun()
+
+
+@st.fragment
+@profiled_rerun(current_session_id)
+@profiled("render_deep_dive_conversation")
+def render_deep_dive_conversation(perspective: dict):
+    """[Phase 11] 심화 탐색 대화 영역 (fragment): 저장 버튼, 대화 히스토리, 진행 상황, 추가 질문"""
+    # 끝났지만 아직 회수하지 않은 작업이 있으면 먼저 반영 (다시 제출해서 결과를 버리지 않도록)
+    # 💡 [Phase 11.1] 히스토리는 아래에서 그리므로 반영 후 다시 실행할 필요 없음
+    collect_job("deep_dive")
+    render_degradations("deep_dive")
+
+    # 심화 탐색 결과도, 작업도 없으면 자동으로 시작 (진행 상황은 아래 status_area에 표시)
+    history = get_deep_dive_history(st.session_state.selected_perspective)
+    if not history and "deep_dive" not in st.session_state.jobs:
+        run_deep_dive()
+
+    # 내보내기 버튼 (대화가 바뀔 때 함께 갱신되도록 fragment 안에 둠)
+    if history:
+        _, export_col = st.columns([4, 1])
+        with export_col:
+            st.download_button(
+                label="📥 저장하기",
+                data=generate_export_markdown(),
+                file_name=get_safe_filename(),
+                mime="text/markdown",
+                help="분석 결과와 심화 탐색 내용을 마크다운 파일로 다운로드합니다",
+                use_container_width=True
+            )
+
+    # 대화 히스토리 표시 (후속 질문이 아래로 이어지도록)
+    # 💡 [Phase 21] 최근 메시지만 그리고, 이전 대화는 '더 보기'로 불러옴
+    if history:
+        window_key = f"deep_dive_{st.session_state.selected_perspective}"
+        hidden, visible = history_window(history, window_key)
+        render_older_history_button(hidden, window_key)
 
-    # 대화 히스토리 전체 표시 (후속 질문이 아래로 이어지도록)
-    if st.session_state.deep_dive_history:
-        for i, msg in enumerate(st.session_state.deep_dive_history):
+        for i, msg in enumerate(visible):
             if msg["role"] == "user":
                 # 사용자의 추가 질문 표시
                 st.markdown("**💬 추가 질문:**")
@@ -472,9 +1475,12 @@ def render_deep_dive_mode():
                 st.markdown(msg["content"])
 
             # 메시지 사이 구분선 (마지막 메시지 뒤에는 표시하지 않음)
-            if i < len(st.session_state.deep_dive_history) - 1:
+            if i < len(visible) - 1:
                 st.divider()
 
+    # 💡 [Phase 11.1] 새 답변이 붙을 자리에 진행 상황 표시 (입력창을 먼저 그린 뒤 채움)
+    status_area = st.container()
+
     st.divider()
 
     # 추가 질문 입력
@@ -488,39 +1494,225 @@ def render_deep_dive_mode():
 
     col1, col2 = st.columns([1, 5])
     with col1:
-        if st.button("💬 질문하기", type="primary", use_container_width=True):
+        if st.button(
+            "💬 질문하기",
+            type="primary",
+            disabled=is_job_active("deep_dive"),
+            use_container_width=True,
+            key="follow_up_btn"
+        ):
             if follow_up.strip():
-                with st.spinner("답변 생성 중..."):
-                    run_deep_dive(follow_up)
-                st.rerun()
+                run_deep_dive(follow_up)
+                rerun_conversation("deep_dive")
             else:
                 st.warning("질문을 입력해주세요.")
 
-    # 다른 관점으로 전환 옵션
+    render_conversation_job("deep_dive", status_area)
+
+
+@profiled("render_compare_mode")
+def render_compare_mode():
+    """[Phase 14] 관점 비교 모드 렌더링"""
+    keys = [key for key in st.session_state.compare_perspectives if key in PERSPECTIVES]
+    if len(keys) < 2:
+        return
+
     st.divider()
-    st.markdown("### 🔀 다른 관점도 탐색해보기")
 
-    other_perspectives = {k: v for k, v in PERSPECTIVES.items()
-                         if k != st.session_state.selected_perspective}
+    # 헤더
+    st.markdown("## 🆚 관점 비교")
+    st.caption(" · ".join(f"{PERSPECTIVES[key]['emoji']} {PERSPECTIVES[key]['name']}" for key in keys))
+    if st.session_state.uploaded_file_name:
+        st.caption(f"📄 **문서**: {st.session_state.uploaded_file_name}")
+    else:
+        display_query = st.session_state.last_query[:80]
+        if len(st.session_state.last_query) > 80:
+            display_query += "..."
+        st.caption(f"**원래 주제**: {display_query}")
 
-    cols = st.columns(3)
-    for i, (key, info) in enumerate(other_perspectives.items()):
-        with cols[i]:
-            if st.button(
-                f"{info['emoji']} {info['name']}",
-                key=f"switch_{key}",
+    # 네비게이션 버튼
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("← 분석 결과로", use_container_width=True, key="compare_back_btn"):
+            reset_to_analysis()
+            st.rerun()
+    with col2:
+        if st.button("🔄 새 분석", use_container_width=True, key="compare_new_btn"):
+            start_new_analysis()
+            st.rerun()
+
+    st.divider()
+
+    # 💡 [Phase 11.1] 진행 중인 비교 작업 상태는 대화 영역 안에서 표시
+    render_compare_conversation(keys)
+
+
+@st.fragment
+@profiled_rerun(current_session_id)
+@profiled("render_compare_conversation")
+def render_compare_conversation(keys: list):
+    """[Phase 14] 비교 모드 대화 영역 (fragment): 관점별 대화 창, 진행 상황, 공통 추가 질문"""
+    collect_job("compare")
+    render_degradations("compare")
+
+    # 아직 대화가 없는 관점이 있고 진행 중인(또는 회수 전인) 작업도 없으면 한꺼번에 시작
+    if any(not get_deep_dive_history(key) for key in keys) and "compare" not in st.session_state.jobs:
+        run_comparison()
+
+    if any(get_deep_dive_history(key) for key in keys):
+        _, export_col = st.columns([4, 1])
+        with export_col:
+            st.download_button(
+                label="📥 저장하기",
+                data=generate_export_markdown(),
+                file_name=get_safe_filename(),
+                mime="text/markdown",
+                help="분석 결과와 관점별 심화 탐색 내용을 마크다운 파일로 다운로드합니다",
                 use_container_width=True
-            ):
-                select_perspective(key)
-                st.rerun()
+            )
+
+    # 관점별 대화 창 (각자 독립된 히스토리)
+    panes = st.columns(len(keys))
+    for pane, key in zip(panes, keys):
+        info = PERSPECTIVES[key]
+        with pane:
+            st.markdown(f"#### {info['emoji']} {info['name']}")
+            with st.container(height=600):
+                # 💡 [Phase 21] 관점 창마다 최근 메시지만 표시
+                hidden, visible = history_window(get_deep_dive_history(key), f"compare_{key}")
+                render_older_history_button(hidden, f"compare_{key}")
+                for msg in visible:
+                    if msg["role"] == "user":
+                        st.markdown("**💬 추가 질문:**")
+                        st.info(msg["content"])
+                    else:
+                        st.markdown(msg["content"])
+
+    status_area = st.container()
+
+    st.divider()
+
+    # 공통 추가 질문 (모든 관점에 동시에 전송)
+    st.markdown("### 💬 모든 관점에 질문하기")
+
+    follow_up = st.text_input(
+        "추가 질문을 입력하세요:",
+        placeholder="예: '각 관점에서 첫 번째로 해야 할 일은 무엇인가요?'",
+        key="compare_follow_up_input"
+    )
+
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        if st.button(
+            "💬 모두에게 질문하기",
+            type="primary",
+            disabled=is_job_active("compare"),
+            use_container_width=True
+        ):
+            if follow_up.strip():
+                run_comparison(follow_up)
+                rerun_conversation("compare")
+            else:
+                st.warning("질문을 입력해주세요.")
+
+    render_conversation_job("compare", status_area)
+
+
+def generate_variant_markdown(rows: list) -> str:
+    """[Phase 20] 변형 × 관점 매트릭스를 마크다운으로 생성"""
+    lines = [
+        "# 🔮 PRISM-Lite 질문 변형 비교",
+        "",
+        f"**생성 일시**: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        f"**기본 질문**: {rows[0]['query']}",
+        ""
+    ]
+    for row in rows:
+        lines.append("---")
+        lines.append("")
+        lines.append(f"## 🧪 {row['variant'] or '기본 질문'}")
+        lines.append("")
+        lines.append(row["result"])
+        lines.append("")
+    return "\n".join(lines)
+
+
+def render_variant_matrix():
+    """[Phase 20] 변형 × 관점 매트릭스 렌더링"""
+    rows = load_blob("variant_results")
+    if not rows:
+        return
+
+    st.divider()
+
+    # 헤더
+    st.markdown("## 🧪 변형 × 관점 매트릭스")
+    display_query = rows[0]["query"][:80]
+    if len(rows[0]["query"]) > 80:
+        display_query += "..."
+    st.caption(f"**기본 질문**: {display_query}")
+    render_degradations("variants")
 
+    # 네비게이션 버튼
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("← 분석 결과로", use_container_width=True, key="variants_back_btn"):
+            reset_to_analysis()
+            st.rerun()
+    with col2:
+        st.download_button(
+            label="📥 저장하기",
+            data=generate_variant_markdown(rows),
+            file_name=f"PRISM_변형비교_{datetime.now().strftime('%Y%m%d_%H%M')}.md",
+            mime="text/markdown",
+            use_container_width=True,
+            key="variants_download_btn"
+        )
 
+    # 💡 [Phase 22] 관점이 많으면 고른 관점만 열로 표시
+    keys = list(PERSPECTIVES)
+    if len(keys) > MATRIX_DEFAULT_COLUMNS:
+        keys = st.multiselect(
+            "표시할 관점",
+            options=list(PERSPECTIVES),
+            default=list(PERSPECTIVES)[:MATRIX_DEFAULT_COLUMNS],
+            format_func=lambda k: f"{PERSPECTIVES[k]['emoji']} {PERSPECTIVES[k]['name']}",
+            key="variant_columns_select"
+        ) or list(PERSPECTIVES)[:MATRIX_DEFAULT_COLUMNS]
+
+    # 열: 관점, 행: 변형 (관점 섹션을 찾지 못한 결과는 한 칸에 통째로 표시)
+    label_col, *header_cols = st.columns([1] + [2] * len(keys))
+    with label_col:
+        st.markdown("**변형**")
+    for col, key in zip(header_cols, keys):
+        with col:
+            st.markdown(f"**{PERSPECTIVES[key]['emoji']} {PERSPECTIVES[key]['name']}**")
+
+    for row in rows:
+        st.divider()
+        label_col, *cells = st.columns([1] + [2] * len(keys))
+        with label_col:
+            st.markdown(f"**{row['variant'] or '기본 질문'}**")
+            if row["cached"]:
+                st.caption("♻️ 재사용")
+        if not row["sections"]:
+            with cells[0]:
+                st.markdown(row["result"])
+            continue
+        for cell, key in zip(cells, keys):
+            with cell:
+                with st.container(height=320):
+                    st.markdown(row["sections"].get(key, "(이 관점 섹션 없음)"))
+
+
+@profiled("render_sidebar")
 def render_sidebar():
     """사이드바 렌더링"""
     with st.sidebar:
         st.markdown("### 💡 사용 예시")
         st.caption("클릭하면 입력창에 자동으로 입력됩니다")
 
+        # 💡 [Phase 25] precompute_queries.txt에도 같은 예시를 두어 캐시 스냅샷에 미리 분석해 둠
         examples = [
             "새로운 언어를 배우고 싶은데 어떤 방법이 좋을까요?",
             "팀 내 갈등을 해결하려면 어떻게 해야 할까요?",
@@ -547,14 +1739,20 @@ def render_sidebar():
             perspective = PERSPECTIVES.get(st.session_state.selected_perspective)
             if perspective:
                 st.info(f"{perspective['emoji']} **{perspective['name']}** 심화 탐색 중")
-                turn_count = len([m for m in st.session_state.deep_dive_history if m["role"] == "assistant"])
+                history = get_deep_dive_history(st.session_state.selected_perspective)
+                turn_count = len([m for m in history if m["role"] == "assistant"])
                 st.caption(f"대화 턴: {turn_count}")
-        elif st.session_state.last_result:
+        elif st.session_state.mode == "variants" and load_blob("variant_results"):
+            st.info(f"🧪 {len(load_blob('variant_results'))}개 질문 변형 비교 중")
+        elif st.session_state.mode == "compare":
+            st.info(f"🆚 {len(st.session_state.compare_perspectives)}개 관점 비교 중")
+            st.caption(" ".join(PERSPECTIVES[key]["emoji"] for key in st.session_state.compare_perspectives))
+        elif load_blob("last_result"):
             st.success("분석 완료 ✨")
             if st.session_state.uploaded_file_name:
                 st.caption(f"📄 {st.session_state.uploaded_file_name}")
             st.caption("관점을 선택해 더 깊이 탐색하거나,\n결과를 저장해보세요!")
-        elif st.session_state.extracted_text:
+        elif load_blob("extracted_text"):
             st.info("📄 텍스트 추출 완료")
             st.caption("분석 질문을 입력하고 시작하세요!")
         else:
@@ -570,13 +1768,15 @@ def render_sidebar():
             1. 주제/질문 입력 → 분석 시작
 
             **방법 2: 문서 업로드** 📄
-            1. PDF/이미지 업로드
+            1. PDF/이미지 업로드 (여러 개 선택 가능)
             2. 텍스트 추출
             3. 분석 질문 입력 → 분석 시작
 
             **공통**
-            - 4가지 관점 확인
+            - 관점별 분석 확인
             - 관심 관점 선택 → 심화 탐색
+            - 여러 관점 선택 → 나란히 비교
+            - 🧪 변형 비교 → 조건별 답을 한 표로 비교
             - 추가 질문으로 대화 이어가기
             - 저장하기로 결과 다운로드
             """)
@@ -601,21 +1801,140 @@ def render_sidebar():
         """)
 
 
+def render_profiler_panel():
+    """[Phase 10] 프로파일링 디버그 패널 (PRISM_PROFILE이 켜져 있을 때만)"""
+    if not PROFILE_ENABLED:
+        return
+
+    with st.sidebar:
+        st.divider()
+        st.markdown("### 🛠️ 프로파일러")
+
+        summary = get_summary()
+        reruns = summary["reruns"]
+        if reruns["count"]:
+            st.caption(
+                f"전체 rerun {reruns['count']}회 · "
+                f"p50 {reruns['p50'] * 1000:.0f}ms · p95 {reruns['p95'] * 1000:.0f}ms"
+            )
+
+        # 이 세션의 직전 rerun 구간별 시간
+        mine = [r for r in summary["recent"] if r["session_id"] == st.session_state.session_id]
+        if mine:
+            last = mine[-1]
+            label = f"직전 rerun ({last['total'] * 1000:.0f}ms)"
+            if last.get("fragment"):
+                label = f"직전 fragment rerun: {last['fragment']} ({last['total'] * 1000:.0f}ms)"
+            with st.expander(label, expanded=False):
+                for name, elapsed in sorted(last["sections"].items(), key=lambda item: -item[1]):
+                    st.caption(f"{name}: {elapsed * 1000:.1f}ms")
+
+        with st.expander("구간별 누적 (전체 세션)", expanded=False):
+            rows = [
+                {
+                    "구간": name,
+                    "호출": section["calls"],
+                    "평균(ms)": round(section["avg"] * 1000, 1),
+                    "p95(ms)": round(section["p95"] * 1000, 1),
+                    "최대(ms)": round(section["max"] * 1000, 1),
+                }
+                for name, section in sorted(summary["sections"].items(), key=lambda item: -item[1]["avg"])
+            ]
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+
+            models = get_routing_stats()["models"]
+            for model, stats in models.items():
+                p50 = f"{stats['p50']:.1f}s" if stats["p50"] is not None else "-"
+                st.caption(f"🧠 {model}: {stats['calls']}회, p50 {p50}, 오류율 {stats['error_rate']:.0%}")
+
+            # 💡 [Phase 24] 키가 여럿일 때만 키별 사용량 표시
+            credentials = get_credential_stats()
+            if len(credentials) > 1:
+                for stats in credentials:
+                    line = f"🔑 {stats['key']}: {stats['calls']}회 (진행 중 {stats['in_flight']})"
+                    if stats["rate_limited"] or stats["auth_failures"]:
+                        line += f" · 한도 초과 {stats['rate_limited']} · 인증 실패 {stats['auth_failures']}"
+                    if stats["cooldown_seconds"]:
+                        line += f" · ⏸️ {stats['cooldown_reason']} ({stats['cooldown_seconds']:.0f}초)"
+                    st.caption(line)
+
+            cancelled = get_cancellation_stats()
+            if cancelled["cancelled_calls"]:
+                st.caption(
+                    f"🛑 취소된 호출 {cancelled['cancelled_calls']}회 · "
+                    f"버린 출력 약 {cancelled['wasted_output_tokens']:,}토큰 · "
+                    f"아낀 출력 최대 {cancelled['avoided_output_tokens']:,}토큰"
+                )
+
+            diversity = get_diversity_stats()
+            if diversity["redundant"]:
+                st.caption(
+                    f"🔁 겹친 관점 섹션 {diversity['redundant']}개 → {diversity['regenerated']}개 다시 작성 "
+                    f"(검사 {diversity['checked']}회)"
+                )
+
+        cprofile_text = get_cprofile_text()
+        if cprofile_text:
+            with st.expander("cProfile (누적 시간 상위)", expanded=False):
+                st.code(cprofile_text, language=None)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 덤프", use_container_width=True, key="profile_dump_btn"):
+                st.toast(f"저장됨: {dump_profile()}")
+        with col2:
+            st.download_button(
+                "📥 JSON",
+                data=json.dumps(summary, ensure_ascii=False, indent=2),
+                file_name=DUMP_PATH,
+                mime="application/json",
+                use_container_width=True,
+                key="profile_download_btn"
+            )
+
+        # 💡 [Phase 25] 캐시 스냅샷: 이 인스턴스의 캐시를 내보내 새 인스턴스가 PRISM_CACHE_SNAPSHOT으로 불러옴
+        snapshot = get_snapshot_info()
+        if snapshot.get("error"):
+            st.caption(f"📦 스냅샷을 불러오지 못했습니다: {snapshot['error']}")
+        elif snapshot:
+            loaded = ", ".join(f"{name} {count}개" for name, count in snapshot["loaded"].items())
+            line = f"📦 시작 스냅샷: {loaded or '없음'}"
+            if snapshot["rejected"]:
+                line += f" · 버전이 달라 제외: {', '.join(snapshot['rejected'])}"
+            st.caption(line)
+
+        if st.button("📦 캐시 스냅샷 내보내기", use_container_width=True, key="snapshot_export_btn"):
+            result = export_cache_snapshot()
+            st.toast(f"저장됨: {result['path']} ({result['bytes'] / 1024:.1f}KB)")
+
+
 # ============================================================
 # 메인 앱 로직
 # ============================================================
 
 def main():
-    render_header()
-    render_input_section()
+    # 💡 [Phase 10] PRISM_PROFILE이 꺼져 있으면 측정 없이 그대로 실행
+    with profile_rerun(st.session_state.session_id):
+        if st.session_state.session_expired:
+            expire_session()
+
+        render_header()
+        render_input_section()
+
+        # 모드에 따라 다른 UI 표시
+        if st.session_state.mode == "deep_dive" and st.session_state.selected_perspective:
+            render_deep_dive_mode()
+        elif st.session_state.mode == "compare" and st.session_state.compare_perspectives:
+            render_compare_mode()
+        elif st.session_state.mode == "variants" and load_blob("variant_results"):
+            render_variant_matrix()
+        else:
+            render_analysis_result()
 
-    # 모드에 따라 다른 UI 표시
-    if st.session_state.mode == "deep_dive" and st.session_state.selected_perspective:
-        render_deep_dive_mode()
-    else:
-        render_analysis_result()
+        render_sidebar()
+        save_session_view()
 
-    render_sidebar()
+    render_profiler_panel()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""
+PRISM-Lite: API 키 풀
+여러 Upstage API 키를 함께 써서 키 하나의 호출 한도보다 많은 요청을 처리합니다.
+키마다 Solar 클라이언트, HTTP 세션, 한도 상태를 따로 두고
+진행 중인 호출이 가장 적은 정상 키로 요청을 보냅니다.
+
+[버전 히스토리]
+- Phase 24: 키 풀 (UPSTAGE_API_KEYS), 최소 부하 키 선택, 401/429 키 일시 제외, 키별 사용량
+"""
+
+import os
+import threading
+import time
+import requests
+from openai import OpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============================================================
+# 설정 (환경변수로 조정 가능)
+# ============================================================
+
+SOLAR_BASE_URL = "https://api.upstage.ai/v1/solar"
+
+# 429(호출 한도 초과)를 받은 키를 쉬게 하는 시간 (초, 응답에 Retry-After가 있으면 더 긴 쪽)
+DEFAULT_RATE_LIMIT_COOLDOWN_SECONDS = 30
+
+# 401(인증 실패)을 받은 키를 쉬게 하는 시간 (초). 키가 교체되었을 수 있으므로 나중에 다시 시도
+DEFAULT_AUTH_COOLDOWN_SECONDS = 600
+
+RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv("PRISM_KEY_RATE_LIMIT_COOLDOWN", DEFAULT_RATE_LIMIT_COOLDOWN_SECONDS))
+AUTH_COOLDOWN_SECONDS = float(os.getenv("PRISM_KEY_AUTH_COOLDOWN", DEFAULT_AUTH_COOLDOWN_SECONDS))
+
+# 키가 하나뿐일 때 SDK가 같은 키로 재시도하는 횟수 (openai 기본값)
+# 💡 키가 여럿이면 SDK 재시도를 끄고, 한도에 걸린 요청은 풀이 다른 키로 다시 보냅니다.
+SINGLE_KEY_SDK_RETRIES = 2
+
+
+class NoCredentialError(Exception):
+    """사용할 수 있는 API 키가 하나도 없을 때 발생합니다."""
+
+
+def load_api_keys() -> list:
+    """
+    UPSTAGE_API_KEYS(쉼표로 구분)와 UPSTAGE_API_KEY에서 키 목록을 읽습니다. (중복 제거, 순서 유지)
+    """
+    raw = os.getenv("UPSTAGE_API_KEYS", "").split(",") + [os.getenv("UPSTAGE_API_KEY", "")]
+    keys = []
+    for key in (value.strip() for value in raw):
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def mask_key(api_key: str) -> str:
+    """화면/로그에 보여줄 키 표시 (끝 4자리만)"""
+    return f"…{api_key[-4:]}" if len(api_key) > 4 else "…"
+
+
+def retry_after_seconds(headers) -> float:
+    """응답 헤더의 Retry-After(초)를 읽습니다. 없거나 날짜 형식이면 None."""
+    try:
+        return float(headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class Credential:
+    """API 키 하나와 그 키 전용 클라이언트/세션, 사용량"""
+
+    def __init__(self, api_key: str, sdk_retries: int):
+        self.api_key = api_key
+        self.label = mask_key(api_key)
+        self.client = OpenAI(api_key=api_key, base_url=SOLAR_BASE_URL, max_retries=sdk_retries)
+        # Document Parse 요청용 (키별로 연결을 재사용)
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.auth_failures = 0
+        self.cooldown_until = 0.0
+        self.cooldown_reason = ""
+
+
+class CredentialPool:
+    """
+    API 키 풀.
+
+    acquire()로 키를 받아 호출하고, 끝나면 release()에 HTTP 상태 코드를 알려주면
+    429/401을 받은 키는 쉬는 시간 동안 선택 대상에서 빠집니다.
+    모든 키가 쉬고 있으면 가장 먼저 돌아오는 키를 씁니다. (요청을 막지는 않음)
+    """
+
+    def __init__(self, api_keys: list):
+        sdk_retries = SINGLE_KEY_SDK_RETRIES if len(api_keys) == 1 else 0
+        self._credentials = [Credential(api_key, sdk_retries) for api_key in api_keys]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._credentials)
+
+    def acquire(self) -> Credential:
+        """
+        진행 중인 호출이 가장 적은 정상 키를 고릅니다. (같으면 지금까지 덜 쓴 키)
+
+        Raises:
+            NoCredentialError: 설정된 키가 없는 경우
+        """
+        if not self._credentials:
+            raise NoCredentialError(
+                "API 키가 설정되지 않았습니다. `.env` 파일의 UPSTAGE_API_KEY(또는 UPSTAGE_API_KEYS)를 확인해주세요."
+            )
+
+        now = time.time()
+        with self._lock:
+            healthy = [c for c in self._credentials if c.cooldown_until <= now]
+            if healthy:
+                credential = min(healthy, key=lambda c: (c.in_flight, c.calls))
+            else:
+                credential = min(self._credentials, key=lambda c: c.cooldown_until)
+            credential.in_flight += 1
+            credential.calls += 1
+        return credential
+
+    def release(self, credential: Credential, status: int = 200, retry_after: float = None):
+        """
+        호출이 끝난 키를 돌려받고 결과를 기록합니다.
+
+        Args:
+            credential: acquire()로 받은 키
+            status: HTTP 상태 코드 (응답 없이 실패했으면 0)
+            retry_after: 429 응답의 Retry-After (초, 선택적)
+        """
+        with self._lock:
+            credential.in_flight -= 1
+            if 200 <= status < 300:
+                return
+            credential.errors += 1
+            if status == 429:
+                credential.rate_limited += 1
+                self._cool_down(credential, max(RATE_LIMIT_COOLDOWN_SECONDS, retry_after or 0), "호출 한도 초과")
+            elif status == 401:
+                credential.auth_failures += 1
+                self._cool_down(credential, AUTH_COOLDOWN_SECONDS, "인증 실패")
+
+    def _cool_down(self, credential: Credential, seconds: float, reason: str):
+        credential.cooldown_until = max(credential.cooldown_until, time.time() + seconds)
+        credential.cooldown_reason = reason
+
+    def has_available(self) -> bool:
+        """지금 쉬고 있지 않은 키가 있는지"""
+        now = time.time()
+        with self._lock:
+            return any(c.cooldown_until <= now for c in self._credentials)
+
+    def get_stats(self) -> list:
+        """키별 호출 수, 진행 중인 호출, 한도 초과/인증 실패 횟수, 남은 쉬는 시간을 반환합니다. (키는 가려서 표시)"""
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "key": c.label,
+                    "calls": c.calls,
+                    "in_flight": c.in_flight,
+                    "errors": c.errors,
+                    "rate_limited": c.rate_limited,
+                    "auth_failures": c.auth_failures,
+                    "cooldown_seconds": max(0.0, c.cooldown_until - now),
+                    "cooldown_reason": c.cooldown_reason if c.cooldown_until > now else "",
+                }
+                for c in self._credentials
+            ]
+
+
+# 프로세스 전체에서 공유하는 키 풀 (모든 세션이 같은 키 한도를 나눠 씀)
+credential_pool = CredentialPool(load_api_keys())
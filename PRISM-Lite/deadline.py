@@ -0,0 +1,75 @@
+"""
+PRISM-Lite: 요청 시간 예산
+버튼 한 번으로 시작된 작업(문서 추출, 분석 등)에 전체 시간 예산(SLO)을 주고,
+단계마다 남은 시간을 나눠 쓰며, 시간이 부족해 품질을 낮춘 결정은 모두 기록합니다.
+
+[버전 히스토리]
+- Phase 23: 작업별 마감 시간, 단계별 예산 분배, 품질 조정 기록
+- Phase 23.1: 관점 섹션당 예상 생성 시간은 라우터 정책(seconds_per_section)과 모델별 실측값으로 이동
+"""
+
+import os
+import threading
+import time
+
+# ============================================================
+# 설정 (환경변수로 조정 가능)
+# ============================================================
+
+# 분석/심화 탐색 작업 하나의 목표 완료 시간 (초)
+DEFAULT_ANALYSIS_SLO_SECONDS = 60
+
+# 문서 추출 작업 하나의 목표 완료 시간 (초)
+DEFAULT_PARSE_SLO_SECONDS = 120
+
+ANALYSIS_SLO_SECONDS = float(os.getenv("PRISM_ANALYSIS_SLO_SECONDS", DEFAULT_ANALYSIS_SLO_SECONDS))
+PARSE_SLO_SECONDS = float(os.getenv("PRISM_PARSE_SLO_SECONDS", DEFAULT_PARSE_SLO_SECONDS))
+
+# 남은 시간이 이보다 적으면 부가 요청(이어쓰기, 중복 섹션 다시 쓰기, 재시도)을 건너뜀 (초)
+OPTIONAL_STEP_SECONDS = 15.0
+
+# 남은 시간이 이보다 적으면 새로 생성하지 않고 비슷한 이전 분석을 찾아봄 (초)
+MIN_GENERATION_SECONDS = 5.0
+
+
+class Deadline:
+    """
+    작업 하나의 마감 시간.
+
+    stage()로 만든 단계별 마감은 부모의 남은 시간 중 일부만 쓰며,
+    기록(note)은 부모와 같은 목록에 쌓여 작업이 끝난 뒤 한꺼번에 보고됩니다.
+    """
+
+    def __init__(self, seconds: float, _notes: list = None, _lock=None, _started: float = None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self._origin = _started if _started is not None else self.started
+        self._notes = _notes if _notes is not None else []
+        self._lock = _lock or threading.Lock()
+
+    @property
+    def remaining(self) -> float:
+        """남은 시간 (초, 0 이상)"""
+        return max(0.0, self.started + self.seconds - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining <= 0
+
+    def elapsed(self) -> float:
+        """작업 시작(최상위 마감 생성)부터 지난 시간 (초)"""
+        return time.monotonic() - self._origin
+
+    def stage(self, fraction: float) -> "Deadline":
+        """남은 시간의 fraction만큼을 쓰는 단계별 마감을 만듭니다. (기록은 공유)"""
+        return Deadline(self.remaining * fraction, self._notes, self._lock, self._origin)
+
+    def note(self, message: str):
+        """시간 예산 때문에 내린 결정을 기록합니다. (같은 내용은 한 번만)"""
+        with self._lock:
+            if message not in self._notes:
+                self._notes.append(message)
+
+    def notes(self) -> list:
+        with self._lock:
+            return list(self._notes)
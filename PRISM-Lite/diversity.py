@@ -0,0 +1,107 @@
+"""
+PRISM-Lite: 관점 중복 검사
+다관점 분석 결과의 관점 섹션끼리 얼마나 겹치는지 로컬에서 계산하고,
+거의 같은 내용을 반복한 섹션을 골라 그 섹션만 다시 쓰도록 합니다.
+
+[버전 히스토리]
+- Phase 19: 단어 n-gram 벡터 코사인 유사도, 중복 섹션 선택
+"""
+
+import math
+import os
+import re
+from collections import Counter
+
+# ============================================================
+# 설정 (환경변수로 조정 가능)
+# ============================================================
+
+# 두 섹션의 유사도가 이 값 이상이면 중복으로 봄 (0~1, 단어 bigram 코사인)
+DEFAULT_REDUNDANCY_THRESHOLD = 0.5
+
+# 유사도를 비교할 단어 n-gram 길이 (1이면 단어, 2면 연속한 두 단어)
+NGRAM_SIZES = (1, 2)
+
+REDUNDANCY_THRESHOLD = float(os.getenv("PRISM_REDUNDANCY_THRESHOLD", DEFAULT_REDUNDANCY_THRESHOLD))
+
+_WORD_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+# 모든 섹션에 공통으로 들어가는 형식 문구 (유사도 계산에서 제외)
+_TEMPLATE_LINE = re.compile(r"^#{1,4}.*$|\*\*(핵심 내용|강점|한계)\*\*\s*:?", re.MULTILINE)
+
+
+def section_vector(text: str) -> Counter:
+    """
+    섹션 텍스트를 단어 n-gram 빈도 벡터로 변환합니다.
+
+    제목 줄과 "핵심 내용/강점/한계" 같은 형식 문구는 모든 섹션에 똑같이 들어가므로 뺍니다.
+
+    Returns:
+        Counter: n-gram → 등장 횟수
+    """
+    words = _WORD_PATTERN.findall(_TEMPLATE_LINE.sub(" ", text).lower())
+    vector = Counter()
+    for n in NGRAM_SIZES:
+        vector.update(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+    return vector
+
+
+def cosine_similarity(a: Counter, b: Counter) -> float:
+    """두 빈도 벡터의 코사인 유사도 (둘 중 하나가 비어 있으면 0)"""
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(count * b[gram] for gram, count in a.items() if gram in b)
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm
+
+
+def similarity_matrix(texts: list) -> list:
+    """
+    텍스트 목록의 쌍별 유사도 행렬을 계산합니다. (대각선은 1.0)
+
+    Returns:
+        list: n×n 유사도 행렬 (list of list)
+    """
+    vectors = [section_vector(text) for text in texts]
+    size = len(vectors)
+    matrix = [[1.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1, size):
+            matrix[i][j] = matrix[j][i] = cosine_similarity(vectors[i], vectors[j])
+    return matrix
+
+
+def find_redundant_sections(sections: list, threshold: float = None) -> list:
+    """
+    다른 섹션과 거의 같은 내용을 반복한 섹션을 고릅니다.
+
+    중복 쌍에서는 뒤에 나온 섹션을 다시 쓸 대상으로 삼으므로, 전형성이 높은 관점이
+    기준으로 남고 덜 전형적인 관점이 새 시각으로 다시 작성됩니다.
+
+    Args:
+        sections: split_perspective_sections 결과 ({"key", "text"} 목록, 등장 순서)
+        threshold: 중복 기준 유사도 (기본: REDUNDANCY_THRESHOLD)
+
+    Returns:
+        list: {"key": 다시 쓸 관점, "similar_to": 기준 관점, "similarity": float} 목록
+    """
+    threshold = REDUNDANCY_THRESHOLD if threshold is None else threshold
+    matrix = similarity_matrix([section["text"] for section in sections])
+
+    redundant = []
+    flagged = set()
+    for j in range(len(sections)):
+        candidates = [(matrix[i][j], i) for i in range(j) if i not in flagged]
+        if not candidates:
+            continue
+        similarity, i = max(candidates)
+        if similarity >= threshold:
+            flagged.add(j)
+            redundant.append({
+                "key": sections[j]["key"],
+                "similar_to": sections[i]["key"],
+                "similarity": similarity
+            })
+    return redundant
@@ -0,0 +1,250 @@
+"""
+PRISM-Lite: 백그라운드 작업 큐
+분석/문서 파싱을 Streamlit 스크립트 밖의 제한된 스레드 풀에서 실행하고,
+작업 ID로 상태를 조회하며 결과는 가져갈 때까지 보관합니다.
+
+[버전 히스토리]
+- Phase 12: 작업 ID 기반 백그라운드 실행, 진행 상황 보고, 결과 보관
+- Phase 18: 취소 콜백 (실행 중인 작업의 외부 호출 중단)
+- Phase 18.1: 세션의 작업 목록 조회 (새로 연결한 탭이 진행 중인 작업을 이어받을 때 사용)
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================
+# 설정
+# ============================================================
+
+# 동시에 실행할 최대 작업 수 (프로세스 전체)
+DEFAULT_MAX_WORKERS = 8
+
+# 실행 대기 중인 작업까지 포함한 최대 작업 수 (초과 시 제출 거부)
+DEFAULT_MAX_QUEUED = 64
+
+# 끝난 작업 결과를 가져가지 않으면 이 시간 뒤에 삭제
+DEFAULT_RESULT_TTL_SECONDS = 30 * 60
+
+# 작업 상태
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+
+class JobQueueFullError(RuntimeError):
+    """대기 중인 작업이 너무 많아 새 작업을 받을 수 없을 때 발생합니다."""
+
+
+# 작업 함수 안에서 자기 작업 ID를 알 수 있도록 (report_progress용)
+_local = threading.local()
+
+
+def report_progress(**fields):
+    """
+    실행 중인 작업의 진행 상황을 기록합니다. 작업 스레드 밖에서 호출하면 무시됩니다.
+
+    예: report_progress(completed=3, total=10, message="p.21-30 완료")
+    """
+    job = getattr(_local, "job", None)
+    if job is not None:
+        job["progress"].update(fields)
+
+
+class JobManager:
+    """
+    세션과 무관하게 프로세스 전체에서 공유하는 작업 관리자.
+
+    - submit(): 작업을 스레드 풀에 넣고 작업 ID를 반환 (같은 dedupe_key면 기존 작업 재사용)
+    - get(): 상태/진행 상황 조회 (결과는 포함하지 않음)
+    - collect(): 끝난 작업의 결과를 가져가고 목록에서 삭제
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_queued: int = DEFAULT_MAX_QUEUED,
+                 result_ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS):
+        self.max_queued = max_queued
+        self.result_ttl_seconds = result_ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prism-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    # ─────────────────────────────────────────────
+    # 제출
+    # ─────────────────────────────────────────────
+    def submit(self, session_id: str, kind: str, func, *args, dedupe_key: str = None,
+               meta: dict = None, on_cancel=None, **kwargs) -> str:
+        """
+        작업을 제출합니다.
+
+        Args:
+            session_id: 작업을 요청한 세션 ID
+            kind: 작업 종류 (예: "analysis", "deep_dive", "extraction")
+            func: 실행할 함수
+            *args, **kwargs: func에 넘길 인자
+            dedupe_key: 같은 세션에서 같은 키의 작업이 진행 중이면 새로 만들지 않음
+            meta: 결과를 가져갈 때 함께 돌려받을 부가 정보
+            on_cancel: 💡 [Phase 18] 실행 중에 취소되면 호출할 함수 (진행 중인 API 호출 중단용)
+
+        Returns:
+            작업 ID
+
+        Raises:
+            JobQueueFullError: 진행 중인 작업 수가 상한에 도달한 경우
+        """
+        self.cleanup_expired()
+
+        with self._lock:
+            if dedupe_key:
+                for job in self._jobs.values():
+                    if (job["session_id"] == session_id and job["dedupe_key"] == dedupe_key
+                            and job["status"] in ACTIVE_STATUSES):
+                        return job["id"]
+
+            active = sum(1 for job in self._jobs.values() if job["status"] in ACTIVE_STATUSES)
+            if active >= self.max_queued:
+                raise JobQueueFullError("요청이 많아 잠시 후 다시 시도해주세요.")
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "session_id": session_id,
+                "kind": kind,
+                "dedupe_key": dedupe_key,
+                "meta": meta or {},
+                "on_cancel": on_cancel,
+                "status": STATUS_PENDING,
+                "progress": {},
+                "result": None,
+                "error": "",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+            }
+            self._jobs[job["id"]] = job
+            job["future"] = self._executor.submit(self._run, job, func, args, kwargs)
+
+        return job["id"]
+
+    def _run(self, job: dict, func, args, kwargs):
+        with self._lock:
+            if job["status"] != STATUS_PENDING:
+                return
+            job["status"] = STATUS_RUNNING
+            job["started_at"] = time.time()
+
+        _local.job = job
+        try:
+            result = func(*args, **kwargs)
+            error = ""
+        except Exception as e:
+            result = None
+            error = str(e)
+        finally:
+            _local.job = None
+
+        with self._lock:
+            if job["status"] == STATUS_CANCELLED:
+                return
+            job["result"] = result
+            job["error"] = error
+            job["status"] = STATUS_FAILED if error else STATUS_DONE
+            job["finished_at"] = time.time()
+
+    # ─────────────────────────────────────────────
+    # 조회 / 회수
+    # ─────────────────────────────────────────────
+    def get(self, job_id: str) -> dict:
+        """작업 상태를 조회합니다. 없는 작업이면 None을 반환합니다."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {
+                key: (dict(value) if key == "progress" else value)
+                for key, value in job.items()
+                if key not in ("result", "future", "on_cancel")
+            }
+
+    def find_session_jobs(self, session_id: str) -> dict:
+        """
+        세션이 아직 가져가지 않은 작업을 종류별로 반환합니다. (끝났지만 회수하지 않은 작업 포함)
+
+        Returns:
+            dict: {작업 종류: 작업 ID} (같은 종류가 여럿이면 가장 나중에 제출한 작업)
+        """
+        with self._lock:
+            jobs = sorted(
+                (job for job in self._jobs.values() if job["session_id"] == session_id),
+                key=lambda job: job["submitted_at"]
+            )
+            return {job["kind"]: job["id"] for job in jobs}
+
+    def collect(self, job_id: str) -> dict:
+        """
+        끝난 작업을 목록에서 꺼내 결과와 함께 반환합니다.
+
+        Returns:
+            작업 딕셔너리 ("result" 포함). 아직 진행 중이거나 없는 작업이면 None.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in ACTIVE_STATUSES:
+                return None
+            del self._jobs[job_id]
+        job.pop("future", None)
+        job.pop("on_cancel", None)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        작업을 취소합니다. 대기 중이면 실행되지 않고, 실행 중이면 결과가 버려집니다.
+        실행 중인 작업에 on_cancel이 있으면 호출해서 진행 중인 API 호출도 끊습니다.
+
+        Returns:
+            취소 처리 여부 (이미 끝난 작업이면 False)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                return False
+            job["status"] = STATUS_CANCELLED
+            job["finished_at"] = time.time()
+            job["future"].cancel()
+            del self._jobs[job_id]
+
+        # 콜백은 스트림을 닫는 등 시간이 걸릴 수 있으므로 잠금 밖에서 호출
+        if job["on_cancel"]:
+            job["on_cancel"]()
+        return True
+
+    def cleanup_expired(self) -> int:
+        """가져가지 않고 TTL이 지난 결과를 삭제합니다. 삭제한 작업 수를 반환합니다."""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] and now - job["finished_at"] > self.result_ttl_seconds
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def get_stats(self) -> dict:
+        """상태별 작업 수를 반환합니다."""
+        with self._lock:
+            stats = {}
+            for job in self._jobs.values():
+                stats[job["status"]] = stats.get(job["status"], 0) + 1
+        return stats
+
+
+# 프로세스 전체에서 공유하는 작업 관리자
+job_manager = JobManager(
+    max_workers=int(os.getenv("PRISM_JOB_WORKERS", DEFAULT_MAX_WORKERS)),
+    max_queued=int(os.getenv("PRISM_JOB_MAX_QUEUED", DEFAULT_MAX_QUEUED)),
+)
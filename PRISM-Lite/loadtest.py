@@ -0,0 +1,527 @@
+"""
+PRISM-Lite: 다중 세션 부하 테스트
+Streamlit AppTest로 여러 세션을 한 프로세스에서 동시에 헤드리스로 실행해
+app.py 프로세스 하나가 감당할 수 있는 동시 사용자 수를 측정합니다.
+분석/파싱 API는 지연 시간만 흉내 내는 stub으로 바꿔서 호출 비용 없이 실행합니다.
+
+[버전 히스토리]
+- Phase 15: 세션 시나리오 실행, 상호작용별 지연 시간 백분위, 세션당 CPU/RSS, 동시 세션 수 단계별 측정
+- Phase 15.1: 동시 AppTest 세션끼리 전역 Runtime, 테스트 설정, 스크립트 캐시를 공유 (다중 세션 오류 수정)
+
+💡 사용법: python loadtest.py --sessions 1,5,10,20 --follow-ups 3 --backend-latency 1.0
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# stub으로 바꿀 것이므로 실제 키는 필요 없음 (analyzer 임포트 시 클라이언트 생성용)
+os.environ.setdefault("UPSTAGE_API_KEY", "loadtest-stub")
+
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, local_script_runner
+from streamlit.testing.v1.util import build_mock_config_get_option
+
+import analyzer
+from jobs import job_manager
+from retriever import get_index
+from session_store import blob_store
+
+# 💡 선택 의존성: 있으면 RSS를 정확히 측정, 없으면 /proc 또는 최대 RSS로 대체
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ============================================================
+# 설정
+# ============================================================
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+DEFAULT_SESSION_LEVELS = "1,5,10,20"
+DEFAULT_FOLLOW_UPS = 3
+DEFAULT_BACKEND_LATENCY = 1.0
+DEFAULT_DOCUMENT_KB = 200
+DEFAULT_RAMP_UP_SECONDS = 2.0
+DEFAULT_SLO_SECONDS = 1.0
+DEFAULT_OUTPUT = "loadtest_report.json"
+
+# 스크립트 rerun 한 번, 백그라운드 작업 하나의 최대 대기 시간 (초)
+RERUN_TIMEOUT_SECONDS = 30
+JOB_TIMEOUT_SECONDS = 120
+
+# 작업이 끝났는지 다시 확인하는 간격 (앱의 JOB_POLL_SECONDS 역할)
+POLL_SECONDS = 0.2
+
+# RSS 최대치를 잡기 위한 샘플링 간격
+RSS_SAMPLE_SECONDS = 0.2
+
+SAMPLE_QUERIES = [
+    "프로젝트 마감이 촉박한데 품질도 유지해야 합니다. 어떻게 해야 할까요?",
+    "새로운 언어를 배우고 싶은데 어떤 방법이 좋을까요?",
+    "팀 내 갈등을 해결하려면 어떻게 해야 할까요?",
+    "AI 기술을 업무에 도입하려고 합니다.",
+    "이직을 고민하고 있습니다.",
+]
+
+SAMPLE_FOLLOW_UPS = [
+    "구체적인 실행 방법을 알려주세요",
+    "가장 먼저 해야 할 일은 무엇인가요?",
+    "이 방법의 위험 요소는 무엇인가요?",
+    "비슷한 사례가 있을까요?",
+]
+
+
+# ============================================================
+# 분석 API stub
+# ============================================================
+class StubBackend:
+    """
+    analyzer의 API 호출 함수를 같은 형태의 결과를 돌려주는 stub으로 바꿉니다.
+
+    app.py는 rerun마다 `from analyzer import ...`를 다시 실행하므로
+    analyzer 모듈의 속성만 바꾸면 모든 세션이 stub을 사용합니다.
+    deep_dive_many / parse_documents는 실제 함수를 그대로 두어 스레드 풀 경로까지 측정합니다.
+    """
+
+    def __init__(self, latency: float, document_kb: int, jitter: float = 0.3):
+        self.latency = latency
+        self.jitter = jitter
+        self.document_text = _make_document_text(document_kb * 1024)
+        self.analysis_text = _make_analysis_text()
+
+    def install(self):
+        analyzer.analyze_multi_perspective = self.analyze_multi_perspective
+        analyzer.analyze_document = self.analyze_document
+        analyzer.deep_dive_perspective = self.deep_dive_perspective
+        analyzer.parse_document = self.parse_document
+
+    def _wait(self):
+        if self.latency > 0:
+            time.sleep(random.uniform(self.latency * (1 - self.jitter), self.latency * (1 + self.jitter)))
+
+    def analyze_multi_perspective(self, user_input: str, handle=None) -> str:
+        self._wait()
+        return self.analysis_text
+
+    def analyze_document(self, question: str, sections: list, passages: str = "", handle=None) -> str:
+        self._wait()
+        return self.analysis_text
+
+    def deep_dive_perspective(self, original_query: str, perspective_key: str, previous_analysis: str = "",
+                              follow_up_question: str = "", conversation_history: list = None,
+                              handle=None) -> str:
+        self._wait()
+        info = analyzer.PERSPECTIVES[perspective_key]
+        topic = follow_up_question or original_query[:50]
+        return f"### {info['emoji']} {info['name']} 심화 탐색\n\n" + f"'{topic}'에 대한 {info['name']}의 답변입니다. " * 40
+
+    def parse_document(self, uploaded_file, on_shard=None, handle=None) -> dict:
+        self._wait()
+        return {"success": True, "text": self.document_text, "error": ""}
+
+
+def _make_analysis_text() -> str:
+    sections = []
+    for info in analyzer.PERSPECTIVES.values():
+        body = f"{info['description']}에서 보면 다음과 같은 점을 고려할 수 있습니다. " * 15
+        sections.append(f"### {info['emoji']} {info['name']} (전형성: {info['typicality']})\n\n{body}")
+    return "\n\n".join(sections)
+
+
+def _make_document_text(size: int) -> str:
+    paragraph = (
+        "본 문서는 사업 계획의 배경과 목표, 추진 일정, 예산, 위험 요소를 설명합니다. "
+        "각 단계별 담당자와 성과 지표를 함께 정리하였습니다.\n\n"
+    )
+    return (paragraph * (size // len(paragraph.encode("utf-8")) + 1))[:size // 3]
+
+
+class StubUploadedFile:
+    """Streamlit UploadedFile 대신 쓰는 최소 객체 (name, size, getvalue)"""
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.size = len(data)
+        self._data = data
+
+    def getvalue(self) -> bytes:
+        return self._data
+
+
+def stub_extract_documents(uploaded_files: list) -> dict:
+    """
+    app.extract_documents와 같은 형태의 결과를 만드는 작업 함수.
+
+    AppTest는 file_uploader에 파일을 넣을 수 없으므로, 업로드 시나리오는
+    이 함수를 "extraction" 작업으로 직접 제출하고 앱의 작업 회수 경로로 결과를 반영합니다.
+    """
+    results = analyzer.parse_documents(uploaded_files)
+    documents = [{"name": r["name"], "text": r["text"]} for r in results if r["success"]]
+    combined = analyzer.combine_documents(documents) if documents else ""
+    if combined:
+        get_index(combined)
+    return {
+        "documents": documents,
+        "combined": combined,
+        "errors": [f"{r['name']}: {r['error']}" for r in results if not r["success"]],
+        "total": len(uploaded_files)
+    }
+
+
+# ============================================================
+# 측정
+# ============================================================
+class Recorder:
+    """세션 스레드들이 함께 쓰는 측정치 기록기"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reruns = {}
+        self.jobs = {}
+        self.errors = []
+
+    def rerun(self, name: str, elapsed: float):
+        with self._lock:
+            self.reruns.setdefault(name, []).append(elapsed)
+
+    def job(self, name: str, elapsed: float):
+        with self._lock:
+            self.jobs.setdefault(name, []).append(elapsed)
+
+    def error(self, session_index: int, message: str):
+        with self._lock:
+            self.errors.append({"session": session_index, "error": message})
+
+
+def _percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _summarize(samples: list) -> dict:
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "p50": _percentile(values, 0.5),
+        "p95": _percentile(values, 0.95),
+        "p99": _percentile(values, 0.99),
+        "max": values[-1] if values else None,
+    }
+
+
+def _current_rss() -> int:
+    """현재 프로세스의 RSS (바이트)"""
+    if psutil:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # /proc이 없으면 최대 RSS로 대체 (Linux: KB 단위)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler:
+    """측정 구간 동안 RSS 최대치를 기록하는 백그라운드 스레드"""
+
+    def __init__(self):
+        self.peak = _current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(RSS_SAMPLE_SECONDS):
+            self.peak = max(self.peak, _current_rss())
+
+
+# ============================================================
+# AppTest 동시 실행 보정
+# ============================================================
+def share_test_runtime():
+    """
+    AppTest는 run()마다 전역 Runtime 싱글턴에 mock을 넣고 끝나면 None으로 지우며,
+    전역 설정 global.appTest도 run() 동안만 켭니다.
+    여러 세션을 스레드로 동시에 돌리면 먼저 끝난 세션이 다른 세션의 Runtime과 설정을 되돌려서
+    "Runtime hasn't been created!"나 위젯 상태 KeyError가 나므로,
+    마지막으로 본 mock Runtime을 계속 돌려주도록 조회 함수를 바꾸고 global.appTest는 항상 켜 둡니다.
+    또 AppTest는 rerun마다 스크립트 캐시를 새로 만들어 세션들이 app.py를 동시에 컴파일하는데,
+    Python 3.11의 ast.parse는 스레드 동시 호출에서 간헐적으로 실패하므로 캐시 하나를 공유합니다.
+    (실제 서버에서도 Runtime과 스크립트 캐시는 프로세스당 하나라서 이 보정이 측정을 왜곡하지 않음)
+    """
+    lock = threading.Lock()
+    last = {"runtime": None}
+
+    def _current(cls):
+        with lock:
+            if cls._instance is not None:
+                last["runtime"] = cls._instance
+            return last["runtime"]
+
+    def instance(cls):
+        runtime = _current(cls)
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return runtime
+
+    def exists(cls):
+        return _current(cls) is not None
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+
+    shared_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared_cache
+
+
+# ============================================================
+# 세션 시나리오
+# ============================================================
+class SessionScript:
+    """
+    세션 하나의 시나리오: 분석 → 관점 선택 → 추가 질문 N회 → 내보내기 → 문서 업로드/분석
+
+    - rerun 지연: AppTest.run() 한 번에 걸린 시간 (상호작용별)
+    - 작업 지연: 버튼 클릭부터 결과가 화면에 반영될 때까지 걸린 시간
+    """
+
+    def __init__(self, index: int, options, recorder: Recorder):
+        self.index = index
+        self.options = options
+        self.recorder = recorder
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT_SECONDS)
+
+    @property
+    def session_id(self) -> str:
+        return self.at.session_state["session_id"]
+
+    def run(self):
+        at = self.at
+
+        self._rerun("load")
+
+        # 1. 다관점 분석
+        at.text_area(key="input_area").input(SAMPLE_QUERIES[self.index % len(SAMPLE_QUERIES)])
+        at.button(key="analyze_text_btn").click()
+        self._submit_and_wait("analyze", "analysis")
+
+        # 2. 관점 선택 (심화 탐색 자동 시작)
+        perspective = list(analyzer.PERSPECTIVES)[self.index % len(analyzer.PERSPECTIVES)]
+        at.button(key=f"dive_{perspective}").click()
+        self._submit_and_wait("deep_dive", "deep_dive")
+
+        # 3. 추가 질문
+        for turn in range(self.options.follow_ups):
+            at.text_input(key="follow_up_input").input(SAMPLE_FOLLOW_UPS[turn % len(SAMPLE_FOLLOW_UPS)])
+            at.button(key="follow_up_btn").click()
+            self._submit_and_wait("follow_up", "deep_dive")
+
+        # 4. 내보내기 (대화 전체를 마크다운으로 만드는 rerun)
+        self._rerun("export")
+        if not at.get("download_button"):
+            raise RuntimeError("내보내기 버튼이 보이지 않습니다.")
+
+        # 5. 문서 업로드 → 문서 분석
+        at.button(key="deep_dive_back_btn").click()
+        self._rerun("back_to_analysis")
+        if not self.options.skip_upload:
+            self._upload()
+            at.text_input(key="doc_analysis_question").input("핵심 내용 요약")
+            at.button(key="analyze_doc_btn").click()
+            self._submit_and_wait("document_analyze", "analysis")
+
+    def _rerun(self, name: str):
+        started = time.perf_counter()
+        self.at.run()
+        self.recorder.rerun(name, time.perf_counter() - started)
+        if self.at.exception:
+            raise RuntimeError(f"{name}: {self.at.exception[0].value}")
+
+    def _submit_and_wait(self, name: str, slot: str):
+        started = time.perf_counter()
+        self._rerun(f"{name}_submit")
+        self._wait_for_job(name, slot, started)
+
+    def _wait_for_job(self, name: str, slot: str, started: float):
+        deadline = started + JOB_TIMEOUT_SECONDS
+        while slot in self.at.session_state["jobs"]:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{name}: {JOB_TIMEOUT_SECONDS}초 안에 작업이 끝나지 않았습니다.")
+            time.sleep(POLL_SECONDS)
+            self._rerun("poll")
+        self.recorder.job(name, time.perf_counter() - started)
+
+    def _upload(self):
+        started = time.perf_counter()
+        files = [StubUploadedFile(f"loadtest-{self.index}.pdf", b"%PDF-1.4 loadtest")]
+        job_id = job_manager.submit(
+            self.session_id,
+            "extraction",
+            stub_extract_documents,
+            files,
+            meta={"total": len(files)}
+        )
+        jobs = dict(self.at.session_state["jobs"])
+        jobs["extraction"] = job_id
+        self.at.session_state["jobs"] = jobs
+        self._rerun("upload_submit")
+        self._wait_for_job("upload", "extraction", started)
+
+
+def run_session(index: int, options, recorder: Recorder) -> str:
+    """세션 하나를 실행하고 세션 ID를 반환합니다. (실패는 recorder에 기록)"""
+    time.sleep(options.ramp_up * index / max(1, options.current_sessions))
+    script = SessionScript(index, options, recorder)
+    try:
+        script.run()
+    except Exception as e:
+        recorder.error(index, str(e))
+    try:
+        return script.session_id
+    except Exception:
+        return None
+
+
+# ============================================================
+# 단계별 실행
+# ============================================================
+def run_level(sessions: int, options) -> dict:
+    """
+    동시 세션 수 하나에 대해 모든 세션을 실행하고 측정 결과를 반환합니다.
+
+    Returns:
+        dict: {
+            "sessions", "wall_seconds", "errors",
+            "reruns": {"all": 통계, 상호작용 이름: 통계},
+            "jobs": {작업 이름: 통계},
+            "cpu_seconds_per_session", "cpu_utilization",
+            "rss_mb", "rss_mb_per_session", "peak_rss_mb"
+        }
+        통계는 {"count", "p50", "p95", "p99", "max"} (초)
+    """
+    options.current_sessions = sessions
+    recorder = Recorder()
+
+    gc.collect()
+    rss_before = _current_rss()
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+
+    with RssSampler() as sampler:
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="loadtest") as executor:
+            session_ids = list(executor.map(lambda i: run_session(i, options, recorder), range(sessions)))
+        rss_after = _current_rss()
+
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+
+    # 다음 단계에 영향을 주지 않도록 세션 데이터 정리
+    for session_id in session_ids:
+        if session_id:
+            blob_store.drop_session(session_id)
+
+    all_reruns = [value for values in recorder.reruns.values() for value in values]
+    mb = 1024 * 1024
+    return {
+        "sessions": sessions,
+        "wall_seconds": wall,
+        "errors": recorder.errors,
+        "reruns": {"all": _summarize(all_reruns), **{k: _summarize(v) for k, v in recorder.reruns.items()}},
+        "jobs": {k: _summarize(v) for k, v in recorder.jobs.items()},
+        "cpu_seconds_per_session": cpu / sessions,
+        "cpu_utilization": cpu / wall if wall else 0.0,
+        "rss_mb": rss_after / mb,
+        "rss_mb_per_session": max(0, rss_after - rss_before) / mb / sessions,
+        "peak_rss_mb": sampler.peak / mb,
+    }
+
+
+def estimate_capacity(levels: list, slo_seconds: float) -> int:
+    """오류 없이 rerun p95가 SLO 안에 드는 가장 큰 동시 세션 수 (없으면 0)"""
+    capacity = 0
+    for level in levels:
+        p95 = level["reruns"]["all"]["p95"]
+        if level["errors"] or p95 is None or p95 > slo_seconds:
+            break
+        capacity = level["sessions"]
+    return capacity
+
+
+def _print_level(level: dict):
+    reruns = level["reruns"]["all"]
+    print(
+        f"\n[{level['sessions']}개 세션] {level['wall_seconds']:.1f}초, 오류 {len(level['errors'])}건, "
+        f"rerun p50 {reruns['p50'] or 0:.3f}초 / p95 {reruns['p95'] or 0:.3f}초, "
+        f"세션당 CPU {level['cpu_seconds_per_session']:.2f}초, "
+        f"RSS {level['rss_mb']:.0f}MB (세션당 {level['rss_mb_per_session']:.1f}MB, 최대 {level['peak_rss_mb']:.0f}MB)"
+    )
+    for kind in ("reruns", "jobs"):
+        for name, stats in sorted(level[kind].items()):
+            if name == "all" or not stats["count"]:
+                continue
+            print(f"  {kind[:-1]:<5} {name:<24} n={stats['count']:<4} "
+                  f"p50={stats['p50']:.3f}  p95={stats['p95']:.3f}  p99={stats['p99']:.3f}  max={stats['max']:.3f}")
+    for error in level["errors"][:5]:
+        print(f"  ⚠️ 세션 {error['session']}: {error['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PRISM-Lite 다중 세션 부하 테스트")
+    parser.add_argument("--sessions", default=DEFAULT_SESSION_LEVELS,
+                        help="동시 세션 수 단계 (쉼표로 구분, 예: 1,5,10,20)")
+    parser.add_argument("--follow-ups", type=int, default=DEFAULT_FOLLOW_UPS, help="세션당 추가 질문 수")
+    parser.add_argument("--backend-latency", type=float, default=DEFAULT_BACKEND_LATENCY,
+                        help="stub API 호출 하나의 평균 지연 시간 (초)")
+    parser.add_argument("--document-kb", type=int, default=DEFAULT_DOCUMENT_KB, help="stub 문서 크기 (KB)")
+    parser.add_argument("--ramp-up", type=float, default=DEFAULT_RAMP_UP_SECONDS,
+                        help="세션 시작을 이 시간(초)에 걸쳐 분산")
+    parser.add_argument("--slo", type=float, default=DEFAULT_SLO_SECONDS,
+                        help="허용할 rerun 지연 p95 (초, 수용 인원 계산 기준)")
+    parser.add_argument("--skip-upload", action="store_true", help="문서 업로드 시나리오 생략")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 파일 경로")
+    options = parser.parse_args()
+
+    StubBackend(options.backend_latency, options.document_kb).install()
+    share_test_runtime()
+
+    levels = []
+    for sessions in [int(value) for value in options.sessions.split(",") if value.strip()]:
+        level = run_level(sessions, options)
+        levels.append(level)
+        _print_level(level)
+
+    capacity = estimate_capacity(levels, options.slo)
+    print(f"\n👥 rerun p95 ≤ {options.slo}초 기준 수용 가능한 동시 세션 수: {capacity}")
+
+    report = {
+        "created_at": time.time(),
+        "options": {k: v for k, v in vars(options).items() if k != "current_sessions"},
+        "capacity": capacity,
+        "levels": levels,
+    }
+    with open(options.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 결과 저장: {options.output}")
+
+
+if __name__ == "__main__":
+    main()
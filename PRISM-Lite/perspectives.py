@@ -0,0 +1,160 @@
+"""
+PRISM-Lite: 관점 레지스트리
+분석에 사용할 관점 목록을 설정 파일에서 읽어 시작할 때 한 번 검증하고,
+다관점 분석 프롬프트를 "고정 앞부분 + 사용자 입력" 형태로 미리 만들어 둡니다.
+
+[버전 히스토리]
+- Phase 22: 관점 설정 파일 (PRISM_PERSPECTIVES_CONFIG), 4~20개 관점, 프롬프트 사전 컴파일
+"""
+
+import json
+import os
+import re
+
+# ============================================================
+# 기본 관점
+# 💡 PRISM_PERSPECTIVES_CONFIG 환경변수로 JSON 파일을 지정하면 이 목록 대신 사용합니다.
+# ============================================================
+DEFAULT_PERSPECTIVES = [
+    {
+        "key": "traditional",
+        "emoji": "🔵",
+        "name": "전통적 관점",
+        "typicality": "높음",
+        "description": "가장 흔하고 검증된 접근 방식",
+        "color": "blue"
+    },
+    {
+        "key": "practical",
+        "emoji": "🟢",
+        "name": "실용적 관점",
+        "typicality": "중간-높음",
+        "description": "즉시 실행 가능하고 현실적인 접근",
+        "color": "green"
+    },
+    {
+        "key": "critical",
+        "emoji": "🟡",
+        "name": "비판적 관점",
+        "typicality": "중간",
+        "description": "반대 의견, 우려, 고려해야 할 위험",
+        "color": "orange"
+    },
+    {
+        "key": "creative",
+        "emoji": "🔴",
+        "name": "창의적 관점",
+        "typicality": "낮음",
+        "description": "비전형적이지만 가치 있을 수 있는 접근",
+        "color": "red"
+    },
+]
+
+# 한 번의 분석에 사용할 수 있는 관점 수
+MIN_PERSPECTIVES = 4
+MAX_PERSPECTIVES = 20
+
+REQUIRED_FIELDS = ("key", "emoji", "name", "typicality", "description")
+
+# Streamlit 색상 이름 (color를 지정하지 않으면 순서대로 돌려 씀)
+COLORS = ("blue", "green", "orange", "red", "violet", "gray")
+
+_KEY_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+
+
+def load_perspectives(path: str = None) -> dict:
+    """
+    관점 목록을 읽고 검증합니다.
+
+    설정 파일 형식: {"perspectives": [{"key", "emoji", "name", "typicality", "description", "color"(선택)}, ...]}
+    목록 순서가 분석 결과의 섹션 순서가 됩니다. (보통 전형성이 높은 관점부터)
+
+    Args:
+        path: JSON 설정 파일 경로 (없으면 PRISM_PERSPECTIVES_CONFIG 환경변수 사용)
+
+    Returns:
+        dict: 관점 키 → {"emoji", "name", "typicality", "description", "color"} (순서 유지)
+
+    Raises:
+        ValueError: 관점 수가 범위를 벗어나거나, 필수 항목이 없거나, 키/이모지가 겹치는 경우
+    """
+    entries = DEFAULT_PERSPECTIVES
+    path = path or os.getenv("PRISM_PERSPECTIVES_CONFIG")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f).get("perspectives", [])
+
+    if not MIN_PERSPECTIVES <= len(entries) <= MAX_PERSPECTIVES:
+        raise ValueError(
+            f"관점은 {MIN_PERSPECTIVES}~{MAX_PERSPECTIVES}개여야 합니다. (현재 {len(entries)}개)"
+        )
+
+    perspectives = {}
+    emojis = set()
+    for index, entry in enumerate(entries):
+        missing = [field for field in REQUIRED_FIELDS if not str(entry.get(field, "")).strip()]
+        if missing:
+            raise ValueError(f"{index + 1}번째 관점에 {', '.join(missing)} 항목이 없습니다.")
+
+        key = entry["key"]
+        if not _KEY_PATTERN.match(key):
+            raise ValueError(f"관점 키 '{key}'는 영문 소문자, 숫자, 밑줄만 쓸 수 있습니다.")
+        if key in perspectives:
+            raise ValueError(f"관점 키 '{key}'가 중복되었습니다.")
+        # 💡 분석 결과를 섹션별로 나눌 때 제목의 이모지로 관점을 찾으므로 이모지도 겹치면 안 됨
+        if entry["emoji"] in emojis:
+            raise ValueError(f"관점 이모지 '{entry['emoji']}'가 중복되었습니다.")
+        emojis.add(entry["emoji"])
+
+        perspectives[key] = {
+            "emoji": entry["emoji"],
+            "name": entry["name"],
+            "typicality": entry["typicality"],
+            "description": entry["description"],
+            "color": entry.get("color") or COLORS[index % len(COLORS)]
+        }
+
+    return perspectives
+
+
+# ============================================================
+# 프롬프트 컴파일
+# ============================================================
+
+ANALYSIS_PROMPT_HEAD = """당신은 "다관점 사고 파트너"입니다.
+
+주어진 주제나 질문에 대해 {count}가지 관점에서 분석을 제공합니다.
+각 관점은 서로 다른 "전형성(얼마나 흔한 접근인가)"을 가집니다.
+아래 형식에 맞춰 모든 관점을 순서대로 작성하고,
+각 관점이 서로 다른 시각을 제공하도록 해서 사용자가 다양한 가능성을 탐색할 수 있게 도와주세요.
+
+## 분석 형식
+"""
+
+ANALYSIS_SECTION = """
+### {emoji} {name} (전형성: {typicality})
+{description}
+- **핵심 내용**: [이 관점의 주요 주장이나 접근]
+- **강점**: [이 관점이 가진 장점]
+- **한계**: [이 관점의 제약이나 단점]
+"""
+
+ANALYSIS_PROMPT_TAIL = """
+---
+
+## 사용자의 주제/질문:
+"""
+
+
+def compile_analysis_prompt(perspectives: dict) -> str:
+    """
+    다관점 분석 프롬프트의 고정 앞부분을 만듭니다. (시작할 때 한 번만 호출)
+
+    💡 바뀌는 부분(사용자 입력)은 맨 뒤에 붙이므로, 모든 분석 요청의 앞부분이 글자 하나까지 같아
+    서버 측 프롬프트 캐시를 그대로 재사용할 수 있습니다. 프롬프트 길이는 관점 수에 비례합니다.
+
+    Returns:
+        사용자 입력 바로 앞까지의 프롬프트 (호출할 때는 뒤에 사용자 입력만 이어 붙임)
+    """
+    sections = "".join(ANALYSIS_SECTION.format(**info) for info in perspectives.values())
+    return ANALYSIS_PROMPT_HEAD.format(count=len(perspectives)) + sections + ANALYSIS_PROMPT_TAIL
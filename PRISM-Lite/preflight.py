@@ -0,0 +1,188 @@
+"""
+PRISM-Lite: 업로드 전 문서 사전 점검
+Document Parse로 보내기 전에 파일 내용(매직 바이트)으로 형식을 확인하고,
+손상된 파일은 바로 걸러내며, OCR에 필요한 해상도보다 큰 이미지는 줄여서 다시 압축합니다.
+
+[버전 히스토리]
+- Phase 17: 매직 바이트 검사, PDF 페이지 수/이미지 크기 확인, 큰 이미지 축소·재압축, 흑백 변환 (선택)
+"""
+
+import io
+import os
+
+# 💡 선택 의존성: 없으면 형식 확인만 하고 이미지는 그대로 보냄
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+# ============================================================
+# 설정 (환경변수로 조정 가능)
+# ============================================================
+
+# 긴 변이 이 픽셀 수를 넘는 이미지는 줄임 (A4 300DPI ≈ 2480×3508, 문자 인식에 충분한 해상도)
+DEFAULT_IMAGE_MAX_EDGE = 2500
+
+# 해상도가 적당해도 이 크기(바이트)를 넘으면 다시 압축
+IMAGE_RECOMPRESS_BYTES = 1.5 * 1024 * 1024
+
+# 다시 압축할 때 JPEG 품질 (글자 경계가 뭉개지지 않는 수준)
+JPEG_QUALITY = 90
+
+IMAGE_MAX_EDGE = int(os.getenv("PRISM_IMAGE_MAX_EDGE", DEFAULT_IMAGE_MAX_EDGE))
+GRAYSCALE = os.getenv("PRISM_PREFLIGHT_GRAYSCALE", "").strip().lower() in ("1", "true", "on")
+
+# 이미지 파일 시작 부분(매직 바이트) → 형식
+_IMAGE_MAGIC_BYTES = [
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+]
+
+_FORMAT_NAMES = {"pdf": "PDF", "png": "PNG", "jpg": "JPG"}
+
+
+def sniff_file_type(data: bytes) -> str:
+    """
+    파일 내용의 앞부분으로 형식을 판별합니다.
+
+    Returns:
+        "pdf" | "png" | "jpg" (알 수 없으면 None)
+    """
+    # PDF는 앞에 쓰레기 바이트가 조금 붙어 있어도 열리므로 처음 1KB 안에서 찾음
+    if b"%PDF-" in data[:1024]:
+        return "pdf"
+    for magic, file_type in _IMAGE_MAGIC_BYTES:
+        if data.startswith(magic):
+            return file_type
+    return None
+
+
+def preflight_document(file_name: str, data: bytes) -> dict:
+    """
+    업로드할 문서를 점검하고, 필요하면 보낼 바이트를 줄입니다.
+
+    Args:
+        file_name: 원본 파일명 (확장자 비교용)
+        data: 원본 파일 바이트
+
+    Returns:
+        dict: {
+            "ok": bool,
+            "error": str (점검 실패 시),
+            "file_type": "pdf" | "png" | "jpg" (내용 기준),
+            "data": bytes (보낼 바이트, 바뀌지 않았으면 원본),
+            "original_bytes": int, "bytes": int,
+            "pages": int (PDF, 알 수 없으면 None),
+            "width": int, "height": int (이미지, 알 수 없으면 None),
+            "notes": list (사용자에게 보여줄 메모)
+        }
+    """
+    result = {
+        "ok": True,
+        "error": "",
+        "file_type": None,
+        "data": data,
+        "original_bytes": len(data),
+        "bytes": len(data),
+        "pages": None,
+        "width": None,
+        "height": None,
+        "notes": []
+    }
+
+    if not data:
+        return _fail(result, "빈 파일입니다.")
+
+    file_type = sniff_file_type(data)
+    if file_type is None:
+        return _fail(result, "파일 내용이 PDF/PNG/JPG 형식이 아닙니다. 파일이 손상되었거나 다른 형식일 수 있습니다.")
+    result["file_type"] = file_type
+
+    ext = file_name.lower().rsplit(".", 1)[-1] if "." in file_name else ""
+    ext = "jpg" if ext == "jpeg" else ext
+    if ext and ext != file_type:
+        result["notes"].append(f"확장자는 .{ext}이지만 실제 내용은 {_FORMAT_NAMES[file_type]}입니다.")
+
+    if file_type == "pdf":
+        return _check_pdf(result)
+    return _prepare_image(result)
+
+
+def _fail(result: dict, error: str) -> dict:
+    result["ok"] = False
+    result["error"] = error
+    return result
+
+
+def _check_pdf(result: dict) -> dict:
+    if PdfReader is None:
+        return result
+    try:
+        reader = PdfReader(io.BytesIO(result["data"]))
+        if reader.is_encrypted:
+            return _fail(result, "암호가 걸린 PDF는 처리할 수 없습니다. 암호를 해제한 뒤 다시 올려주세요.")
+        result["pages"] = len(reader.pages)
+    except Exception:
+        return _fail(result, "PDF 파일을 읽을 수 없습니다. 파일이 손상되었을 수 있습니다.")
+
+    if not result["pages"]:
+        return _fail(result, "페이지가 없는 PDF입니다.")
+    return result
+
+
+def _prepare_image(result: dict) -> dict:
+    if Image is None:
+        return result
+
+    try:
+        # verify()는 이미지를 못 쓰게 만들므로 확인 후 다시 엶
+        Image.open(io.BytesIO(result["data"])).verify()
+        image = Image.open(io.BytesIO(result["data"]))
+        image.load()
+    except Exception:
+        return _fail(result, "이미지 파일을 읽을 수 없습니다. 파일이 손상되었을 수 있습니다.")
+
+    result["width"], result["height"] = image.size
+
+    too_large = max(image.size) > IMAGE_MAX_EDGE
+    too_heavy = result["original_bytes"] > IMAGE_RECOMPRESS_BYTES
+    if not (too_large or too_heavy or GRAYSCALE):
+        return result
+
+    # 휴대폰 사진은 EXIF 회전 정보만 있고 픽셀은 눕혀져 있는 경우가 많음
+    image = ImageOps.exif_transpose(image)
+
+    if too_large:
+        scale = IMAGE_MAX_EDGE / max(image.size)
+        image = image.resize(
+            (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+            Image.LANCZOS
+        )
+
+    if GRAYSCALE:
+        image = image.convert("L")
+
+    buffer = io.BytesIO()
+    if result["file_type"] == "jpg":
+        image.convert("L" if GRAYSCALE else "RGB").save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    else:
+        image.save(buffer, format="PNG", optimize=True)
+    data = buffer.getvalue()
+
+    # 줄이지 못했으면 원본을 그대로 보냄
+    if len(data) >= result["original_bytes"] and not too_large:
+        return result
+
+    result["data"] = data
+    result["bytes"] = len(data)
+    result["width"], result["height"] = image.size
+    result["notes"].append(
+        f"이미지를 {result['width']}×{result['height']}로 줄여 보냅니다 "
+        f"({result['original_bytes'] / 1024 / 1024:.1f}MB → {len(data) / 1024 / 1024:.1f}MB)."
+    )
+    return result
@@ -0,0 +1,256 @@
+"""
+PRISM-Lite: rerun 프로파일러
+Streamlit rerun마다 render_* 함수와 분석 함수의 실행 시간을 재고,
+모든 세션의 측정치를 모아 디버그 패널과 덤프 파일로 보여줍니다.
+
+[버전 히스토리]
+- Phase 10: rerun 단위 구간 측정, 세션 간 집계, cProfile 캡처 (선택)
+- Phase 10.1: fragment rerun도 rerun으로 기록, cProfile은 한 번에 한 세션만 (동시 enable 오류 방지)
+
+💡 사용법: PRISM_PROFILE=1 (시간 측정) 또는 PRISM_PROFILE=cprofile (cProfile 포함)
+"""
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ============================================================
+# 설정
+# ============================================================
+PROFILE_MODE = os.getenv("PRISM_PROFILE", "").strip().lower()
+PROFILE_ENABLED = PROFILE_MODE in ("1", "true", "on", "cprofile")
+CPROFILE_ENABLED = PROFILE_MODE == "cprofile"
+
+# 덤프 파일 경로와 자동 덤프 간격 (rerun 수)
+DUMP_PATH = os.getenv("PRISM_PROFILE_DUMP", "prism_profile.json")
+DUMP_EVERY_RERUNS = 50
+
+# 구간별로 보관할 최근 측정치 수 (백분위 계산용)
+SAMPLE_WINDOW = 500
+
+# ============================================================
+# 집계 상태 (프로세스 전체 공유)
+# ============================================================
+_lock = threading.Lock()
+_sections = {}
+_reruns = {"count": 0, "samples": deque(maxlen=SAMPLE_WINDOW)}
+_recent_reruns = deque(maxlen=20)
+_cprofile_stats = None
+
+# 💡 [Phase 10.1] cProfile은 프로세스에 하나만 켤 수 있음 (Python 3.12+ sys.monitoring은 동시 enable()에 ValueError)
+# 다른 세션이 쓰는 중이면 기다리지 않고 이번 rerun은 시간 측정만 함
+_cprofile_lock = threading.Lock()
+
+# 현재 스레드(= Streamlit 세션의 스크립트 실행)에서 진행 중인 rerun
+_local = threading.local()
+
+
+def _record_section(name: str, elapsed: float):
+    with _lock:
+        section = _sections.setdefault(name, {
+            "calls": 0,
+            "total": 0.0,
+            "max": 0.0,
+            "samples": deque(maxlen=SAMPLE_WINDOW),
+        })
+        section["calls"] += 1
+        section["total"] += elapsed
+        section["max"] = max(section["max"], elapsed)
+        section["samples"].append(elapsed)
+
+    current = getattr(_local, "rerun", None)
+    if current is not None:
+        current["sections"][name] = current["sections"].get(name, 0.0) + elapsed
+
+
+def profiled(name: str):
+    """
+    함수 실행 시간을 측정하는 데코레이터. 프로파일링이 꺼져 있으면 원래 함수를 그대로 반환합니다.
+
+    Args:
+        name: 집계에 사용할 구간 이름 (예: "render_header")
+    """
+    def decorator(func):
+        if not PROFILE_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record_section(name, time.perf_counter() - started)
+
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def profile_rerun(session_id: str, fragment: str = None):
+    """
+    rerun 한 번을 측정하는 컨텍스트 매니저.
+
+    st.rerun()은 예외로 스크립트를 중단시키므로 finally에서 기록합니다.
+
+    💡 [Phase 10.1] 이미 rerun을 측정 중이면(전체 rerun 안에서 그린 fragment) 따로 기록하지 않습니다.
+
+    Args:
+        session_id: 측정 중인 세션 ID
+        fragment: fragment rerun이면 fragment 이름 (전체 rerun은 None)
+    """
+    if not PROFILE_ENABLED or getattr(_local, "rerun", None) is not None:
+        yield
+        return
+
+    rerun = {"session_id": session_id, "fragment": fragment, "started_at": time.time(), "sections": {}}
+    _local.rerun = rerun
+    profile = _start_cprofile() if CPROFILE_ENABLED else None
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if profile:
+            profile.disable()
+            _cprofile_lock.release()
+        rerun["total"] = time.perf_counter() - started
+        _local.rerun = None
+        _finish_rerun(rerun, profile)
+
+
+def _start_cprofile():
+    """다른 세션이 cProfile을 쓰고 있지 않으면 켜서 반환합니다. (쓰는 중이면 None)"""
+    if not _cprofile_lock.acquire(blocking=False):
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # 앱 밖에서 이미 프로파일러(다른 cProfile, sys.monitoring 도구 등)를 켜 둔 경우
+        _cprofile_lock.release()
+        return None
+    return profile
+
+
+def profiled_rerun(get_session_id):
+    """
+    💡 [Phase 10.1] fragment 함수에 붙여 fragment 단독 실행도 rerun으로 기록하는 데코레이터.
+
+    fragment rerun은 main()을 거치지 않으므로 profile_rerun 밖에서 실행됩니다.
+    @st.fragment 바로 아래에 붙입니다.
+
+    Args:
+        get_session_id: 현재 세션 ID를 반환하는 함수
+    """
+    def decorator(func):
+        if not PROFILE_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_rerun(get_session_id(), fragment=func.__name__):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def _finish_rerun(rerun: dict, profile):
+    global _cprofile_stats
+
+    with _lock:
+        _reruns["count"] += 1
+        _reruns["samples"].append(rerun["total"])
+        _recent_reruns.append(rerun)
+        if profile:
+            if _cprofile_stats is None:
+                _cprofile_stats = pstats.Stats(profile)
+            else:
+                _cprofile_stats.add(profile)
+        should_dump = _reruns["count"] % DUMP_EVERY_RERUNS == 0
+
+    if should_dump:
+        dump()
+
+
+# ============================================================
+# 조회 / 덤프
+# ============================================================
+
+def _percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def get_summary() -> dict:
+    """
+    모든 세션의 측정치 요약을 반환합니다.
+
+    Returns:
+        dict: {
+            "reruns": {"count", "p50", "p95"},
+            "sections": {구간 이름: {"calls", "avg", "p50", "p95", "max"}},
+            "recent": 최근 rerun 목록 (구간별 시간 포함)
+        }
+    """
+    with _lock:
+        rerun_samples = sorted(_reruns["samples"])
+        sections = {}
+        for name, section in _sections.items():
+            samples = sorted(section["samples"])
+            sections[name] = {
+                "calls": section["calls"],
+                "avg": section["total"] / section["calls"],
+                "p50": _percentile(samples, 0.5),
+                "p95": _percentile(samples, 0.95),
+                "max": section["max"],
+            }
+        recent = [dict(r, sections=dict(r["sections"])) for r in _recent_reruns]
+
+    return {
+        "reruns": {
+            "count": _reruns["count"],
+            "p50": _percentile(rerun_samples, 0.5),
+            "p95": _percentile(rerun_samples, 0.95),
+        },
+        "sections": sections,
+        "recent": recent,
+    }
+
+
+def get_cprofile_text(limit: int = 30) -> str:
+    """누적된 cProfile 결과 상위 함수들을 텍스트로 반환합니다. (cprofile 모드 전용)"""
+    with _lock:
+        if _cprofile_stats is None:
+            return ""
+        buffer = io.StringIO()
+        _cprofile_stats.stream = buffer
+        _cprofile_stats.sort_stats("cumulative").print_stats(limit)
+    return buffer.getvalue()
+
+
+def dump(path: str = DUMP_PATH) -> str:
+    """
+    측정치 요약을 JSON 파일로 저장합니다. cprofile 모드면 .pstats 파일도 함께 저장합니다.
+
+    Returns:
+        저장한 JSON 파일 경로
+    """
+    summary = get_summary()
+    summary["dumped_at"] = time.time()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    with _lock:
+        if _cprofile_stats is not None:
+            _cprofile_stats.dump_stats(f"{os.path.splitext(path)[0]}.pstats")
+
+    return path
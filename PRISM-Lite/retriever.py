@@ -0,0 +1,293 @@
+"""
+PRISM-Lite: 문서 검색 모듈
+추출된 문서에서 질문과 관련된 구절을 골라 분석 프롬프트를 구성합니다.
+
+[버전 히스토리]
+- Phase 5: BM25 역색인 기반 질문 인식 검색
+- Phase 16.1: 문서 구간 관련도 순위 (긴 문서의 구간 요약 대상 선택)
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+# ============================================================
+# 설정
+# ============================================================
+
+# 구절(passage) 하나의 목표 길이 (문자 수)
+PASSAGE_CHARS = 500
+
+# 프롬프트에 넣을 문서 내용의 기본 예산 (문자 수)
+DEFAULT_CONTEXT_CHARS = 3000
+
+# BM25 파라미터
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# 문서별 인덱스를 몇 개까지 메모리에 보관할지
+INDEX_CACHE_SIZE = 16
+
+# 선택된 구절 사이에 넣는 구분자
+PASSAGE_SEPARATOR = "\n\n(...)\n\n"
+
+# 💡 한글은 형태소 분석기 없이 문자 bigram으로, 영문/숫자는 단어 단위로 토큰화
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+# ============================================================
+# 토큰화 / 구절 분할
+# ============================================================
+
+def tokenize(text: str) -> list:
+    """
+    텍스트를 검색용 토큰 목록으로 변환합니다.
+
+    한글 연속 구간은 문자 bigram으로 쪼개므로 조사가 붙은 단어도
+    ("계획서를" / "계획서의") 같은 토큰("계획", "획서")을 공유합니다.
+
+    Args:
+        text: 토큰화할 텍스트
+
+    Returns:
+        토큰 목록
+    """
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= run[0] <= "힣":
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def split_passages(text: str, passage_chars: int = PASSAGE_CHARS) -> list:
+    """
+    문서를 줄 단위로 묶어 일정 길이의 구절로 나눕니다.
+
+    Args:
+        text: 원본 문서 텍스트
+        passage_chars: 구절 하나의 목표 길이
+
+    Returns:
+        구절 문자열 목록 (문서 순서 유지)
+    """
+    passages = []
+    current = []
+    current_len = 0
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        # 한 줄이 너무 길면 목표 길이로 잘라서 처리
+        while len(line) > passage_chars:
+            if current:
+                passages.append("\n".join(current))
+                current, current_len = [], 0
+            passages.append(line[:passage_chars])
+            line = line[passage_chars:]
+
+        if current_len + len(line) > passage_chars and current:
+            passages.append("\n".join(current))
+            current, current_len = [], 0
+
+        current.append(line)
+        current_len += len(line) + 1
+
+    if current:
+        passages.append("\n".join(current))
+
+    return passages
+
+
+# ============================================================
+# BM25 인덱스
+# ============================================================
+
+class BM25Index:
+    """
+    구절 단위 BM25 역색인.
+
+    문서 하나당 한 번 만들어 두고, 질문이 바뀔 때마다 search만 호출합니다.
+    질문 토큰의 posting list만 훑기 때문에 문서 길이와 무관하게 빠릅니다.
+    """
+
+    def __init__(self, text: str, passage_chars: int = PASSAGE_CHARS, passages: list = None):
+        self.passages = passages if passages is not None else split_passages(text, passage_chars)
+        self.postings = {}
+        self.doc_lengths = []
+
+        for pid, passage in enumerate(self.passages):
+            counts = Counter(tokenize(passage))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((pid, tf))
+
+        total = sum(self.doc_lengths)
+        self.avg_doc_length = total / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+        # 길이 정규화 항은 질문과 무관하므로 미리 계산
+        self._norms = [
+            BM25_K1 * (1 - BM25_B + BM25_B * length / (self.avg_doc_length or 1))
+            for length in self.doc_lengths
+        ]
+
+    def search(self, query: str, top_k: int = None) -> list:
+        """
+        질문과 관련도가 높은 구절을 찾습니다.
+
+        Args:
+            query: 검색 질문
+            top_k: 반환할 최대 개수 (None이면 점수가 있는 구절 전부)
+
+        Returns:
+            (구절 번호, 점수) 목록, 점수 내림차순
+        """
+        n_docs = len(self.passages)
+        if not n_docs:
+            return []
+
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norms = self._norms
+            for pid, tf in postings:
+                scores[pid] = scores.get(pid, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norms[pid])
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k] if top_k else ranked
+
+
+# ============================================================
+# 인덱스 캐시 (문서 내용 해시 기준)
+# ============================================================
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def content_hash(text: str) -> str:
+    """문서 내용의 SHA-256 해시를 반환합니다."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def get_index(text: str) -> BM25Index:
+    """
+    문서의 BM25 인덱스를 반환합니다. 같은 내용이면 캐시된 인덱스를 재사용합니다.
+
+    Args:
+        text: 문서 텍스트
+
+    Returns:
+        BM25Index 객체
+    """
+    key = content_hash(text)
+
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    # 인덱스 생성은 락 밖에서 (다른 세션의 검색을 막지 않도록)
+    index = BM25Index(text)
+
+    with _index_lock:
+        _index_cache[key] = index
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+
+    return index
+
+
+# ============================================================
+# 프롬프트용 문서 컨텍스트 구성
+# ============================================================
+
+def select_passages(text: str, question: str, max_chars: int = DEFAULT_CONTEXT_CHARS) -> str:
+    """
+    질문과 관련된 구절을 예산 안에서 골라 문서 순서대로 이어 붙입니다.
+
+    질문이 비어 있거나 관련 구절을 찾지 못하면 문서 앞부분을 사용합니다.
+
+    Args:
+        text: 문서 텍스트
+        question: 사용자의 분석 질문
+        max_chars: 반환할 컨텍스트의 최대 길이
+
+    Returns:
+        프롬프트에 넣을 문서 내용
+    """
+    if len(text) <= max_chars:
+        return text
+
+    if not question or not question.strip():
+        return text[:max_chars]
+
+    index = get_index(text)
+    ranked = index.search(question)
+    if not ranked:
+        return text[:max_chars]
+
+    chosen = []
+    used = 0
+    for pid, _score in ranked:
+        cost = len(index.passages[pid]) + len(PASSAGE_SEPARATOR)
+        if used + cost > max_chars:
+            continue
+        chosen.append(pid)
+        used += cost
+
+    if not chosen:
+        return text[:max_chars]
+
+    return PASSAGE_SEPARATOR.join(index.passages[pid] for pid in sorted(chosen))
+
+
+def select_sections(sections: list, question: str, max_sections: int) -> list:
+    """
+    💡 [Phase 16.1] 긴 문서에서 요약할 구간을 max_sections개까지 고릅니다.
+
+    구간 하나를 구절 하나로 보고 BM25로 질문과 관련도가 높은 구간부터 채우고,
+    질문이 비어 있거나 관련 구간이 모자라면 문서 전체에 고르게 흩어진 구간으로 나머지를 채웁니다.
+
+    Args:
+        sections: {"label", "text"} 목록 (문서 순서)
+        question: 사용자의 분석 질문
+        max_sections: 고를 최대 구간 수
+
+    Returns:
+        고른 구간 번호 목록 (문서 순서)
+    """
+    total = len(sections)
+    if total <= max_sections:
+        return list(range(total))
+
+    chosen = set()
+    if question and question.strip():
+        index = BM25Index("", passages=[section["text"] for section in sections])
+        chosen.update(pid for pid, _score in index.search(question, top_k=max_sections))
+
+    # 남은 자리는 문서 앞/중간/뒤가 고르게 들어가도록 일정 간격으로 채움
+    step = total / max_sections
+    for slot in range(max_sections):
+        if len(chosen) >= max_sections:
+            break
+        position = int(slot * step)
+        while position in chosen:
+            position = (position + 1) % total
+        chosen.add(position)
+
+    return sorted(chosen)
@@ -0,0 +1,274 @@
+"""
+PRISM-Lite: 문서 개정판 증분 처리
+같은 문서의 수정본을 다시 올렸을 때 바뀐 페이지만 다시 파싱/요약하도록
+페이지 텍스트와 페이지 요약을 내용 해시로 캐시하고, 이전 판과의 차이를 계산합니다.
+
+[버전 히스토리]
+- Phase 16: 페이지 단위 파싱 캐시, 페이지 요약 캐시, 개정판 비교
+- Phase 25: 캐시 뒤에 불러온 스냅샷을 연결 (메모리에 없으면 스냅샷에서 찾음)
+"""
+
+import difflib
+import threading
+from collections import OrderedDict
+
+from retriever import content_hash, split_passages
+
+# ============================================================
+# 설정
+# ============================================================
+
+# 캐시에 보관할 최대 항목 수 (프로세스 전체 공유)
+PAGE_CACHE_SIZE = 5000
+SUMMARY_CACHE_SIZE = 5000
+ANALYSIS_CACHE_SIZE = 200
+
+# 페이지 정보가 없는 문서(이미지 등)를 요약 단위로 나눌 때 한 구간의 목표 길이 (문자 수)
+SECTION_CHARS = 3000
+
+# 바뀐 페이지 하나의 diff를 최대 몇 줄까지 보여줄지
+MAX_DIFF_LINES = 200
+
+
+class ContentCache:
+    """
+    내용 해시 → 값 LRU 캐시 (스레드 안전).
+
+    키가 내용 해시이므로 어느 세션이 올린 문서든 같은 내용이면 결과를 재사용합니다.
+
+    💡 [Phase 25] attach()로 연결한 스냅샷(get(key)/keys()가 있는 읽기 전용 저장소)은
+    메모리에 없는 키를 찾을 때 뒤이어 조회하고, 찾은 값은 메모리 LRU로 올립니다.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._sources = []
+        self.hits = 0
+        self.misses = 0
+        self.snapshot_hits = 0
+
+    def get(self, key: str):
+        """캐시된 값을 반환합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            sources = list(self._sources)
+
+        for source in sources:
+            value = source.get(key)
+            if value is not None:
+                self.put(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.snapshot_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def attach(self, source):
+        """💡 [Phase 25] 메모리에 없는 키를 찾아볼 스냅샷을 연결합니다. (먼저 연결한 것부터 조회)"""
+        with self._lock:
+            self._sources.append(source)
+
+    def items(self) -> list:
+        """
+        캐시된 (키, 값) 목록을 반환합니다. 연결된 스냅샷의 항목도 포함합니다. (같은 키는 메모리 값 우선)
+        """
+        with self._lock:
+            items = list(self._entries.items())
+            sources = list(self._sources)
+
+        seen = {key for key, _ in items}
+        for source in sources:
+            for key in source.keys():
+                if key not in seen:
+                    seen.add(key)
+                    items.append((key, source.get(key)))
+        return items
+
+    def get_stats(self) -> dict:
+        """항목 수와 적중/실패 횟수를 반환합니다. (snapshot_hits: 그중 스냅샷에서 찾은 횟수)"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "snapshot_hits": self.snapshot_hits,
+                "snapshot_entries": sum(len(source) for source in self._sources)
+            }
+
+
+# PDF 페이지 지문 → 추출 텍스트 (Document Parse 결과)
+page_text_cache = ContentCache(PAGE_CACHE_SIZE)
+
+# 페이지(구간) 텍스트 해시 → 요약 (map 단계 결과)
+page_summary_cache = ContentCache(SUMMARY_CACHE_SIZE)
+
+# 종합 입력 해시 → 다관점 분석 결과 (reduce 단계 결과)
+analysis_cache = ContentCache(ANALYSIS_CACHE_SIZE)
+
+
+# ============================================================
+# 페이지 / 구간
+# ============================================================
+
+def missing_runs(values: list, max_run: int) -> list:
+    """
+    값이 None인 위치를 연속 구간으로 묶습니다. (캐시에 없는 페이지를 구간별로 파싱하기 위함)
+
+    Args:
+        values: 페이지별 캐시 조회 결과 (없으면 None)
+        max_run: 구간 하나의 최대 길이
+
+    Returns:
+        list: (시작 인덱스, 끝 인덱스) 목록 (끝은 포함하지 않음)
+    """
+    runs = []
+    start = None
+    for index, value in enumerate(values + [""]):
+        if value is None and start is None:
+            start = index
+        elif start is not None and (value is not None or index - start == max_run):
+            runs.append((start, index))
+            start = index if value is None else None
+    return runs
+
+
+def document_sections(documents: list) -> list:
+    """
+    추출된 문서들을 요약 단위(구간)로 나눕니다.
+
+    페이지 정보가 있는 문서는 페이지 하나가 한 구간이므로 바뀐 페이지의 요약만 다시 만들면 되고,
+    페이지 정보가 없는 문서는 구절을 SECTION_CHARS 안팎으로 묶어 구간을 만듭니다.
+
+    Args:
+        documents: {"name", "text", "pages"(선택)} 목록
+
+    Returns:
+        list: {"label": str, "text": str} 목록 (문서/페이지 순서)
+    """
+    sections = []
+    multiple = len(documents) > 1
+
+    for doc in documents:
+        prefix = f"{doc['name']} " if multiple else ""
+        pages = doc.get("pages")
+        if pages:
+            for page in pages:
+                if page["text"].strip():
+                    sections.append({"label": f"{prefix}p.{page['page']}", "text": page["text"]})
+            continue
+
+        chunk = []
+        for passage in split_passages(doc["text"]):
+            chunk.append(passage)
+            if sum(len(p) for p in chunk) >= SECTION_CHARS:
+                sections.append({"label": f"{prefix}구간 {len(sections) + 1}".strip(), "text": "\n".join(chunk)})
+                chunk = []
+        if chunk:
+            sections.append({"label": f"{prefix}구간 {len(sections) + 1}".strip(), "text": "\n".join(chunk)})
+
+    return sections
+
+
+def section_key(text: str) -> str:
+    """구간 요약 캐시 키 (구간 텍스트의 내용 해시)"""
+    return content_hash(text)
+
+
+# ============================================================
+# 개정판 비교
+# ============================================================
+
+def diff_revisions(old_pages: list, new_pages: list) -> dict:
+    """
+    이전 판과 새 판의 페이지를 비교합니다.
+
+    페이지 지문 순서를 맞춰 보므로 중간에 페이지가 추가/삭제되어도 뒤 페이지는 그대로로 인식합니다.
+    지문은 달라도 추출 텍스트가 같으면 (다시 내보낸 PDF 등) 바뀌지 않은 것으로 봅니다.
+
+    Args:
+        old_pages, new_pages: {"page": int, "hash": str, "text": str} 목록
+
+    Returns:
+        dict: {
+            "unchanged": int (그대로인 페이지 수),
+            "changes": [{"kind": "changed"|"added"|"removed", "old_page", "new_page", "diff": str}],
+            "summary": str (한 줄 요약)
+        }
+    """
+    matcher = difflib.SequenceMatcher(
+        a=[page["hash"] for page in old_pages],
+        b=[page["hash"] for page in new_pages],
+        autojunk=False
+    )
+
+    unchanged = 0
+    changes = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            unchanged += i2 - i1
+            continue
+
+        old_run, new_run = old_pages[i1:i2], new_pages[j1:j2]
+        for old, new in zip(old_run, new_run):
+            if old["text"] == new["text"]:
+                unchanged += 1
+            else:
+                changes.append(_page_change("changed", old, new))
+        for old in old_run[len(new_run):]:
+            changes.append(_page_change("removed", old, None))
+        for new in new_run[len(old_run):]:
+            changes.append(_page_change("added", None, new))
+
+    counts = {kind: sum(1 for c in changes if c["kind"] == kind) for kind in ("changed", "added", "removed")}
+    parts = []
+    if counts["changed"]:
+        pages = ", ".join(f"p.{c['new_page']}" for c in changes if c["kind"] == "changed")
+        parts.append(f"{pages} 변경")
+    if counts["added"]:
+        parts.append(f"{counts['added']}쪽 추가")
+    if counts["removed"]:
+        parts.append(f"{counts['removed']}쪽 삭제")
+    parts.append(f"{unchanged}쪽 그대로")
+
+    return {
+        "unchanged": unchanged,
+        "changes": changes,
+        "summary": " · ".join(parts) if changes else f"변경 없음 ({unchanged}쪽)"
+    }
+
+
+def _page_change(kind: str, old: dict, new: dict) -> dict:
+    old_lines = old["text"].splitlines() if old else []
+    new_lines = new["text"].splitlines() if new else []
+    diff = list(difflib.unified_diff(
+        old_lines, new_lines,
+        fromfile=f"이전 p.{old['page']}" if old else "(없음)",
+        tofile=f"새 판 p.{new['page']}" if new else "(없음)",
+        lineterm="",
+        n=2
+    ))
+    if len(diff) > MAX_DIFF_LINES:
+        diff = diff[:MAX_DIFF_LINES] + [f"... ({len(diff) - MAX_DIFF_LINES}줄 생략)"]
+
+    return {
+        "kind": kind,
+        "old_page": old["page"] if old else None,
+        "new_page": new["page"] if new else None,
+        "diff": "\n".join(diff)
+    }
@@ -0,0 +1,341 @@
+"""
+PRISM-Lite: 모델 라우팅 모듈
+작업 종류와 입력 크기, 관측된 모델별 지연 시간/오류율을 보고
+호출마다 사용할 모델과 max_tokens를 결정합니다.
+
+[버전 히스토리]
+- Phase 8: 작업 유형별 모델 라우팅, 모델별 지연 시간 추적
+- Phase 13: 잘린 응답 이어쓰기 작업 유형 추가
+- Phase 19: 중복 관점 섹션 다시 쓰기 작업 유형 추가
+- Phase 22: 관점 섹션 수에 비례하는 max_tokens (max_tokens_per_section)
+- Phase 23: 남은 시간 예산에 맞춘 max_tokens 축소, 빠른 모델 전환
+- Phase 23.1: 모델별 관점 섹션당 생성 시간 실측, 예상 시간이 남은 시간을 넘을 때만 max_tokens 축소
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# ============================================================
+# 작업 유형
+# ============================================================
+TASK_MULTI_PERSPECTIVE = "multi_perspective"    # 다관점 분석
+TASK_DEEP_DIVE_INITIAL = "deep_dive_initial"    # 관점 선택 직후 심화 탐색
+TASK_DEEP_DIVE_FOLLOW_UP = "deep_dive_follow_up"  # 심화 탐색 후속 질문
+TASK_DOCUMENT_MAP = "document_map"              # 문서 구간별 요약 (map 단계)
+TASK_DOCUMENT_REDUCE = "document_reduce"        # 구간 요약 종합 (reduce 단계)
+TASK_CONTINUATION = "continuation"              # 잘린 다관점 분석의 나머지 섹션 이어쓰기
+TASK_DIVERSIFY = "diversify"                    # 다른 관점과 겹치는 섹션 하나 다시 쓰기
+
+# ============================================================
+# 기본 라우팅 정책
+# 💡 PRISM_ROUTING_CONFIG 환경변수로 JSON 파일을 지정하면 이 값 위에 덮어씁니다.
+# ============================================================
+DEFAULT_ROUTING_POLICY = {
+    # 이 시간(초)보다 느리거나 오류율이 높으면 fallback 모델로 우회
+    "latency_slo_seconds": 40.0,
+    "max_error_rate": 0.5,
+    # 통계가 이만큼 쌓이기 전에는 건강 상태를 판단하지 않음
+    "min_samples": 5,
+    # 우회 중인 모델도 마지막 호출 후 이 시간(초)이 지나면 다시 시도해 회복 여부 확인
+    "recheck_seconds": 60.0,
+    # 💡 [Phase 23] 남은 시간 예산 × 이 속도(토큰/초)보다 max_tokens가 크면 줄임 (최소 min_max_tokens)
+    "output_tokens_per_second": 40,
+    "min_max_tokens": 300,
+    # 💡 [Phase 23.1] 관점 섹션을 쓰는 작업은 섹션 수 × 섹션당 생성 시간으로 예상 시간을 잡음
+    # (모델별 실측값이 min_samples만큼 쌓이기 전에는 이 기본값 사용, 초)
+    "seconds_per_section": 4.0,
+    "tasks": {
+        TASK_MULTI_PERSPECTIVE: {
+            "model": "solar-pro",
+            "max_tokens": 2000,
+            "fallback_model": "solar-mini",
+            # 관점이 많으면 섹션 수 × 이 값까지 늘림 (기본 4개 관점이면 max_tokens 그대로)
+            "max_tokens_per_section": 500,
+        },
+        TASK_DEEP_DIVE_INITIAL: {
+            "model": "solar-pro",
+            "max_tokens": 1500,
+            "fallback_model": "solar-mini",
+        },
+        TASK_DEEP_DIVE_FOLLOW_UP: {
+            "model": "solar-pro",
+            "max_tokens": 1500,
+            "fallback_model": "solar-mini",
+            # 짧은 확인 질문은 가벼운 모델과 작은 max_tokens로 처리
+            "short_input_chars": 80,
+            "short_model": "solar-mini",
+            "short_max_tokens": 800,
+        },
+        TASK_DOCUMENT_MAP: {
+            "model": "solar-mini",
+            "max_tokens": 600,
+        },
+        TASK_DOCUMENT_REDUCE: {
+            "model": "solar-pro",
+            "max_tokens": 2000,
+            "fallback_model": "solar-mini",
+            "max_tokens_per_section": 500,
+        },
+        TASK_CONTINUATION: {
+            "model": "solar-pro",
+            "max_tokens": 1200,
+            "fallback_model": "solar-mini",
+            "max_tokens_per_section": 500,
+        },
+        TASK_DIVERSIFY: {
+            "model": "solar-pro",
+            "max_tokens": 700,
+            "fallback_model": "solar-mini",
+        },
+    },
+}
+
+# 최근 결정/지연 시간을 몇 개까지 보관할지
+DECISION_LOG_SIZE = 200
+LATENCY_WINDOW = 100
+
+
+def load_routing_policy(path: str = None) -> dict:
+    """
+    기본 정책에 설정 파일 내용을 덮어쓴 라우팅 정책을 반환합니다.
+
+    Args:
+        path: JSON 설정 파일 경로 (없으면 PRISM_ROUTING_CONFIG 환경변수 사용)
+
+    Returns:
+        라우팅 정책 딕셔너리
+    """
+    policy = copy.deepcopy(DEFAULT_ROUTING_POLICY)
+    path = path or os.getenv("PRISM_ROUTING_CONFIG")
+    if not path:
+        return policy
+
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+
+    for key, value in overrides.items():
+        if key == "tasks":
+            for task, task_policy in value.items():
+                policy["tasks"].setdefault(task, {}).update(task_policy)
+        else:
+            policy[key] = value
+
+    for task, task_policy in policy["tasks"].items():
+        if "model" not in task_policy or "max_tokens" not in task_policy:
+            raise ValueError(f"라우팅 정책 '{task}'에 model/max_tokens가 없습니다.")
+
+    return policy
+
+
+class ModelRouter:
+    """
+    작업별 모델 선택기.
+
+    route()로 결정을 받고, 호출이 끝나면 record()로 결과를 알려주면
+    모델별 지연 시간/오류율이 갱신되어 다음 결정에 반영됩니다.
+    """
+
+    def __init__(self, policy: dict):
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._decisions = deque(maxlen=DECISION_LOG_SIZE)
+
+    # ─────────────────────────────────────────────
+    # 결정
+    # ─────────────────────────────────────────────
+    def route(self, task: str, input_chars: int = 0, sections: int = 0, time_budget: float = None) -> dict:
+        """
+        작업에 사용할 모델과 max_tokens를 결정합니다.
+
+        Args:
+            task: 작업 유형 (TASK_* 상수)
+            input_chars: 이번에 새로 들어온 입력 길이 (질문, 문서 구간 등)
+            sections: 생성할 관점 섹션 수 (max_tokens_per_section이 있는 작업만 반영)
+            time_budget: 💡 [Phase 23] 이 호출에 쓸 수 있는 남은 시간 (초, 없으면 제한 없음)
+
+        Returns:
+            dict: {"task", "model", "max_tokens", "input_chars", "reason", "degraded", "timestamp"}
+                  ("degraded": 시간 예산 때문에 바꾼 내용 목록)
+        """
+        task_policy = self._task_policy(task)
+        model, max_tokens, reasons = self._select(task_policy, input_chars, sections)
+        fallback = task_policy.get("fallback_model")
+
+        degraded = []
+        if time_budget is not None:
+            # 평소 지연 시간이 남은 시간보다 긴 모델이면 더 빠른 fallback 모델로
+            typical = self._median_latency(model)
+            if fallback and fallback != model and typical and typical > time_budget:
+                faster = self._median_latency(fallback)
+                if faster is None or faster < typical:
+                    degraded.append(f"{model} 평소 {typical:.0f}초 > 남은 {time_budget:.0f}초 → {fallback}")
+                    model = fallback
+
+            # 💡 [Phase 23.1] 관점 섹션 작업은 예상 생성 시간이 남은 시간을 넘을 때만 그 비율만큼 줄임
+            # (max_tokens는 상한일 뿐이므로 토큰 속도로 자르면 섹션 수에 맞춘 상한이 늘 잘림)
+            if task_policy.get("max_tokens_per_section") and sections:
+                expected = sections * self.section_seconds(model)
+                affordable = max_tokens
+                if expected > time_budget:
+                    affordable = int(max_tokens * time_budget / expected)
+            else:
+                affordable = int(time_budget * self.policy["output_tokens_per_second"])
+            affordable = max(self.policy["min_max_tokens"], affordable)
+            if affordable < max_tokens:
+                degraded.append(f"남은 {time_budget:.0f}초 → max_tokens {max_tokens} → {affordable}")
+                max_tokens = affordable
+            reasons.extend(degraded)
+
+        decision = {
+            "task": task,
+            "model": model,
+            "max_tokens": max_tokens,
+            "input_chars": input_chars,
+            "reason": ", ".join(reasons),
+            "degraded": degraded,
+            "timestamp": time.time(),
+        }
+        with self._lock:
+            self._decisions.append(decision)
+        return decision
+
+    def estimate_seconds(self, task: str, input_chars: int = 0, sections: int = 0) -> float:
+        """
+        💡 [Phase 23.1] 관점 섹션 sections개를 쓰는 호출이 걸릴 예상 시간 (초)
+
+        route()가 시간 예산 없이 고를 모델의 섹션당 실측 생성 시간을 기준으로 합니다.
+        """
+        model, _max_tokens, _reasons = self._select(self._task_policy(task), input_chars, sections)
+        return sections * self.section_seconds(model)
+
+    def section_seconds(self, model: str) -> float:
+        """모델이 관점 섹션 하나를 쓰는 데 걸린 시간의 중앙값 (실측이 부족하면 정책 기본값)"""
+        with self._lock:
+            stats = self._stats.get(model)
+            samples = sorted(stats["section_seconds"]) if stats else []
+        if len(samples) < self.policy["min_samples"]:
+            return self.policy["seconds_per_section"]
+        return samples[len(samples) // 2]
+
+    def _task_policy(self, task: str) -> dict:
+        task_policy = self.policy["tasks"].get(task)
+        if task_policy is None:
+            raise ValueError(f"알 수 없는 작업 유형입니다: {task}")
+        return task_policy
+
+    def _select(self, task_policy: dict, input_chars: int, sections: int) -> tuple:
+        """시간 예산과 무관한 선택: (모델, max_tokens, 이유 목록)"""
+        model = task_policy["model"]
+        max_tokens = task_policy["max_tokens"]
+        reasons = ["기본 정책"]
+
+        short_limit = task_policy.get("short_input_chars")
+        if short_limit and input_chars <= short_limit and task_policy.get("short_model"):
+            model = task_policy["short_model"]
+            max_tokens = task_policy.get("short_max_tokens", max_tokens)
+            reasons = [f"짧은 입력 ({input_chars}자 ≤ {short_limit}자)"]
+
+        per_section = task_policy.get("max_tokens_per_section")
+        if per_section and sections * per_section > max_tokens:
+            max_tokens = sections * per_section
+            reasons.append(f"관점 {sections}개")
+
+        fallback = task_policy.get("fallback_model")
+        if fallback and fallback != model:
+            unhealthy = self._unhealthy_reason(model)
+            if unhealthy and not self._unhealthy_reason(fallback):
+                reasons.append(f"{model} {unhealthy} → {fallback}")
+                model = fallback
+
+        return model, max_tokens, reasons
+
+    def _median_latency(self, model: str) -> float:
+        """모델의 최근 지연 시간 중앙값 (통계가 부족하면 None)"""
+        with self._lock:
+            stats = self._stats.get(model)
+            if not stats or len(stats["latencies"]) < self.policy["min_samples"]:
+                return None
+            recent = sorted(stats["latencies"])
+        return recent[len(recent) // 2]
+
+    def _unhealthy_reason(self, model: str) -> str:
+        """모델이 정책 기준을 벗어났으면 그 이유를, 아니면 빈 문자열을 반환합니다."""
+        with self._lock:
+            stats = self._stats.get(model)
+            if not stats or stats["calls"] < self.policy["min_samples"]:
+                return ""
+            if time.time() - stats["last_call"] > self.policy["recheck_seconds"]:
+                return ""
+            recent = list(stats["latencies"])
+            error_rate = stats["recent_errors"] / len(stats["recent_outcomes"])
+
+        if error_rate > self.policy["max_error_rate"]:
+            return f"오류율 {error_rate:.0%}"
+        if recent:
+            median = sorted(recent)[len(recent) // 2]
+            if median > self.policy["latency_slo_seconds"]:
+                return f"지연 {median:.1f}초"
+        return ""
+
+    # ─────────────────────────────────────────────
+    # 관측
+    # ─────────────────────────────────────────────
+    def record(self, model: str, latency: float, success: bool, sections: int = 0):
+        """
+        호출 결과(지연 시간, 성공 여부)를 모델 통계에 반영합니다.
+        💡 [Phase 23.1] sections에 생성한 관점 섹션 수를 넘기면 섹션당 생성 시간도 기록합니다.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(model, {
+                "calls": 0,
+                "errors": 0,
+                "latencies": deque(maxlen=LATENCY_WINDOW),
+                "section_seconds": deque(maxlen=LATENCY_WINDOW),
+                "recent_outcomes": deque(maxlen=LATENCY_WINDOW),
+                "recent_errors": 0,
+                "last_call": 0.0,
+            })
+            stats["calls"] += 1
+            stats["last_call"] = time.time()
+            if success:
+                stats["latencies"].append(latency)
+                if sections:
+                    stats["section_seconds"].append(latency / sections)
+            else:
+                stats["errors"] += 1
+
+            outcomes = stats["recent_outcomes"]
+            if len(outcomes) == outcomes.maxlen and not outcomes[0]:
+                stats["recent_errors"] -= 1
+            outcomes.append(success)
+            if not success:
+                stats["recent_errors"] += 1
+
+    def get_stats(self) -> dict:
+        """모델별 호출 수, 오류율, 지연 시간 p50/p95를 반환합니다."""
+        summary = {}
+        with self._lock:
+            for model, stats in self._stats.items():
+                latencies = sorted(stats["latencies"])
+                summary[model] = {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "error_rate": stats["recent_errors"] / len(stats["recent_outcomes"]),
+                    "p50": latencies[len(latencies) // 2] if latencies else None,
+                    "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+                }
+        return summary
+
+    def get_decisions(self) -> list:
+        """최근 라우팅 결정 목록을 반환합니다. (오래된 것부터)"""
+        with self._lock:
+            return list(self._decisions)
+
+
+# 프로세스 전체에서 공유하는 라우터 (모든 세션의 관측치를 합산)
+router = ModelRouter(load_routing_policy())
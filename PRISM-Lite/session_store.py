@@ -0,0 +1,329 @@
+"""
+PRISM-Lite: 세션 데이터 저장소
+추출 텍스트, 분석 결과, 대화 히스토리처럼 큰 세션 데이터를
+디스크(내용 주소 방식)에 두고 st.session_state에는 참조만 남깁니다.
+
+[버전 히스토리]
+- Phase 9: 디스크 기반 세션 데이터 저장소, 메모리 상한/LRU, 방치된 세션 정리
+- Phase 9.1: 세션이 정리되었는지 확인 (has_session, 앱이 만료 안내에 사용)
+- Phase 9.2: 세션의 슬롯별 참조 조회 (get_slots, 새로 연결한 탭이 이전 세션을 이어받을 때 사용)
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================
+# 설정 (환경변수로 조정 가능)
+# ============================================================
+
+# 전체 세션이 메모리에 올려둘 수 있는 최대 크기
+DEFAULT_MEMORY_CAP_MB = 256
+
+# 세션 하나가 메모리에 올려둘 수 있는 최대 크기
+DEFAULT_SESSION_CAP_MB = 16
+
+# 이 시간 동안 접속이 없는 세션은 방치된 것으로 보고 데이터를 삭제
+DEFAULT_SESSION_TTL_MINUTES = 60
+
+# 방치된 세션 정리를 시도하는 최소 간격 (초)
+CLEANUP_INTERVAL_SECONDS = 60
+
+
+class SessionBlobStore:
+    """
+    세션별 데이터를 내용 해시(SHA-256)로 저장하는 저장소.
+
+    - 디스크: 모든 데이터를 {해시}.json 파일로 보관 (같은 내용은 한 번만 저장)
+    - 메모리: 최근에 쓴 데이터만 LRU로 캐시 (전체/세션별 상한)
+    - 세션은 슬롯 이름("last_result" 등)마다 참조 하나를 가지며,
+      어느 세션도 참조하지 않는 파일은 바로 삭제됩니다.
+    """
+
+    def __init__(self, root_dir: str, memory_cap_bytes: int, session_cap_bytes: int,
+                 session_ttl_seconds: float):
+        self.root_dir = root_dir
+        self.memory_cap_bytes = memory_cap_bytes
+        self.session_cap_bytes = session_cap_bytes
+        self.session_ttl_seconds = session_ttl_seconds
+
+        self._lock = threading.RLock()
+        # 해시 → {"value", "size", "owner"}
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._session_memory_bytes = {}
+        # 세션 ID → {"slots": {슬롯: 해시}, "last_seen": float}
+        self._sessions = {}
+        # 해시 → 참조 수, 디스크 크기
+        self._refcounts = {}
+        self._disk_sizes = {}
+        self._last_cleanup = time.time()
+
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """환경변수 설정으로 프로세스 전용 저장소를 만듭니다."""
+        base_dir = os.getenv("PRISM_BLOB_DIR") or tempfile.gettempdir()
+        # 세션은 프로세스가 재시작되면 사라지므로 프로세스별 디렉토리를 새로 사용
+        root_dir = os.path.join(base_dir, f"prism-sessions-{os.getpid()}")
+        shutil.rmtree(root_dir, ignore_errors=True)
+
+        store = cls(
+            root_dir=root_dir,
+            memory_cap_bytes=int(float(os.getenv("PRISM_BLOB_MEMORY_MB", DEFAULT_MEMORY_CAP_MB)) * 1024 * 1024),
+            session_cap_bytes=int(float(os.getenv("PRISM_BLOB_SESSION_MB", DEFAULT_SESSION_CAP_MB)) * 1024 * 1024),
+            session_ttl_seconds=float(os.getenv("PRISM_SESSION_TTL_MINUTES", DEFAULT_SESSION_TTL_MINUTES)) * 60,
+        )
+        atexit.register(shutil.rmtree, root_dir, True)
+        return store
+
+    # ─────────────────────────────────────────────
+    # 읽기/쓰기
+    # ─────────────────────────────────────────────
+    def put(self, session_id: str, slot: str, value) -> str:
+        """
+        세션의 슬롯에 값을 저장하고 참조(내용 해시)를 반환합니다.
+
+        같은 슬롯의 이전 값은 참조가 해제됩니다. None을 저장하면 슬롯을 비웁니다.
+
+        Args:
+            session_id: 세션 ID
+            slot: 슬롯 이름 (예: "extracted_text")
+            value: JSON으로 직렬화할 수 있는 값
+
+        Returns:
+            내용 해시 (value가 None이면 None)
+        """
+        if value is None:
+            self.release(session_id, slot)
+            return None
+
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        ref = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            session = self._touch(session_id)
+            previous = session["slots"].get(slot)
+            if previous == ref:
+                self._remember(ref, value, len(data), session_id)
+                return ref
+
+            if ref not in self._disk_sizes:
+                path = self._path(ref)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._disk_sizes[ref] = len(data)
+
+            self._refcounts[ref] = self._refcounts.get(ref, 0) + 1
+            session["slots"][slot] = ref
+            if previous:
+                self._decref(previous)
+
+            self._remember(ref, value, len(data), session_id)
+
+        self.maybe_cleanup()
+        return ref
+
+    def get(self, session_id: str, ref: str):
+        """
+        참조로 값을 읽습니다. 메모리에 없으면 디스크에서 읽어 다시 캐시합니다.
+
+        Args:
+            session_id: 읽는 세션 ID (메모리 사용량 계산용)
+            ref: put이 반환한 내용 해시
+
+        Returns:
+            저장된 값 (참조가 없거나 정리되었으면 None)
+        """
+        if not ref:
+            return None
+
+        with self._lock:
+            self._touch(session_id)
+            entry = self._memory.get(ref)
+            if entry is not None:
+                self._memory.move_to_end(ref)
+                self._set_owner(ref, entry, session_id)
+                return entry["value"]
+            if ref not in self._disk_sizes:
+                return None
+
+        try:
+            with open(self._path(ref), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        value = json.loads(data.decode("utf-8"))
+        with self._lock:
+            if ref in self._disk_sizes:
+                self._remember(ref, value, len(data), session_id)
+        return value
+
+    def get_slots(self, session_id: str) -> dict:
+        """세션이 가진 슬롯별 참조를 반환합니다. ({슬롯 이름: 내용 해시}, 없는 세션이면 빈 딕셔너리)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return dict(session["slots"]) if session else {}
+
+    def release(self, session_id: str, slot: str):
+        """세션 슬롯의 참조를 해제합니다."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if not session:
+                return
+            ref = session["slots"].pop(slot, None)
+            if ref:
+                self._decref(ref)
+
+    def drop_session(self, session_id: str):
+        """세션의 모든 참조를 해제합니다."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if not session:
+                return
+            for ref in session["slots"].values():
+                self._decref(ref)
+            self._session_memory_bytes.pop(session_id, None)
+
+    # ─────────────────────────────────────────────
+    # 방치된 세션 정리
+    # ─────────────────────────────────────────────
+    def touch(self, session_id: str):
+        """세션이 살아 있음을 기록하고, 필요하면 방치된 세션을 정리합니다."""
+        with self._lock:
+            self._touch(session_id)
+        self.maybe_cleanup()
+
+    def has_session(self, session_id: str) -> bool:
+        """
+        세션이 저장소에 남아 있는지 확인합니다.
+
+        TTL이 지나 정리되었거나 프로세스가 재시작되면 False입니다.
+        (touch/get/put은 세션을 새로 만들므로 그 전에 확인해야 함)
+        """
+        with self._lock:
+            return session_id in self._sessions
+
+    def maybe_cleanup(self):
+        """마지막 정리 후 CLEANUP_INTERVAL_SECONDS가 지났으면 정리를 실행합니다."""
+        now = time.time()
+        with self._lock:
+            if now - self._last_cleanup < CLEANUP_INTERVAL_SECONDS:
+                return
+            self._last_cleanup = now
+        self.cleanup_expired(now)
+
+    def cleanup_expired(self, now: float = None) -> int:
+        """
+        TTL 동안 접속이 없는 세션을 삭제합니다.
+
+        Returns:
+            삭제한 세션 수
+        """
+        now = now or time.time()
+        with self._lock:
+            expired = [
+                session_id for session_id, session in self._sessions.items()
+                if now - session["last_seen"] > self.session_ttl_seconds
+            ]
+            for session_id in expired:
+                self.drop_session(session_id)
+        return len(expired)
+
+    def get_stats(self) -> dict:
+        """세션 수, 메모리/디스크 사용량을 반환합니다."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "blobs": len(self._disk_sizes),
+                "disk_bytes": sum(self._disk_sizes.values()),
+                "memory_bytes": self._memory_bytes,
+                "memory_cap_bytes": self.memory_cap_bytes,
+            }
+
+    # ─────────────────────────────────────────────
+    # 내부 함수 (호출 시 self._lock을 잡고 있어야 함)
+    # ─────────────────────────────────────────────
+    def _path(self, ref: str) -> str:
+        return os.path.join(self.root_dir, f"{ref}.json")
+
+    def _touch(self, session_id: str) -> dict:
+        session = self._sessions.setdefault(session_id, {"slots": {}, "last_seen": 0.0})
+        session["last_seen"] = time.time()
+        return session
+
+    def _decref(self, ref: str):
+        count = self._refcounts.get(ref, 0) - 1
+        if count > 0:
+            self._refcounts[ref] = count
+            return
+
+        # 아무도 참조하지 않으면 메모리와 디스크에서 모두 삭제
+        self._refcounts.pop(ref, None)
+        self._disk_sizes.pop(ref, None)
+        self._forget(ref)
+        try:
+            os.remove(self._path(ref))
+        except FileNotFoundError:
+            pass
+
+    def _remember(self, ref: str, value, size: int, session_id: str):
+        if size > self.session_cap_bytes or size > self.memory_cap_bytes:
+            # 상한보다 큰 데이터는 메모리에 올리지 않고 매번 디스크에서 읽음
+            return
+
+        entry = self._memory.get(ref)
+        if entry is None:
+            entry = {"value": value, "size": size, "owner": session_id}
+            self._memory[ref] = entry
+            self._memory_bytes += size
+            self._session_memory_bytes[session_id] = self._session_memory_bytes.get(session_id, 0) + size
+        else:
+            self._set_owner(ref, entry, session_id)
+        self._memory.move_to_end(ref)
+
+        self._evict(session_id)
+
+    def _set_owner(self, ref: str, entry: dict, session_id: str):
+        if entry["owner"] == session_id:
+            return
+        previous = entry["owner"]
+        if previous in self._session_memory_bytes:
+            self._session_memory_bytes[previous] -= entry["size"]
+        entry["owner"] = session_id
+        self._session_memory_bytes[session_id] = self._session_memory_bytes.get(session_id, 0) + entry["size"]
+
+    def _forget(self, ref: str):
+        entry = self._memory.pop(ref, None)
+        if entry is None:
+            return
+        self._memory_bytes -= entry["size"]
+        owner = entry["owner"]
+        if owner in self._session_memory_bytes:
+            self._session_memory_bytes[owner] -= entry["size"]
+
+    def _evict(self, session_id: str):
+        # 세션 상한: 해당 세션 데이터 중 가장 오래 안 쓴 것부터
+        if self._session_memory_bytes.get(session_id, 0) > self.session_cap_bytes:
+            for ref in [r for r, e in self._memory.items() if e["owner"] == session_id]:
+                if self._session_memory_bytes[session_id] <= self.session_cap_bytes:
+                    break
+                self._forget(ref)
+
+        # 전체 상한: 모든 세션 중 가장 오래 안 쓴 것부터
+        while self._memory_bytes > self.memory_cap_bytes and self._memory:
+            self._forget(next(iter(self._memory)))
+
+
+# 프로세스 전체에서 공유하는 저장소
+blob_store = SessionBlobStore.from_env()
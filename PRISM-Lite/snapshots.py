@@ -0,0 +1,406 @@
+"""
+PRISM-Lite: 캐시 스냅샷
+분석/문서 요약/문서 파싱 캐시를 파일 하나로 내보내고, 새 인스턴스가 시작할 때 불러와
+처음 들어온 요청부터 자주 묻는 질문을 캐시 속도로 응답합니다.
+
+파일 형식 (항목별 zlib 압축):
+    MAGIC(8바이트) | 헤더 길이(4바이트, big-endian) | 헤더 JSON | 데이터
+    헤더: {"format", "created_at", "sections": {캐시 이름: {"version", "entries": {키: [오프셋, 길이]}}}}
+
+불러올 때는 파일을 mmap으로 열어 헤더(색인)만 읽고, 항목은 처음 조회될 때 압축을 풉니다.
+캐시마다 버전(프롬프트 템플릿 해시 등)이 기록되어 있어 지금 버전과 다른 캐시는 불러오지 않습니다.
+
+사용법:
+    # 질문 목록을 미리 분석해 스냅샷 만들기 (API 키 필요)
+    python snapshots.py precompute --queries precompute_queries.txt --output prism_cache.snapshot
+
+    # 스냅샷 내용과 지금 프롬프트 버전과의 일치 여부 확인
+    python snapshots.py info prism_cache.snapshot
+
+    # 운영 중인 앱 인스턴스에 지금 캐시를 내보내도록 요청하고 결과를 기다림
+    # (앱과 CLI 모두 PRISM_CACHE_SNAPSHOT_TRIGGER를 설정해야 하며, 저장 위치는 앱의 스냅샷 디렉터리)
+    python snapshots.py export --output prism_cache.snapshot
+
+[버전 히스토리]
+- Phase 25: 스냅샷 내보내기/불러오기(mmap), 캐시별 버전 검사, 질문 목록 사전 계산 CLI
+- Phase 25.1: 요청 파일로 운영 중인 인스턴스에 내보내기 요청 (export CLI, 프로파일러 없이 동작)
+- Phase 25.2: 요청 파일 경로는 기본값 없이 설정해야 사용, 요청에는 저장할 파일 이름만 담음
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from revisions import analysis_cache, page_summary_cache, page_text_cache
+
+# ============================================================
+# 설정
+# ============================================================
+
+MAGIC = b"PRISMSN1"
+FORMAT_VERSION = 1
+_LENGTH = struct.Struct(">I")
+
+COMPRESSION_LEVEL = 6
+
+# 스냅샷에 담는 캐시 (이름 → ContentCache)
+SNAPSHOT_CACHES = {
+    "analysis": analysis_cache,
+    "summary": page_summary_cache,
+    "page_text": page_text_cache,
+}
+
+DEFAULT_QUERY_FILE = "precompute_queries.txt"
+DEFAULT_OUTPUT = "prism_cache.snapshot"
+
+# 운영 중인 인스턴스에 요청해 내보내는 파일은 이 확장자만 허용
+SNAPSHOT_SUFFIX = ".snapshot"
+DEFAULT_PRECOMPUTE_WORKERS = 4
+
+# 💡 [Phase 25.1] 운영 중인 인스턴스에 내보내기를 요청하는 파일 (PRISM_CACHE_SNAPSHOT_TRIGGER, 기본값 없음)
+# export CLI가 이 파일을 만들면 앱이 주기적으로 확인해 내보낸 뒤 결과를 "<요청 파일>.done"에 씀
+TRIGGER_POLL_SECONDS = 2.0
+DEFAULT_EXPORT_TIMEOUT_SECONDS = 60
+
+
+class SnapshotSection:
+    """스냅샷 안의 캐시 하나 (읽기 전용, ContentCache.attach로 연결)"""
+
+    def __init__(self, buffer, data_start: int, entries: dict):
+        self._buffer = buffer
+        self._data_start = data_start
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> list:
+        return list(self._entries)
+
+    def get(self, key: str):
+        """항목의 압축을 풀어 반환합니다. 없으면 None."""
+        location = self._entries.get(key)
+        if location is None:
+            return None
+        start = self._data_start + location[0]
+        return zlib.decompress(self._buffer[start:start + location[1]]).decode("utf-8")
+
+
+class SnapshotReader:
+    """
+    스냅샷 파일을 mmap으로 엽니다. (색인만 읽고, 항목은 조회할 때 읽음)
+
+    Raises:
+        OSError: 파일을 열 수 없는 경우
+        ValueError: 스냅샷 파일이 아니거나 형식 버전이 다른 경우
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        prefix = len(MAGIC) + _LENGTH.size
+        if self._buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"PRISM-Lite 캐시 스냅샷 파일이 아닙니다: {path}")
+        (header_length,) = _LENGTH.unpack(self._buffer[len(MAGIC):prefix])
+        header = json.loads(self._buffer[prefix:prefix + header_length].decode("utf-8"))
+        if header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 형식입니다: {header.get('format')}")
+
+        self.path = path
+        self.created_at = header["created_at"]
+        self.sections = header["sections"]
+        self._data_start = prefix + header_length
+
+    def section(self, name: str, version: str) -> SnapshotSection:
+        """캐시 하나를 반환합니다. 없거나 버전이 다르면 None."""
+        info = self.sections.get(name)
+        if info is None or info["version"] != version:
+            return None
+        return SnapshotSection(self._buffer, self._data_start, info["entries"])
+
+
+def write_snapshot(path: str, versions: dict) -> dict:
+    """
+    지금 캐시 내용(불러온 스냅샷 항목 포함)을 스냅샷 파일로 저장합니다.
+
+    임시 파일에 쓴 뒤 교체하므로, 같은 파일을 mmap으로 읽고 있는 인스턴스에도 영향이 없습니다.
+
+    Args:
+        path: 저장할 파일 경로
+        versions: 캐시 이름 → 버전 (analyzer.CACHE_VERSIONS)
+
+    Returns:
+        dict: {"path", "bytes", "entries": {캐시 이름: 항목 수}}
+    """
+    data = bytearray()
+    sections = {}
+    for name, cache in SNAPSHOT_CACHES.items():
+        entries = {}
+        for key, value in cache.items():
+            if not isinstance(value, str):
+                continue
+            blob = zlib.compress(value.encode("utf-8"), COMPRESSION_LEVEL)
+            entries[key] = [len(data), len(blob)]
+            data += blob
+        sections[name] = {"version": versions[name], "entries": entries}
+
+    header = json.dumps(
+        {"format": FORMAT_VERSION, "created_at": time.time(), "sections": sections},
+        separators=(",", ":")
+    ).encode("utf-8")
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(data)
+    os.replace(temp_path, path)
+
+    return {
+        "path": path,
+        "bytes": os.path.getsize(path),
+        "entries": {name: len(info["entries"]) for name, info in sections.items()}
+    }
+
+
+def load_snapshot(path: str, versions: dict) -> dict:
+    """
+    스냅샷을 열어 버전이 맞는 캐시를 ContentCache 뒤에 연결합니다.
+
+    Args:
+        path: 스냅샷 파일 경로
+        versions: 캐시 이름 → 지금 버전 (analyzer.CACHE_VERSIONS)
+
+    Returns:
+        dict: {"path", "created_at", "loaded": {캐시 이름: 항목 수}, "rejected": [버전이 달라 버린 캐시 이름]}
+    """
+    reader = SnapshotReader(path)
+    loaded = {}
+    rejected = []
+    for name, cache in SNAPSHOT_CACHES.items():
+        section = reader.section(name, versions[name])
+        if section is None:
+            if name in reader.sections:
+                rejected.append(name)
+            continue
+        cache.attach(section)
+        loaded[name] = len(section)
+
+    return {"path": path, "created_at": reader.created_at, "loaded": loaded, "rejected": rejected}
+
+
+# ============================================================
+# 💡 [Phase 25.1] 운영 중인 인스턴스에 내보내기 요청
+# ============================================================
+
+def _write_json_atomic(path: str, data: dict):
+    """읽는 쪽이 반쯤 쓴 파일을 보지 않도록 임시 파일에 쓴 뒤 바꿔치기합니다."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def trigger_result_path(trigger_path: str) -> str:
+    """내보내기 결과가 기록되는 파일 경로"""
+    return f"{trigger_path}.done"
+
+
+def request_export(trigger_path: str, output: str = None) -> float:
+    """
+    내보내기 요청 파일을 만듭니다.
+
+    Args:
+        trigger_path: 앱이 확인하는 요청 파일 경로
+        output: 저장할 스냅샷 파일 이름 (앱의 스냅샷 디렉터리 기준, 없으면 PRISM_CACHE_SNAPSHOT_EXPORT 경로)
+
+    Returns:
+        요청 시각 (결과 파일의 "requested_at"과 같으면 이 요청의 결과)
+    """
+    requested_at = time.time()
+    _write_json_atomic(trigger_path, {"output": output, "requested_at": requested_at})
+    return requested_at
+
+
+class ExportTriggerWatcher:
+    """
+    요청 파일을 주기적으로 확인해 캐시 스냅샷을 내보내는 백그라운드 스레드.
+
+    요청 파일은 이름을 바꿔 가져가므로, 같은 경로를 보는 인스턴스가 여럿이어도 한 곳에서만 내보냅니다.
+    """
+
+    def __init__(self, trigger_path: str, export, poll_seconds: float = TRIGGER_POLL_SECONDS):
+        self.trigger_path = trigger_path
+        self.export = export
+        self.poll_seconds = poll_seconds
+        self._thread = threading.Thread(target=self._run, name="snapshot-trigger", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def check(self) -> dict:
+        """
+        요청이 있으면 내보내고 결과를 기록합니다.
+
+        Returns:
+            dict: {"requested_at", "finished_at", "path", "bytes", "entries"} 또는 {..., "error"}.
+                  요청이 없으면 None
+        """
+        claimed_path = f"{self.trigger_path}.{os.getpid()}.claimed"
+        try:
+            os.replace(self.trigger_path, claimed_path)
+        except FileNotFoundError:
+            return None
+
+        request = _read_json(claimed_path) or {}
+        try:
+            result = self.export(request.get("output"))
+        except Exception as e:
+            result = {"error": str(e)}
+        finally:
+            os.remove(claimed_path)
+
+        result = {**result, "requested_at": request.get("requested_at"), "finished_at": time.time()}
+        _write_json_atomic(trigger_result_path(self.trigger_path), result)
+        return result
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.check()
+            except OSError:
+                # 요청 파일 경로에 쓸 수 없는 등 일시적인 문제는 다음 확인 때 다시 시도
+                pass
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def read_queries(path: str) -> list:
+    """질문 목록 파일을 읽습니다. (한 줄에 하나, 빈 줄과 #으로 시작하는 줄은 무시, 중복 제거)"""
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            query = line.strip()
+            if query and not query.startswith("#") and query not in queries:
+                queries.append(query)
+    return queries
+
+
+def precompute(options):
+    """
+    질문 목록을 미리 분석해 분석 캐시를 채운 뒤 스냅샷으로 저장합니다.
+
+    PRISM_CACHE_SNAPSHOT으로 불러온 스냅샷이 있으면 그 항목도 함께 저장되므로,
+    기존 스냅샷에 새 질문만 더하는 용도로도 쓸 수 있습니다. (이미 캐시된 질문은 다시 요청하지 않음)
+    """
+    import analyzer
+
+    queries = read_queries(options.queries)
+    print(f"📝 질문 {len(queries)}개 분석 ({options.workers}개 동시)")
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, options.workers)) as executor:
+        futures = {executor.submit(analyzer.precompute_analysis, query): query for query in queries}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            ok, cached = future.result()
+            mark = "♻️" if cached else ("✅" if ok else "⚠️")
+            failed += not ok
+            print(f"  {mark} ({completed}/{len(queries)}) {futures[future][:60]}")
+
+    result = analyzer.export_cache_snapshot(options.output)
+    counts = ", ".join(f"{name} {count}개" for name, count in result["entries"].items())
+    print(f"📦 저장: {result['path']} ({result['bytes'] / 1024:.1f}KB · {counts})")
+    if failed:
+        print(f"⚠️ {failed}개 질문은 분석에 실패해 포함되지 않았습니다.")
+
+
+def info(options):
+    """스냅샷에 담긴 캐시별 항목 수와 지금 버전과의 일치 여부를 출력합니다."""
+    import analyzer
+
+    reader = SnapshotReader(options.path)
+    created = time.strftime("%Y-%m-%d %H:%M", time.localtime(reader.created_at))
+    print(f"📦 {options.path} ({os.path.getsize(options.path) / 1024:.1f}KB, {created} 생성)")
+    for name, section in reader.sections.items():
+        current = analyzer.CACHE_VERSIONS.get(name)
+        status = "✅ 사용 가능" if section["version"] == current else "❌ 버전 다름 (불러오지 않음)"
+        print(f"  {name}: {len(section['entries'])}개 · {status}")
+
+
+def export(options):
+    """운영 중인 앱 인스턴스에 내보내기를 요청하고, 결과가 기록될 때까지 기다립니다."""
+    if not options.trigger:
+        sys.exit("⚠️ 요청 파일 경로가 없습니다. 앱과 같은 PRISM_CACHE_SNAPSHOT_TRIGGER를 설정하거나 --trigger로 지정하세요.")
+    requested_at = request_export(options.trigger, options.output)
+    print(f"📨 내보내기 요청: {options.trigger} (최대 {options.timeout}초 대기)")
+
+    deadline = time.time() + options.timeout
+    while time.time() < deadline:
+        result = _read_json(trigger_result_path(options.trigger))
+        if result and result.get("requested_at") == requested_at:
+            if result.get("error"):
+                sys.exit(f"⚠️ 내보내기 실패: {result['error']}")
+            counts = ", ".join(f"{name} {count}개" for name, count in result["entries"].items())
+            print(f"📦 저장: {result['path']} ({result['bytes'] / 1024:.1f}KB · {counts})")
+            return
+        time.sleep(0.5)
+
+    sys.exit(
+        f"⚠️ {options.timeout}초 안에 응답이 없습니다. "
+        "앱이 실행 중이고 같은 요청 파일(PRISM_CACHE_SNAPSHOT_TRIGGER)을 보는지 확인하세요."
+    )
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="PRISM-Lite 캐시 스냅샷")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    precompute_parser = commands.add_parser("precompute", help="질문 목록을 미리 분석해 스냅샷 만들기")
+    precompute_parser.add_argument("--queries", default=DEFAULT_QUERY_FILE, help="질문 목록 파일 (한 줄에 하나)")
+    precompute_parser.add_argument("--output", default=DEFAULT_OUTPUT, help="저장할 스냅샷 파일 경로")
+    precompute_parser.add_argument("--workers", type=int, default=DEFAULT_PRECOMPUTE_WORKERS,
+                                   help="동시에 분석할 질문 수")
+    precompute_parser.set_defaults(func=precompute)
+
+    info_parser = commands.add_parser("info", help="스냅샷 내용 확인")
+    info_parser.add_argument("path", help="스냅샷 파일 경로")
+    info_parser.set_defaults(func=info)
+
+    export_parser = commands.add_parser("export", help="운영 중인 앱 인스턴스의 캐시를 스냅샷으로 내보내기")
+    export_parser.add_argument("--output",
+                               help="저장할 *.snapshot 파일 이름 (앱의 스냅샷 디렉터리 안, 없으면 앱의 PRISM_CACHE_SNAPSHOT_EXPORT)")
+    export_parser.add_argument("--trigger", default=os.getenv("PRISM_CACHE_SNAPSHOT_TRIGGER"),
+                               help="앱이 확인하는 요청 파일 경로 (기본: PRISM_CACHE_SNAPSHOT_TRIGGER)")
+    export_parser.add_argument("--timeout", type=int, default=DEFAULT_EXPORT_TIMEOUT_SECONDS,
+                               help="결과를 기다릴 최대 시간 (초)")
+    export_parser.set_defaults(func=export)
+
+    options = parser.parse_args()
+    options.func(options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+PRISM-Lite 테스트 공통 설정
+앱 모듈이 PRISM-Lite/ 바로 아래에 있으므로 경로에 추가하고,
+analyzer 임포트 시 키 풀을 만들 수 있도록 가짜 API 키를 넣어 둡니다. (실제 호출은 테스트마다 stub)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("UPSTAGE_API_KEY", "test-stub")
@@ -0,0 +1,117 @@
+"""
+PRISM-Lite: 시간 예산 품질 조정 테스트
+관점이 많아도 기본 SLO 안에서 끝날 수 있으면 관점 수/max_tokens를 줄이지 않고,
+남은 시간이 예상 생성 시간보다 실제로 적을 때만 줄이는지 확인합니다.
+
+💡 실행: python -m pytest tests
+"""
+
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+import analyzer
+from deadline import Deadline, ANALYSIS_SLO_SECONDS
+from perspectives import compile_analysis_prompt
+from revisions import ContentCache, ANALYSIS_CACHE_SIZE
+from router import ModelRouter, load_routing_policy, TASK_MULTI_PERSPECTIVE
+
+PERSPECTIVE_COUNT = 12
+
+
+def _make_perspectives(count: int) -> dict:
+    return {
+        f"view{index}": {
+            "emoji": chr(0x2460 + index),  # ①②③... (관점마다 다른 제목 이모지)
+            "name": f"관점 {index + 1}",
+            "typicality": "중간",
+            "description": f"{index + 1}번째 시각에서 본 분석",
+            "color": "#888888",
+        }
+        for index in range(count)
+    }
+
+
+class FakeStream:
+    """관점마다 서로 다른 내용의 섹션을 한 번에 돌려주는 스트리밍 응답"""
+
+    def __init__(self, content: str):
+        self._chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content), finish_reason=None)]),
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason="stop")]),
+        ]
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def twelve_perspectives(monkeypatch):
+    """관점 12개 설정, 새 라우터(실측 통계 없음), 빈 분석 캐시, 가짜 Solar 응답"""
+    perspectives = _make_perspectives(PERSPECTIVE_COUNT)
+    # 이전 테스트가 캐시에 넣은 분석을 돌려받으면 요청이 나가지 않으므로 테스트마다 새 캐시를 씀
+    monkeypatch.setattr(analyzer, "analysis_cache", ContentCache(ANALYSIS_CACHE_SIZE))
+    monkeypatch.setattr(analyzer, "_recent_analyses", deque(maxlen=analyzer.NEAR_MATCH_SIZE))
+    monkeypatch.setattr(analyzer, "PERSPECTIVES", perspectives)
+    monkeypatch.setattr(analyzer, "MULTI_PERSPECTIVE_PREFIX", compile_analysis_prompt(perspectives))
+    monkeypatch.setattr(analyzer, "router", ModelRouter(load_routing_policy()))
+    analyzer._analysis_prefix.cache_clear()
+
+    topics = ["예산", "일정", "인력", "위험", "고객", "품질", "비용", "기술", "조직", "법규", "시장", "환경"]
+    content = "\n\n".join(
+        f"{analyzer._section_heading(key)}\n{topics[index]}에 관한 {index}번 관점의 고유한 설명 " * 3
+        for index, key in enumerate(perspectives)
+    )
+    requests = []
+
+    def fake_open_stream(request):
+        requests.append(request)
+        return FakeStream(content), None
+
+    monkeypatch.setattr(analyzer, "_open_stream", fake_open_stream)
+    yield requests
+    analyzer._analysis_prefix.cache_clear()
+
+
+def test_twelve_perspectives_finish_undegraded_under_default_slo(twelve_perspectives):
+    handle = analyzer.CallHandle(Deadline(ANALYSIS_SLO_SECONDS))
+
+    content = analyzer.analyze_multi_perspective("팀 내 갈등을 해결하려면 어떻게 해야 할까요?", handle)
+
+    request = twelve_perspectives[0]
+    assert request["messages"][1]["content"].startswith(analyzer.MULTI_PERSPECTIVE_PREFIX)
+    assert request["max_tokens"] == PERSPECTIVE_COUNT * 500
+    assert handle.deadline.notes() == []
+    assert len(analyzer.split_perspective_sections(content)) == PERSPECTIVE_COUNT
+    assert analyzer._cacheable(handle)
+
+
+def test_perspectives_are_cut_only_when_remaining_time_is_below_estimate(twelve_perspectives):
+    handle = analyzer.CallHandle(Deadline(10))
+
+    analyzer._run_multi_perspective("이직을 고민하고 있습니다.", TASK_MULTI_PERSPECTIVE, handle)
+
+    prompt = twelve_perspectives[0]["messages"][1]["content"]
+    assert "관점 1" in prompt and "관점 2" in prompt and "관점 3" not in prompt
+    assert any("관점 12개 중 2개만 분석" in note for note in handle.deadline.notes())
+    assert not analyzer._cacheable(handle)
+
+
+def test_router_estimate_follows_measured_section_time():
+    router = ModelRouter(load_routing_policy())
+    default = router.estimate_seconds(TASK_MULTI_PERSPECTIVE, sections=PERSPECTIVE_COUNT)
+    assert default == PERSPECTIVE_COUNT * router.policy["seconds_per_section"]
+
+    for _ in range(router.policy["min_samples"]):
+        router.record("solar-pro", 24.0, success=True, sections=PERSPECTIVE_COUNT)
+
+    assert router.estimate_seconds(TASK_MULTI_PERSPECTIVE, sections=PERSPECTIVE_COUNT) == pytest.approx(24.0)
+    # 예상 시간 안에 끝날 수 있으면 섹션 수에 맞춘 max_tokens를 토큰 속도로 자르지 않음
+    decision = router.route(TASK_MULTI_PERSPECTIVE, sections=PERSPECTIVE_COUNT, time_budget=30.0)
+    assert decision["model"] == "solar-pro"
+    assert decision["max_tokens"] == PERSPECTIVE_COUNT * 500
+    assert decision["degraded"] == []
@@ -0,0 +1,143 @@
+"""
+PRISM-Lite: 문서 파싱 테스트 (PDF 구간 분할, 미리 요약, 키 장애 조치)
+LARGE_PDF_PAGES 이하 PDF는 한 번에, 그보다 큰 PDF는 PAGES_PER_SHARD 구간으로 나눠 요청하는지,
+끝난 구간의 페이지를 나머지 구간을 파싱하는 동안 요약하고 분석할 때 다시 요청하지 않는지,
+한 번에 보내는 요청이 다시 시도해도 되는 오류로 실패하면 다른 키로 다시 보내는지 확인합니다.
+"""
+
+import io
+import itertools
+import threading
+
+import pytest
+
+import analyzer
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _make_pdf(pages: int, width: int) -> bytes:
+    """빈 페이지 PDF (테스트마다 페이지 크기를 달리해 페이지 캐시 지문이 겹치지 않게 함)"""
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=width, height=800)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def parse_requests(monkeypatch):
+    """Document Parse 호출 대신 요청받은 페이지 수를 기록하고 페이지별 텍스트를 돌려줌"""
+    requests = []
+
+    def fake_request(file_name, file_bytes, mime_type, timeout=None):
+        count = len(pypdf.PdfReader(io.BytesIO(file_bytes)).pages)
+        requests.append(count)
+        page_texts = {page: f"{file_name} 내용" for page in range(1, count + 1)}
+        return {"success": True, "text": "\n".join(page_texts.values()), "error": None,
+                "retryable": False, "page_texts": page_texts}
+
+    monkeypatch.setattr(analyzer, "_request_document_parse", fake_request)
+    # 분할 테스트에서는 미리 요약(실제 Solar 호출)을 끔
+    monkeypatch.setattr(analyzer, "EARLY_MAP_PAGES", 0)
+    return requests
+
+
+def test_small_pdf_is_sent_in_one_request(parse_requests):
+    pages = analyzer.LARGE_PDF_PAGES
+    result = analyzer._parse_pdf_incremental("small.pdf", _make_pdf(pages, width=601))
+
+    assert result["success"]
+    assert parse_requests == [pages]
+
+
+def test_large_pdf_is_split_into_shards(parse_requests):
+    pages = analyzer.LARGE_PDF_PAGES + 5
+    result = analyzer._parse_pdf_incremental("large.pdf", _make_pdf(pages, width=602))
+
+    assert result["success"]
+    assert sorted(parse_requests) == [5, 10, 10]
+
+
+def test_finished_shards_are_summarized_while_parsing(monkeypatch):
+    summarized = threading.Event()
+    overlapped = []
+    calls = []
+    page_ids = itertools.count(1)
+
+    def fake_request(file_name, file_bytes, mime_type, timeout=None):
+        count = len(pypdf.PdfReader(io.BytesIO(file_bytes)).pages)
+        if count < analyzer.PAGES_PER_SHARD:
+            # 마지막 구간은 다른 구간의 요약이 시작될 때까지 끝나지 않음
+            overlapped.append(summarized.wait(timeout=5))
+        page_texts = {page: f"페이지 {next(page_ids)}" for page in range(1, count + 1)}
+        return {"success": True, "text": "\n".join(page_texts.values()), "error": None,
+                "retryable": False, "page_texts": page_texts}
+
+    def fake_summarize(section, handle=None):
+        calls.append(section["text"])
+        summarized.set()
+        summary = f"요약: {section['text']}"
+        analyzer.page_summary_cache.put(analyzer.section_key(section["text"]), summary)
+        return summary
+
+    monkeypatch.setattr(analyzer, "_request_document_parse", fake_request)
+    monkeypatch.setattr(analyzer, "_summarize_section", fake_summarize)
+
+    pages = analyzer.LARGE_PDF_PAGES + 5
+    result = analyzer._parse_pdf_incremental("early.pdf", _make_pdf(pages, width=603))
+    assert result["success"]
+    assert overlapped == [True]
+
+    sections = [{"label": f"p.{page['page']}", "text": page["text"]} for page in result["pages"]]
+    summaries = analyzer.summarize_sections(sections)
+
+    assert [s["summary"] for s in summaries] == [f"요약: {s['text']}" for s in sections]
+    assert sorted(calls) == sorted(s["text"] for s in sections)
+
+
+class FakePool:
+    """키 3개짜리 키 풀 (쉬지 않는 키가 늘 있음)"""
+
+    def __len__(self):
+        return 3
+
+    def has_available(self):
+        return True
+
+
+def test_single_request_parse_fails_over_to_another_key(monkeypatch):
+    outcomes = [
+        {"success": False, "text": "", "error": "API 오류 (상태 코드: 429)", "retryable": True},
+        {"success": True, "text": "추출된 내용", "error": "", "retryable": False, "page_texts": {}},
+    ]
+    calls = []
+
+    def fake_request(file_name, file_bytes, mime_type, timeout=None):
+        calls.append(file_name)
+        return outcomes[len(calls) - 1]
+
+    monkeypatch.setattr(analyzer, "credential_pool", FakePool())
+    monkeypatch.setattr(analyzer, "_request_document_parse", fake_request)
+
+    result = analyzer._parse_checked_document("photo.png", {"file_type": "png", "data": b"\x89PNG"})
+
+    assert result["success"] and result["text"] == "추출된 내용"
+    assert len(calls) == 2
+
+
+def test_single_request_parse_does_not_retry_permanent_errors(monkeypatch):
+    calls = []
+
+    def fake_request(file_name, file_bytes, mime_type, timeout=None):
+        calls.append(file_name)
+        return {"success": False, "text": "", "error": "파일 크기가 너무 큽니다.", "retryable": False}
+
+    monkeypatch.setattr(analyzer, "credential_pool", FakePool())
+    monkeypatch.setattr(analyzer, "_request_document_parse", fake_request)
+
+    result = analyzer._parse_checked_document("photo.png", {"file_type": "png", "data": b"\x89PNG"})
+
+    assert not result["success"]
+    assert len(calls) == 1
@@ -0,0 +1,55 @@
+"""
+PRISM-Lite: rerun 프로파일러 테스트
+fragment 단독 실행이 rerun으로 기록되는지, 여러 세션이 동시에 cProfile 모드로 측정해도 오류가 나지 않는지 확인합니다.
+"""
+
+import threading
+
+import pytest
+
+import profiler
+
+
+@pytest.fixture
+def cprofile_mode(monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_ENABLED", True)
+    monkeypatch.setattr(profiler, "CPROFILE_ENABLED", True)
+    monkeypatch.setattr(profiler, "_cprofile_stats", None)
+    monkeypatch.setattr(profiler, "_reruns", {"count": 0, "samples": profiler.deque(maxlen=profiler.SAMPLE_WINDOW)})
+    monkeypatch.setattr(profiler, "_recent_reruns", profiler.deque(maxlen=20))
+
+
+def test_fragment_run_is_recorded_once(cprofile_mode):
+    @profiler.profiled_rerun(lambda: "session-a")
+    def fragment():
+        return "drawn"
+
+    assert fragment() == "drawn"
+    with profiler.profile_rerun("session-a"):
+        fragment()  # 전체 rerun 안에서 그린 fragment는 따로 세지 않음
+
+    recent = list(profiler._recent_reruns)
+    assert [r["fragment"] for r in recent] == ["fragment", None]
+
+
+def test_concurrent_sessions_share_cprofile(cprofile_mode):
+    inside = threading.Barrier(2)
+    errors = []
+
+    def session(session_id):
+        try:
+            with profiler.profile_rerun(session_id):
+                inside.wait(timeout=5)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(f"session-{i}",)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(profiler._recent_reruns) == 2
+    assert profiler.get_cprofile_text()
+    assert not profiler._cprofile_lock.locked()
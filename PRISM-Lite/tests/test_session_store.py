@@ -0,0 +1,34 @@
+"""
+PRISM-Lite: 세션 데이터 저장소 테스트
+방치된 세션이 정리된 뒤 앱이 이를 알아챌 수 있는지, 새로 연결한 탭이 이전 세션의 데이터와 작업을 찾을 수 있는지 확인합니다.
+"""
+
+from session_store import SessionBlobStore
+
+
+def test_expired_session_is_reported_missing(tmp_path):
+    store = SessionBlobStore(str(tmp_path), memory_cap_bytes=1024 * 1024, session_cap_bytes=1024 * 1024,
+                             session_ttl_seconds=60)
+    ref = store.put("session-a", "last_result", "분석 결과")
+    assert store.has_session("session-a")
+
+    assert store.cleanup_expired(now=store._sessions["session-a"]["last_seen"] + 61) == 1
+    assert not store.has_session("session-a")
+    assert store.get("session-b", ref) is None
+
+
+def test_reconnected_tab_finds_session_data_and_jobs(tmp_path):
+    from jobs import JobManager
+
+    store = SessionBlobStore(str(tmp_path), memory_cap_bytes=1024 * 1024, session_cap_bytes=1024 * 1024,
+                             session_ttl_seconds=60)
+    ref = store.put("session-a", "last_result", "분석 결과")
+    assert store.get_slots("session-a") == {"last_result": ref}
+    assert store.get_slots("session-b") == {}
+
+    jobs = JobManager(max_workers=1)
+    first = jobs.submit("session-a", "deep_dive", lambda: "첫 답변")
+    latest = jobs.submit("session-a", "deep_dive", lambda: "두 번째 답변")
+    other = jobs.submit("session-b", "analysis", lambda: "다른 세션")
+    assert jobs.find_session_jobs("session-a") == {"deep_dive": latest}
+    assert first != latest and other not in jobs.find_session_jobs("session-a").values()
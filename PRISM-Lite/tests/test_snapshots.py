@@ -0,0 +1,70 @@
+"""
+PRISM-Lite: 캐시 스냅샷 내보내기 요청 테스트
+요청 파일을 만들면 운영 중인 인스턴스(ExportTriggerWatcher)가 한 번만 내보내고 결과를 기록하는지,
+요청으로 지정한 저장 경로가 스냅샷 디렉터리를 벗어나지 못하는지 확인합니다.
+"""
+
+import os
+
+from snapshots import ExportTriggerWatcher, request_export, trigger_result_path, _read_json
+
+
+def test_trigger_exports_once_and_records_result(tmp_path):
+    trigger = str(tmp_path / "prism_cache.snapshot.request")
+    exported = []
+
+    def fake_export(path):
+        exported.append(path)
+        return {"path": path, "bytes": 10, "entries": {"analysis": 1}}
+
+    watcher = ExportTriggerWatcher(trigger, fake_export)
+    assert watcher.check() is None
+
+    requested_at = request_export(trigger, str(tmp_path / "out.snapshot"))
+    result = watcher.check()
+
+    assert exported == [str(tmp_path / "out.snapshot")]
+    assert result["requested_at"] == requested_at
+    assert _read_json(trigger_result_path(trigger)) == result
+    assert not os.path.exists(trigger)
+    assert watcher.check() is None
+
+
+def test_trigger_records_export_error(tmp_path):
+    trigger = str(tmp_path / "prism_cache.snapshot.request")
+
+    def failing_export(path):
+        raise OSError("디스크가 가득 찼습니다")
+
+    request_export(trigger)
+    result = ExportTriggerWatcher(trigger, failing_export).check()
+
+    assert result["error"] == "디스크가 가득 찼습니다"
+    assert os.listdir(tmp_path) == [os.path.basename(trigger_result_path(trigger))]
+
+
+def test_requested_output_stays_in_snapshot_directory(tmp_path, monkeypatch):
+    import analyzer
+
+    exported = []
+    monkeypatch.setattr(analyzer, "SNAPSHOT_EXPORT_PATH", str(tmp_path / "prism_cache.snapshot"))
+    monkeypatch.setattr(analyzer, "export_cache_snapshot", lambda path=None: exported.append(path) or {"path": path})
+
+    analyzer.export_requested_snapshot("nightly.snapshot")
+    assert exported == [str(tmp_path / "nightly.snapshot")]
+
+    for output in ("../escape.snapshot", str(tmp_path / "abs.snapshot"), "app.py", ".."):
+        try:
+            analyzer.export_requested_snapshot(output)
+        except ValueError:
+            continue
+        raise AssertionError(f"허용되면 안 되는 경로: {output}")
+    assert len(exported) == 1
+
+
+def test_trigger_watch_is_opt_in(monkeypatch):
+    import analyzer
+
+    monkeypatch.setattr(analyzer, "SNAPSHOT_TRIGGER_PATH", None)
+    monkeypatch.setattr(analyzer, "_trigger_watcher", None)
+    assert analyzer.start_snapshot_trigger_watch() is None